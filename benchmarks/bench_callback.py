@@ -0,0 +1,83 @@
+"""Per-block cost of the full audio callback with a typical effects chain.
+
+Feeds int16 PCM through ``VoiceProcessor._audio_callback`` exactly as
+PortAudio would, so the numbers include the device-boundary conversion.
+
+Usage: python benchmarks/bench_callback.py [--blocks N] [--trace-alloc]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orionwave.config import AudioConfig
+from orionwave.processor import VoiceProcessor
+
+CHAIN = [
+    ('equalizer', {'bands': {'low': 1.2, 'mid': 0.9, 'high': 1.1}}),
+    ('compressor', {'threshold': 0.3, 'ratio': 3.0}),
+    ('pitch_shift', {'shift': 300}),
+    ('reverb', {'room_size': 0.4, 'mix': 0.3}),
+]
+
+
+def voiced_blocks(config: AudioConfig, count: int) -> list:
+    """Harmonic test signal loud enough to keep the VAD open"""
+    rng = np.random.default_rng(0)
+    t = np.arange(config.CHUNK * count) / config.RATE
+    signal = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1440)))
+    signal += rng.standard_normal(len(t)) * 0.01
+    pcm = (signal / np.max(np.abs(signal)) * 12000).astype(np.int16)
+    return [pcm[i:i + config.CHUNK].tobytes() for i in range(0, len(pcm), config.CHUNK)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--trace-alloc', action='store_true',
+                        help='Also report bytes allocated per callback (slower)')
+    args = parser.parse_args()
+
+    config = AudioConfig()
+    processor = VoiceProcessor(config)
+    for name, params in CHAIN:
+        processor.add_effect(name, params)
+    blocks = voiced_blocks(config, 64)
+
+    for i in range(args.warmup):
+        processor._audio_callback(blocks[i % len(blocks)], config.CHUNK, None, 0)
+
+    timings = np.empty(args.blocks)
+    for i in range(args.blocks):
+        start = time.perf_counter()
+        processor._audio_callback(blocks[i % len(blocks)], config.CHUNK, None, 0)
+        timings[i] = time.perf_counter() - start
+    timings *= 1000.0
+
+    budget_ms = 1000.0 * config.CHUNK / config.RATE
+    print(f"block={config.CHUNK} rate={config.RATE} budget={budget_ms:.2f} ms "
+          f"chain={', '.join(name for name, _ in CHAIN)}")
+    print(f"callback  mean {np.mean(timings):7.4f} ms  p95 {np.percentile(timings, 95):7.4f} ms  "
+          f"max {np.max(timings):7.4f} ms  {100 * np.mean(timings) / budget_ms:6.2f}% of budget")
+
+    if args.trace_alloc:
+        tracemalloc.start()
+        peaks = np.empty(200)
+        for i in range(len(peaks)):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            processor._audio_callback(blocks[i % len(blocks)], config.CHUNK, None, 0)
+            peaks[i] = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+        print(f"allocated per callback (peak)  {np.median(peaks) / 1024:8.1f} KiB")
+
+    processor.analysis_worker.stop()
+
+
+if __name__ == '__main__':
+    main()
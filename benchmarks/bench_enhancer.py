@@ -0,0 +1,43 @@
+"""Steady-state per-block cost of streaming NeuralEnhancer inference.
+
+Usage: python benchmarks/bench_enhancer.py [--blocks N] [--threads N]
+"""
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orionwave.config import AudioConfig
+from orionwave.effects.neural_enhancer import NeuralEnhancer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=50)
+    args = parser.parse_args()
+
+    config = AudioConfig()
+    budget_ms = 1000.0 * config.CHUNK / config.RATE
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal(config.CHUNK) * 3000).astype(np.int16)
+
+    enhancer = NeuralEnhancer(num_threads=args.threads)
+    for _ in range(args.warmup):
+        enhancer.enhance(block)
+    enhancer.reset()
+    for _ in range(args.blocks):
+        enhancer.enhance(block)
+
+    stats = enhancer.timing_stats()
+    print(f"block={config.CHUNK} rate={config.RATE} threads={args.threads} "
+          f"budget={budget_ms:.2f} ms latency={enhancer.latency} samples")
+    for name in ('mean_ms', 'p95_ms', 'max_ms'):
+        print(f"{name:8s} {stats[name]:8.4f} ms/block  {100 * stats[name] / budget_ms:6.2f}% of budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Per-block cost of the streaming EQ against the stateless ``apply_eq``.
+
+Usage: python benchmarks/bench_eq.py [--blocks N]
+"""
+import argparse
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orionwave.config import AudioConfig
+from orionwave.effects.basic import apply_eq
+from orionwave.effects.eq import StreamingEQ
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=2000)
+    args = parser.parse_args()
+
+    config = AudioConfig()
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal(config.CHUNK) * 3000).astype(np.int16)
+    bands = {'low': 1.2, 'mid': 0.9, 'high': 1.1}
+    eq = StreamingEQ(config.RATE)
+    budget_ms = 1000.0 * config.CHUNK / config.RATE
+
+    results = {
+        'apply_eq (filtfilt)': timeit.timeit(lambda: apply_eq(block, config, bands), number=args.blocks),
+        'StreamingEQ (sosfilt)': timeit.timeit(lambda: eq(block, config, bands), number=args.blocks),
+    }
+    print(f"block={config.CHUNK} rate={config.RATE} budget={budget_ms:.2f} ms")
+    for name, total in results.items():
+        per_block_ms = 1000.0 * total / args.blocks
+        print(f"{name:24s} {per_block_ms:8.4f} ms/block  {100 * per_block_ms / budget_ms:6.2f}% of budget")
+
+
+if __name__ == '__main__':
+    main()
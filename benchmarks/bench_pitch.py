@@ -0,0 +1,49 @@
+"""Per-block cost of the pitch-shift backends on the same input.
+
+Usage: python benchmarks/bench_pitch.py [--blocks N] [--shift CENTS]
+"""
+import argparse
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orionwave.config import AudioConfig
+from orionwave.effects.basic import apply_pitch_shift
+from orionwave.effects.pitch import PhaseVocoderPitchShifter, WSOLAPitchShifter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=500)
+    parser.add_argument('--shift', type=int, default=300)
+    args = parser.parse_args()
+
+    config = AudioConfig()
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal(config.CHUNK) * 3000).astype(np.int16)
+    budget_ms = 1000.0 * config.CHUNK / config.RATE
+
+    vocoder = PhaseVocoderPitchShifter(config.RATE)
+    backends = {
+        'librosa (apply_pitch_shift)': (lambda: apply_pitch_shift(block, config, args.shift), 20),
+        'phase vocoder': (lambda: vocoder(block, config, shift=args.shift), args.blocks),
+    }
+    for mode in WSOLAPitchShifter.MODES:
+        shifter = WSOLAPitchShifter(config.RATE, mode=mode)
+        backends[f'wsola ({mode})'] = (
+            lambda shifter=shifter, mode=mode: shifter(block, config, shift=args.shift, mode=mode),
+            args.blocks
+        )
+
+    print(f"block={config.CHUNK} rate={config.RATE} shift={args.shift} cents budget={budget_ms:.2f} ms")
+    for name, (run, number) in backends.items():
+        run()
+        per_block_ms = 1000.0 * timeit.timeit(run, number=number) / number
+        print(f"{name:32s} {per_block_ms:8.4f} ms/block  {100 * per_block_ms / budget_ms:6.2f}% of budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Per-block cost and accuracy of PitchTracker against librosa.piptrack.
+
+Usage: python benchmarks/bench_pitch_tracker.py [--blocks N]
+"""
+import argparse
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orionwave.config import AudioConfig
+from orionwave.audio.pitch_tracker import PitchTracker
+
+
+def piptrack_pitch(block: np.ndarray, sample_rate: int) -> float:
+    """The per-block estimate AudioAnalyzer used to compute"""
+    import librosa
+    pitches, magnitudes = librosa.piptrack(y=block, sr=sample_rate, n_fft=len(block))
+    pitch = np.mean(pitches[magnitudes > np.max(magnitudes) * 0.7])
+    return float(pitch if not np.isnan(pitch) else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=1000)
+    args = parser.parse_args()
+
+    config = AudioConfig()
+    chunk = config.CHUNK
+    t = np.arange(chunk * 8) / config.RATE
+    budget_ms = 1000.0 * chunk / config.RATE
+
+    print(f"block={chunk} rate={config.RATE} budget={budget_ms:.2f} ms")
+    print(f"{'tone':>8s} {'piptrack':>10s} " + " ".join(f"{'yin/' + str(d):>10s}" for d in (1, 2, 4)))
+    for frequency in (110.0, 220.0, 440.0):
+        tone = (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+        estimates = [piptrack_pitch(tone[-chunk:], config.RATE)]
+        for decimation in (1, 2, 4):
+            tracker = PitchTracker(config.RATE, decimation=decimation)
+            for i in range(0, len(tone), chunk):
+                pitch, _ = tracker.process(tone[i:i + chunk])
+            estimates.append(pitch)
+        print(f"{frequency:8.1f} " + " ".join(f"{estimate:10.2f}" for estimate in estimates))
+
+    block = tone[-chunk:]
+    timings = {'librosa.piptrack': timeit.timeit(lambda: piptrack_pitch(block, config.RATE), number=100) / 100}
+    for decimation in (1, 2, 4):
+        tracker = PitchTracker(config.RATE, decimation=decimation)
+        timings[f'PitchTracker (decimation={decimation})'] = (
+            timeit.timeit(lambda: tracker.process(block), number=args.blocks) / args.blocks
+        )
+    for name, seconds in timings.items():
+        print(f"{name:32s} {1000 * seconds:8.4f} ms/block  {100000 * seconds / budget_ms:6.2f}% of budget")
+
+
+if __name__ == '__main__':
+    main()
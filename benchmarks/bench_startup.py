@@ -0,0 +1,69 @@
+"""Cold-start time of the library and CLI, each measured in a fresh interpreter.
+
+Usage: python benchmarks/bench_startup.py [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ('torch', 'librosa', 'scipy', 'pyaudio', 'sounddevice', 'soundfile', 'websockets')
+
+# Each scenario prints its own elapsed time and which heavy modules it loaded
+SCENARIOS = {
+    'import orionwave': "import orionwave",
+    'import + AudioConfig': "import orionwave; orionwave.AudioConfig()",
+    'VoiceProcessor()': "import orionwave; orionwave.VoiceProcessor(orionwave.AudioConfig())",
+    'cli --help': (
+        "import sys; sys.argv = ['orionwave', '--help']\n"
+        "from orionwave.cli import main\n"
+        "try:\n    main()\nexcept SystemExit:\n    pass"
+    ),
+}
+
+PROBE = """
+import io, json, sys, time, contextlib
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    exec({code!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_scenario(code: str) -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    # VoiceProcessor may create presets/ and recordings/ in the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, env=env, cwd=directory, check=True
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scenario':22s} {'median':>9s} {'min':>9s}  heavy modules loaded")
+    for name, code in SCENARIOS.items():
+        try:
+            runs = [run_scenario(code) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:22s} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        seconds = [run['seconds'] * 1000 for run in runs]
+        print(f"{name:22s} {statistics.median(seconds):7.1f}ms {min(seconds):7.1f}ms  "
+              f"{', '.join(runs[-1]['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
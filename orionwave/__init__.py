@@ -1,5 +1,4 @@
 from .config import AudioConfig
-from .processor import VoiceProcessor
 from .types import VoiceProcessorProtocol
 
 __version__ = "1.0.0"
@@ -9,3 +8,15 @@ __all__ = [
     "AudioConfig",
     "VoiceProcessorProtocol"
 ]
+
+
+def __getattr__(name):
+    # Importing the processor pulls in the DSP stack, so defer it until used
+    if name == "VoiceProcessor":
+        from .processor import VoiceProcessor
+        return VoiceProcessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + ["VoiceProcessor"])
@@ -3,11 +3,21 @@ from .analyzer import AudioAnalyzer
 from .enhancer import AudioEnhancer
 from .vad import VoiceActivityDetector
 from .presets import PresetManager
+from .spectral import SpectralContext, SpectralContextBuilder
+from .analysis_worker import AnalysisWorker, BlockRingBuffer
+from .pitch_tracker import PitchTracker
+from .sample_format import BlockConverter
 
 __all__ = [
     'NoiseReducer',
     'AudioAnalyzer',
     'AudioEnhancer',
     'VoiceActivityDetector',
-    'PresetManager'
+    'PresetManager',
+    'SpectralContext',
+    'SpectralContextBuilder',
+    'AnalysisWorker',
+    'BlockRingBuffer',
+    'PitchTracker',
+    'BlockConverter'
 ]
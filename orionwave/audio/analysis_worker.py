@@ -0,0 +1,143 @@
+import numpy as np
+import threading
+import time
+import logging
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
+from .analyzer import AudioAnalyzer
+from .sample_format import to_float32
+from .spectral import SpectralContextBuilder
+from ..visualization.spectrum_analyzer import SpectrumAnalyzer, VisualizationData
+
+logger = logging.getLogger(__name__)
+
+
+class BlockRingBuffer:
+    """Preallocated single-producer/single-consumer ring of audio blocks.
+
+    The producer only advances ``_write`` and the consumer only advances
+    ``_read``; each index is a single attribute store, so neither side takes a
+    lock. When the ring is full new blocks are dropped and counted instead of
+    blocking the producer.
+    """
+
+    def __init__(self, capacity: int, block_size: int, dtype=np.float32):
+        self.capacity = capacity
+        self.block_size = block_size
+        self.blocks = np.zeros((capacity, block_size), dtype=dtype)
+        self.lengths = np.zeros(capacity, dtype=np.int64)
+        self.dropped = 0
+        self._write = 0
+        self._read = 0
+
+    @property
+    def depth(self) -> int:
+        return self._write - self._read
+
+    def push(self, block: np.ndarray) -> bool:
+        """Copy a block into the ring; never blocks"""
+        if self._write - self._read >= self.capacity:
+            self.dropped += 1
+            return False
+        slot = self._write % self.capacity
+        count = min(len(block), self.block_size)
+        self.blocks[slot, :count] = block[:count]
+        self.lengths[slot] = count
+        self._write += 1
+        return True
+
+    def pop(self, out: np.ndarray) -> Optional[int]:
+        """Copy the oldest block into ``out`` and return its length"""
+        if self._read == self._write:
+            return None
+        slot = self._read % self.capacity
+        count = int(self.lengths[slot])
+        out[:count] = self.blocks[slot, :count]
+        self._read += 1
+        return count
+
+
+class AnalysisWorker:
+    """Runs spectrum and feature analysis off the real-time audio thread.
+
+    The audio callback only calls :meth:`submit`, which copies the block into
+    a :class:`BlockRingBuffer`. Results are published by swapping in new
+    immutable snapshots, so readers never see a partially updated result.
+    ``on_results`` is called on the worker thread after each publish.
+    With a ``tracer`` each analyzed block and adaptation is recorded as a span.
+    """
+
+    def __init__(self, sample_rate: int, chunk_size: int, capacity: int = 32,
+                 spectrum_analyzer: Optional[SpectrumAnalyzer] = None,
+                 analyzer: Optional[AudioAnalyzer] = None,
+                 poll_interval: Optional[float] = None,
+                 on_results: Optional[Callable[[Mapping[str, float]], None]] = None,
+                 tracer=None):
+        self.ring = BlockRingBuffer(capacity, chunk_size)
+        self.context_builder = SpectralContextBuilder(sample_rate)
+        self.spectrum_analyzer = spectrum_analyzer or SpectrumAnalyzer(sample_rate, chunk_size)
+        self.analyzer = analyzer or AudioAnalyzer(sample_rate, chunk_size)
+        self.poll_interval = poll_interval or chunk_size / sample_rate / 4
+        self.analysis_results: Mapping[str, float] = MappingProxyType({})
+        self.visualization_data: Optional[VisualizationData] = None
+        self.blocks_analyzed = 0
+        self.on_results = on_results
+        self.tracer = tracer
+        if tracer is not None:
+            self._trace_ids = (tracer.name_id('analysis_worker'), tracer.name_id('adaptation'))
+        self._block = np.zeros(chunk_size, dtype=self.ring.blocks.dtype)
+        self._running = False
+        self._thread = None
+
+    def submit(self, block: np.ndarray) -> bool:
+        """Queue a block for analysis (called from the audio callback)"""
+        if block.dtype == np.int16:
+            block = to_float32(block)
+        return self.ring.push(block)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="analysis-worker")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def analyze_pending(self) -> int:
+        """Analyze every queued block and publish the latest results"""
+        analyzed = 0
+        while True:
+            count = self.ring.pop(self._block)
+            if count is None:
+                return analyzed
+            start = time.perf_counter_ns()
+            block = self._block[:count]
+            context = self.context_builder.build(block)
+            visualization = self.spectrum_analyzer.analyze(block, context)
+            results = self.analyzer.analyze_frame(block, context)
+
+            # Publish by reference swap
+            self.visualization_data = visualization
+            self.analysis_results = MappingProxyType(results)
+            self.blocks_analyzed += 1
+            analyzed += 1
+            published = time.perf_counter_ns()
+            if self.on_results is not None:
+                self.on_results(self.analysis_results)
+            if self.tracer is not None:
+                self.tracer.record(self._trace_ids[0], start, published)
+                self.tracer.record(self._trace_ids[1], published, time.perf_counter_ns())
+
+    def _run(self):
+        while self._running:
+            try:
+                if not self.analyze_pending():
+                    time.sleep(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Analysis worker error: {e}")
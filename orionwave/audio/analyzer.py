@@ -1,44 +1,44 @@
 import numpy as np
-from scipy import signal
-import librosa
-from typing import Dict
+from typing import Dict, Optional
+from .spectral import SpectralContext, SpectralContextBuilder
+from .pitch_tracker import PitchTracker
 import logging
 
 logger = logging.getLogger(__name__)
 
 class AudioAnalyzer:
-    def __init__(self, sample_rate: int, chunk_size: int):
+    def __init__(self, sample_rate: int, chunk_size: int, pitch_decimation: int = 2):
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
-        self.window = signal.windows.hann(chunk_size)
+        self.context_builder = SpectralContextBuilder(sample_rate)
+        self.pitch_tracker = PitchTracker(sample_rate, decimation=pitch_decimation)
         self.history_size = 10
         self.history = []
 
-    def analyze_frame(self, frame: np.ndarray) -> Dict[str, float]:
+    def analyze_frame(self, frame: np.ndarray,
+                      context: Optional[SpectralContext] = None) -> Dict[str, float]:
         """Analyze audio frame and return various metrics"""
-        # Normalize
-        frame = frame.astype(np.float32) / 32768.0
-        
-        # Calculate RMS
-        rms = np.sqrt(np.mean(frame**2))
-        
+        if context is None:
+            context = self.context_builder.build(frame)
+        frame = context.samples
+        freqs, psd = context.frequencies, context.power
+
         # Spectral analysis
-        freqs, psd = signal.welch(frame, self.sample_rate)
         dominant_freq = freqs[np.argmax(psd)]
-        spectral_centroid = np.sum(freqs * psd) / np.sum(psd)
+        total_power = np.sum(psd)
+        spectral_centroid = np.dot(freqs, psd) / total_power if total_power > 0 else 0.0
+        # Tonal rather than noisy: one minus the spectral flatness (geometric over arithmetic mean)
+        flatness = np.exp(np.mean(np.log(psd + 1e-20))) * len(psd) / total_power if total_power > 0 else 1.0
         
-        # Pitch detection
-        pitches, magnitudes = librosa.piptrack(
-            y=frame,
-            sr=self.sample_rate,
-            n_fft=self.chunk_size
-        )
-        pitch = np.mean(pitches[magnitudes > np.max(magnitudes)*0.7])
+        # Streaming pitch detection
+        pitch, pitch_confidence = self.pitch_tracker.process(frame)
 
         return {
-            'rms': float(rms),
+            'rms': context.rms,
             'dominant_frequency': float(dominant_freq),
             'spectral_centroid': float(spectral_centroid),
-            'pitch': float(pitch if not np.isnan(pitch) else 0.0),
+            'clarity': float(1.0 - flatness),
+            'pitch': float(pitch),
+            'pitch_confidence': pitch_confidence,
             'zero_crossing_rate': float(np.mean(np.abs(np.diff(np.signbit(frame)))))
         }
@@ -1,10 +1,21 @@
 import numpy as np
 from scipy import signal
 import logging
+from typing import Optional
+from .filters import rbj_biquad
+from .sample_format import match_format, to_float32
 
 logger = logging.getLogger(__name__)
 
 class AudioEnhancer:
+    # setting -> (filter type, frequency, Q, gain in dB at amount 1.0)
+    SECTIONS = {
+        'warmth': ('low_shelf', 200.0, 0.707, 6.0),
+        'clarity': ('high_shelf', 5000.0, 0.707, 6.0),
+        'presence': ('peaking', 3000.0, 1.0, 4.0),
+        'air': ('high_shelf', 12000.0, 0.707, 6.0)
+    }
+
     def __init__(self, sample_rate: int):
         self.sample_rate = sample_rate
         self.settings = {
@@ -13,21 +24,29 @@ class AudioEnhancer:
             'presence': 0.4,
             'air': 0.2
         }
+        self.sos = None
+        self.zi = np.zeros((len(self.SECTIONS), 2))
+        self._settings_key = None
+
+    def _update_coefficients(self):
+        """Rebuild the biquad cascade only when settings change"""
+        key = tuple(float(self.settings.get(name, 0.0)) for name in self.SECTIONS)
+        if key == self._settings_key:
+            return
+
+        self.sos = np.vstack([
+            rbj_biquad(filter_type, freq, q, amount * max_gain, self.sample_rate)
+            for amount, (filter_type, freq, q, max_gain) in zip(key, self.SECTIONS.values())
+        ])
+        self._settings_key = key
+
+    def reset(self):
+        self.zi.fill(0)
+
+    def process(self, audio_data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply audio enhancement chain; ``out`` may be ``audio_data`` itself"""
+        self._update_coefficients()
 
-    def process(self, audio_data: np.ndarray) -> np.ndarray:
-        """Apply audio enhancement chain"""
-        audio_float = audio_data.astype(np.float32) / 32768.0
-        
-        # Apply clarity (high shelf boost)
-        if self.settings['clarity'] > 0:
-            b, a = signal.butter(2, 5000 / (self.sample_rate/2), btype='highshelf')
-            audio_float = signal.filtfilt(b, a, audio_float)
-        
-        # Add warmth (low shelf boost)
-        if self.settings['warmth'] > 0:
-            b, a = signal.butter(2, 200 / (self.sample_rate/2), btype='lowshelf')
-            audio_float = signal.filtfilt(b, a, audio_float)
-        
-        # Normalize and clip
-        audio_float = np.clip(audio_float * 32768.0, -32768, 32767)
-        return audio_float.astype(np.int16)
+        # One causal pass through the shelving/peaking cascade
+        enhanced, self.zi = signal.sosfilt(self.sos, to_float32(audio_data), zi=self.zi)
+        return match_format(enhanced, audio_data, out)
@@ -0,0 +1,39 @@
+import numpy as np
+from functools import lru_cache
+
+FILTER_TYPES = ('low_shelf', 'high_shelf', 'peaking')
+
+
+@lru_cache(maxsize=128)
+def rbj_biquad(filter_type: str, freq: float, q: float, gain_db: float,
+               sample_rate: int) -> np.ndarray:
+    """Design an RBJ cookbook biquad and return it as a single SOS row"""
+    if filter_type not in FILTER_TYPES:
+        raise ValueError(f"Unknown filter type: {filter_type}")
+
+    freq = min(freq, 0.45 * sample_rate)
+    a_gain = 10 ** (gain_db / 40)
+    w0 = 2 * np.pi * freq / sample_rate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2 * q)
+
+    if filter_type == 'peaking':
+        b = [1 + alpha * a_gain, -2 * cos_w0, 1 - alpha * a_gain]
+        a = [1 + alpha / a_gain, -2 * cos_w0, 1 - alpha / a_gain]
+    else:
+        sqrt_a = 2 * np.sqrt(a_gain) * alpha
+        sign = 1 if filter_type == 'low_shelf' else -1
+        b = [
+            a_gain * ((a_gain + 1) - sign * (a_gain - 1) * cos_w0 + sqrt_a),
+            sign * 2 * a_gain * ((a_gain - 1) - sign * (a_gain + 1) * cos_w0),
+            a_gain * ((a_gain + 1) - sign * (a_gain - 1) * cos_w0 - sqrt_a),
+        ]
+        a = [
+            (a_gain + 1) + sign * (a_gain - 1) * cos_w0 + sqrt_a,
+            -sign * 2 * ((a_gain - 1) + sign * (a_gain + 1) * cos_w0),
+            (a_gain + 1) + sign * (a_gain - 1) * cos_w0 - sqrt_a,
+        ]
+
+    sos = np.concatenate([b, a]) / a[0]
+    sos.flags.writeable = False
+    return sos
@@ -1,33 +1,97 @@
 import numpy as np
-import librosa
+from scipy import fft, signal
+from typing import Optional
 import logging
+from .sample_format import float_output, match_format, to_float32
 
 logger = logging.getLogger(__name__)
 
 class NoiseReducer:
-    def __init__(self, sample_rate: int):
+    """Streaming spectral-subtraction noise reducer.
+
+    Uses square-root Hann analysis and synthesis windows at 50% overlap, so
+    unmodified frames overlap-add back to the input exactly. Analysis and
+    overlap-add buffers persist across calls; the algorithmic latency is
+    ``frame_size`` samples.
+    """
+
+    def __init__(self, sample_rate: int, frame_size: int = 512,
+                 strength: float = 1.0, floor: float = 0.05):
         self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.hop_size = frame_size // 2
+        self.latency = frame_size
+        self.strength = strength
+        self.floor = floor
         self.noise_profile = None
         self.initialized = False
 
+        n_bins = frame_size // 2 + 1
+        self.window = np.sqrt(signal.windows.hann(frame_size, sym=False))
+        self._input = np.zeros(frame_size)
+        self._frame = np.empty(frame_size)
+        self._accumulator = np.zeros(frame_size)
+        self._output = np.zeros(self.hop_size)
+        self._magnitude = np.empty(n_bins)
+        self._gain = np.empty(n_bins)
+        self._rover = self.hop_size
+
+    def reset(self):
+        for buffer in (self._input, self._accumulator, self._output):
+            buffer.fill(0)
+        self._rover = self.hop_size
+
     def calibrate(self, noise_sample: np.ndarray):
         """Calibrate noise reduction using a sample of background noise"""
-        self.noise_profile = np.mean(np.abs(librosa.stft(noise_sample)), axis=1)
+        samples = to_float32(noise_sample)
+        if len(samples) < self.frame_size:
+            samples = np.pad(samples, (0, self.frame_size - len(samples)))
+
+        # Same frame size, hop and window as the streaming path
+        starts = np.arange(0, len(samples) - self.frame_size + 1, self.hop_size)
+        frames = samples[starts[:, np.newaxis] + np.arange(self.frame_size)] * self.window
+        self.noise_profile = np.mean(np.abs(fft.rfft(frames, axis=1)), axis=0)
+        self.reset()
         self.initialized = True
         logger.info("Noise profile calibrated")
 
-    def process(self, audio_data: np.ndarray) -> np.ndarray:
+    def _process_frame(self):
+        np.multiply(self._input, self.window, out=self._frame)
+        spectrum = fft.rfft(self._frame)
+
+        # Subtraction as a real gain keeps the phase without angle()/exp()
+        np.abs(spectrum, out=self._magnitude)
+        np.maximum(self._magnitude, 1e-12, out=self._magnitude)
+        np.divide(self.noise_profile, self._magnitude, out=self._gain)
+        self._gain *= -self.strength
+        self._gain += 1.0
+        np.maximum(self._gain, self.floor, out=self._gain)
+        spectrum *= self._gain
+
+        self._accumulator += fft.irfft(spectrum, n=self.frame_size) * self.window
+        self._output[:] = self._accumulator[:self.hop_size]
+        self._accumulator[:-self.hop_size] = self._accumulator[self.hop_size:]
+        self._accumulator[-self.hop_size:] = 0
+        self._input[:self.hop_size] = self._input[self.hop_size:]
+
+    def process(self, audio_data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Denoise a block; ``out`` may be ``audio_data`` itself"""
         if not self.initialized:
             return audio_data
 
-        # Compute STFT
-        stft = librosa.stft(audio_data)
-        mag = np.abs(stft)
-        phase = np.angle(stft)
-
-        # Apply noise reduction
-        mag = np.maximum(0, mag - self.noise_profile[:, np.newaxis])
-        
-        # Reconstruct signal
-        cleaned = librosa.istft(mag * np.exp(1j * phase))
-        return cleaned.astype(np.int16)
+        samples = to_float32(audio_data)
+        result = float_output(audio_data, out)
+        position = 0
+        while position < len(samples):
+            count = min(len(samples) - position, self.frame_size - self._rover)
+            read = self._rover - self.hop_size
+            self._input[self._rover:self._rover + count] = samples[position:position + count]
+            result[position:position + count] = self._output[read:read + count]
+            self._rover += count
+            position += count
+
+            if self._rover >= self.frame_size:
+                self._process_frame()
+                self._rover = self.hop_size
+
+        return match_format(result, audio_data, out)
@@ -0,0 +1,98 @@
+import numpy as np
+from scipy import fft
+from typing import Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PitchTracker:
+    """Streaming YIN pitch detector with FFT-based autocorrelation.
+
+    Blocks are appended to a persistent history, so lags longer than one
+    block are still measured. ``decimation`` runs the detector on a
+    box-filtered, downsampled copy of the input to cut its cost further.
+    ``process`` returns the pitch in Hz (0.0 when unvoiced) and a confidence
+    in [0, 1].
+    """
+
+    def __init__(self, sample_rate: int, fmin: float = 60.0, fmax: float = 1000.0,
+                 threshold: float = 0.15, decimation: int = 1):
+        self.sample_rate = sample_rate
+        self.decimation = max(1, int(decimation))
+        self.rate = sample_rate / self.decimation
+        self.threshold = threshold
+
+        self.min_lag = max(2, int(self.rate / fmax))
+        self.max_lag = int(np.ceil(self.rate / fmin))
+        self.integration = self.max_lag
+        self.frame_size = self.max_lag + self.integration
+        self.fft_size = fft.next_fast_len(self.frame_size + self.integration)
+
+        self._history = np.zeros(self.frame_size)
+        self._lags = np.arange(1, self.max_lag + 1)
+        self._remainder = np.zeros(0)
+
+    def reset(self):
+        self._history.fill(0)
+        self._remainder = np.zeros(0)
+
+    def _push(self, samples: np.ndarray):
+        if self.decimation > 1:
+            # Average groups of samples, carrying the leftover to the next block
+            if len(self._remainder):
+                samples = np.concatenate((self._remainder, samples))
+            usable = len(samples) - len(samples) % self.decimation
+            self._remainder = samples[usable:].copy()
+            samples = samples[:usable].reshape(-1, self.decimation).mean(axis=1)
+            if not len(samples):
+                return
+        count = min(len(samples), self.frame_size)
+        self._history[:-count] = self._history[count:]
+        self._history[-count:] = samples[-count:]
+
+    def _difference(self) -> np.ndarray:
+        """YIN difference function d(tau) for tau = 0..max_lag"""
+        frame = self._history
+        window = self.integration
+        spectrum = fft.rfft(frame, self.fft_size)
+        reference = fft.rfft(frame[:window], self.fft_size)
+        correlation = fft.irfft(spectrum * np.conj(reference), self.fft_size)[:self.max_lag + 1]
+
+        squares = np.concatenate(([0.0], np.cumsum(frame ** 2)))
+        energy_lagged = squares[window:window + self.max_lag + 1] - squares[:self.max_lag + 1]
+        return squares[window] + energy_lagged - 2 * correlation
+
+    def process(self, samples: np.ndarray) -> Tuple[float, float]:
+        """Add a float block and estimate the pitch of the latest frame"""
+        self._push(samples)
+        difference = self._difference()
+
+        # Cumulative mean normalized difference
+        cumulative = np.cumsum(difference[1:])
+        normalized = np.ones(self.max_lag + 1)
+        valid = cumulative > 0
+        normalized[1:][valid] = difference[1:][valid] * self._lags[valid] / cumulative[valid]
+
+        search = normalized[self.min_lag:]
+        below = np.flatnonzero(search < self.threshold)
+        if len(below):
+            lag = below[0] + self.min_lag
+            # Walk down to the bottom of this dip
+            while lag + 1 <= self.max_lag and normalized[lag + 1] < normalized[lag]:
+                lag += 1
+        else:
+            lag = int(np.argmin(search)) + self.min_lag
+
+        confidence = float(np.clip(1.0 - normalized[lag], 0.0, 1.0))
+        if confidence < 1.0 - 2 * self.threshold:
+            return 0.0, confidence
+
+        # Parabolic interpolation around the minimum
+        refined = float(lag)
+        if 0 < lag < self.max_lag:
+            left, centre, right = normalized[lag - 1:lag + 2]
+            denominator = left - 2 * centre + right
+            if denominator > 0:
+                refined += 0.5 * (left - right) / denominator
+        return self.rate / refined, confidence
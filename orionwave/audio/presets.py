@@ -17,7 +17,7 @@ class PresetManager:
         defaults = {
             "natural": {
                 "effects": [
-                    ("eq", {"low": 1.1, "mid": 1.0, "high": 1.05})
+                    ("equalizer", {"bands": {"low": 1.1, "mid": 1.0, "high": 1.05}})
                 ]
             },
             "robot": {
@@ -29,7 +29,7 @@ class PresetManager:
             "high_pitch": {
                 "effects": [
                     ("pitch_shift", {"shift": 300}),
-                    ("compression", {"threshold": 0.5})
+                    ("compressor", {"threshold": 0.5})
                 ]
             }
         }
@@ -1,8 +1,8 @@
 import numpy as np
 from typing import Dict, List, Optional
-import sounddevice as sd
 import logging
 from dataclasses import dataclass
+from .sample_format import match_format, to_float32
 
 logger = logging.getLogger(__name__)
 
@@ -41,9 +41,7 @@ class AudioRouter:
     def process_routing(self, audio_data: np.ndarray, source: str) -> Dict[str, np.ndarray]:
         """Process audio through routing matrix"""
         output_buffers = {}
-        
-        # Normalize audio
-        audio_float = audio_data.astype(np.float32) / 32768.0
+        audio_float = to_float32(audio_data)
 
         # Route audio to destinations
         for route in self.routes:
@@ -58,10 +56,9 @@ class AudioRouter:
                 else:
                     output_buffers[route.destination] += processed
 
-        # Convert back to int16 for output
+        # Same sample format as the input (int16 PCM only for int16 input)
         for dest in output_buffers:
-            output_buffers[dest] = np.clip(output_buffers[dest] * 32768.0, 
-                                         -32768, 32767).astype(np.int16)
+            output_buffers[dest] = match_format(output_buffers[dest], audio_data)
 
         return output_buffers
 
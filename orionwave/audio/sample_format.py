@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Optional
+
+# Internally audio is float32 in [-1, 1). int16 PCM only appears at the
+# device and file boundaries, where BlockConverter translates it.
+PCM_SCALE = 32768.0
+
+
+def to_float32(data: np.ndarray) -> np.ndarray:
+    """Scale int16 PCM to float32; float32 input is returned as is (no copy)"""
+    if data.dtype == np.int16:
+        return np.multiply(data, np.float32(1.0 / PCM_SCALE), dtype=np.float32)
+    return np.asarray(data, dtype=np.float32)
+
+
+def to_int16(samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Scale float samples to clipped int16 PCM"""
+    scaled = np.multiply(samples, PCM_SCALE, dtype=np.float32)
+    np.clip(scaled, -PCM_SCALE, PCM_SCALE - 1, out=scaled)
+    if out is None:
+        return scaled.astype(np.int16)
+    np.copyto(out, scaled, casting='unsafe')
+    return out
+
+
+def float_output(data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Buffer an effect can write its float32 result into.
+
+    That is ``out`` itself when the result needs no further conversion,
+    otherwise a new array that :func:`match_format` converts afterwards.
+    """
+    if out is not None and out.dtype == np.float32 and data.dtype != np.int16:
+        return out
+    return np.empty(len(data), dtype=np.float32)
+
+
+def match_format(samples: np.ndarray, like: np.ndarray,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return float ``samples`` in the sample format of ``like``.
+
+    int16 input gets int16 PCM back, float input its own dtype. With ``out``
+    the result is written there; otherwise ``samples`` may be returned as is.
+    """
+    if like.dtype == np.int16:
+        return to_int16(samples, out)
+    if out is None:
+        return samples if samples.dtype == like.dtype else samples.astype(like.dtype)
+    if out is not samples:
+        np.copyto(out, samples, casting='same_kind')
+    return out
+
+
+class BlockConverter:
+    """Preallocated int16 <-> float32 conversion for the device boundary.
+
+    Both directions write into buffers owned by the converter, so a block
+    costs no allocations. The returned arrays are only valid until the next
+    call in the same direction.
+    """
+
+    def __init__(self, block_size: int = 0):
+        self._samples = np.zeros(block_size, dtype=np.float32)
+        self._scaled = np.zeros(block_size, dtype=np.float32)
+        self._pcm = np.zeros(block_size, dtype=np.int16)
+
+    def to_float(self, pcm: np.ndarray) -> np.ndarray:
+        if len(pcm) != len(self._samples):
+            self._samples = np.empty(len(pcm), dtype=np.float32)
+        np.multiply(pcm, np.float32(1.0 / PCM_SCALE), out=self._samples, dtype=np.float32)
+        return self._samples
+
+    def to_pcm(self, samples: np.ndarray) -> np.ndarray:
+        if len(samples) != len(self._pcm):
+            self._scaled = np.empty(len(samples), dtype=np.float32)
+            self._pcm = np.empty(len(samples), dtype=np.int16)
+        np.multiply(samples, PCM_SCALE, out=self._scaled, casting='same_kind')
+        np.clip(self._scaled, -PCM_SCALE, PCM_SCALE - 1, out=self._scaled)
+        np.copyto(self._pcm, self._scaled, casting='unsafe')
+        return self._pcm
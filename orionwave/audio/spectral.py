@@ -0,0 +1,64 @@
+import numpy as np
+from scipy import fft, signal
+from dataclasses import dataclass
+from typing import Dict, Tuple
+import logging
+from .sample_format import to_float32
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SpectralContext:
+    """Per-block analysis shared by the analyzers and the VAD"""
+    samples: np.ndarray       # float32 view scaled to [-1, 1)
+    spectrum: np.ndarray      # rFFT of the detrended, Hann-windowed block
+    power: np.ndarray         # one-sided power spectrum ('spectrum' scaling)
+    frequencies: np.ndarray
+    energy: float             # mean square
+    rms: float
+
+    @property
+    def dominant_frequency(self) -> float:
+        return float(self.frequencies[np.argmax(self.power)])
+
+
+class SpectralContextBuilder:
+    """Computes a SpectralContext once per block with cached windows"""
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._geometry: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _get_geometry(self, length: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        geometry = self._geometry.get(length)
+        if geometry is None:
+            window = signal.windows.hann(length).astype(np.float32)
+            frequencies = fft.rfftfreq(length, 1 / self.sample_rate)
+            # Same scaling as signal.spectrogram(..., scaling='spectrum')
+            scale = np.full(len(frequencies), 2.0 / np.sum(window) ** 2)
+            scale[0] /= 2
+            if length % 2 == 0:
+                scale[-1] /= 2
+            geometry = (window, frequencies, scale)
+            self._geometry[length] = geometry
+        return geometry
+
+    def build(self, block: np.ndarray) -> SpectralContext:
+        samples = to_float32(block)
+
+        window, frequencies, scale = self._get_geometry(len(samples))
+        # Remove DC before windowing, like signal.spectrogram's default detrend
+        spectrum = fft.rfft((samples - samples.mean()) * window)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        power *= scale
+
+        energy = float(np.dot(samples, samples) / max(len(samples), 1))
+        return SpectralContext(
+            samples=samples,
+            spectrum=spectrum,
+            power=power,
+            frequencies=frequencies,
+            energy=energy,
+            rms=float(np.sqrt(energy))
+        )
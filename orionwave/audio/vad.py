@@ -1,36 +1,149 @@
 import numpy as np
-from scipy import signal
 import logging
+from typing import Optional
+from .sample_format import to_float32
+from .spectral import SpectralContext
 
 logger = logging.getLogger(__name__)
 
 class VoiceActivityDetector:
-    def __init__(self, sample_rate: int):
+    """Voice activity detector with attack/hangover smoothing.
+
+    The default ``'energy'`` backend compares each block's energy with an O(1)
+    running mean of recent blocks and, when that passes, checks that the
+    block's zero-crossing rate falls in the speech band, which needs no FFT
+    on the audio thread. Given a shared spectrum, the share of power in the
+    speech band is checked instead. ``'webrtc'`` uses the optional
+    ``webrtcvad`` package. Either raw decision is smoothed:
+    speech must last ``attack_frames`` blocks to switch on and stays on for
+    ``hangover_frames`` blocks after it stops.
+    """
+
+    WEBRTC_RATES = (8000, 16000, 32000, 48000)
+
+    def __init__(self, sample_rate: int, backend: str = 'energy',
+                 attack_frames: int = 2, hangover_frames: int = 8,
+                 aggressiveness: int = 2, min_rms: float = 0.1,
+                 speech_band: tuple = (80.0, 4000.0), band_ratio: float = 0.5):
         self.sample_rate = sample_rate
         self.energy_threshold = 0.1
-        self.freq_threshold = 0.2
+        self.min_energy = min_rms ** 2
+        self.speech_band = speech_band
+        self.band_ratio = band_ratio
+        self.attack_frames = attack_frames
+        self.hangover_frames = hangover_frames
         self.history_size = 10
-        self.energy_history = []
 
-    def is_speech(self, frame: np.ndarray) -> bool:
+        # Running mean over a fixed ring of recent energies
+        self.energy_history = np.zeros(self.history_size)
+        self._history_index = 0
+        self._history_count = 0
+        self._energy_sum = 0.0
+
+        self._active = False
+        self._speech_run = 0
+        self._silence_run = 0
+        # Lifetime decision counts, for the duty cycle; reset() keeps them
+        self.frames = 0
+        self.active_frames = 0
+
+        self.backend = 'energy'
+        self._webrtc = None
+        if backend == 'webrtc':
+            self._init_webrtc(aggressiveness)
+        elif backend != 'energy':
+            raise ValueError(f"Unknown VAD backend: {backend}")
+
+    def _init_webrtc(self, aggressiveness: int):
+        try:
+            import webrtcvad
+        except ImportError:
+            logger.warning("webrtcvad not installed, using energy VAD")
+            return
+        self._webrtc = webrtcvad.Vad(aggressiveness)
+        self.backend = 'webrtc'
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def is_speech_fast(self, energy: float) -> bool:
+        """Energy-only decision cheap enough for the audio callback"""
+        # O(1) running-sum update
+        self._energy_sum += energy - self.energy_history[self._history_index]
+        self.energy_history[self._history_index] = energy
+        self._history_index = (self._history_index + 1) % self.history_size
+        self._history_count = min(self._history_count + 1, self.history_size)
+
+        mean_energy = self._energy_sum / self._history_count
+        return energy > self.min_energy and energy > mean_energy * self.energy_threshold
+
+    def _has_speech_spectrum(self, context: SpectralContext) -> bool:
+        total = np.sum(context.power)
+        if total <= 0:
+            return False
+        low, high = np.searchsorted(context.frequencies, self.speech_band)
+        return np.sum(context.power[low:high]) >= self.band_ratio * total
+
+    def _has_speech_crossings(self, samples: np.ndarray) -> bool:
+        # Zero crossings per second, halved, follow the frequency holding most of the power
+        signs = np.signbit(samples)
+        crossings = np.count_nonzero(signs[1:] != signs[:-1])
+        frequency = crossings * self.sample_rate / (2 * max(len(samples) - 1, 1))
+        return self.speech_band[0] <= frequency <= self.speech_band[1]
+
+    def _webrtc_decision(self, frame: np.ndarray) -> bool:
+        from scipy import signal
+
+        samples = frame if frame.dtype == np.int16 else np.clip(frame * 32768.0, -32768, 32767)
+        rate = self.sample_rate
+        if rate not in self.WEBRTC_RATES:
+            samples = signal.resample_poly(samples.astype(np.float32), 160, rate // 100)
+            rate = 16000
+        pcm = np.asarray(samples, dtype=np.int16)
+
+        # webrtcvad accepts 10/20/30 ms frames
+        step = rate // 100
+        votes = [
+            self._webrtc.is_speech(pcm[i:i + step].tobytes(), rate)
+            for i in range(0, len(pcm) - step + 1, step)
+        ]
+        return bool(votes) and sum(votes) * 2 >= len(votes)
+
+    def _smooth(self, raw: bool) -> bool:
+        if raw:
+            self._speech_run += 1
+            self._silence_run = 0
+            if self._speech_run >= self.attack_frames:
+                self._active = True
+        else:
+            self._speech_run = 0
+            self._silence_run += 1
+            if self._silence_run > self.hangover_frames:
+                self._active = False
+        self.frames += 1
+        self.active_frames += self._active
+        return self._active
+
+    def reset(self):
+        self.energy_history.fill(0)
+        self._history_index = 0
+        self._history_count = 0
+        self._energy_sum = 0.0
+        self._active = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+    def is_speech(self, frame: np.ndarray, context: Optional[SpectralContext] = None) -> bool:
         """Detect if frame contains speech"""
-        # Normalize
-        frame = frame.astype(float) / np.iinfo(np.int16).max
-        
-        # Energy detection
-        energy = np.sum(frame ** 2) / len(frame)
-        self.energy_history.append(energy)
-        if len(self.energy_history) > self.history_size:
-            self.energy_history.pop(0)
-        
-        # Frequency analysis
-        freqs, psd = signal.welch(frame, self.sample_rate)
-        dom_freq = freqs[np.argmax(psd)]
-        
-        # Combined decision
-        is_active = (
-            energy > np.mean(self.energy_history) * self.energy_threshold and
-            50 < dom_freq < 400
-        )
-        
-        return is_active
+        if self._webrtc is not None:
+            return self._smooth(self._webrtc_decision(frame))
+
+        if context is not None:
+            raw = self.is_speech_fast(context.energy) and self._has_speech_spectrum(context)
+            return self._smooth(raw)
+
+        samples = to_float32(frame)
+        energy = float(np.dot(samples, samples)) / max(len(samples), 1)
+        raw = self.is_speech_fast(energy) and self._has_speech_crossings(samples)
+        return self._smooth(raw)
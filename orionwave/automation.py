@@ -1,90 +1,155 @@
 import numpy as np
-from typing import Dict, Any, Callable
 import threading
-import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+CURVES = ('linear', 'exponential', 'breakpoint')
+
+# Shape of the 'exponential' curve; normalized so it still ends on the target
+EXPONENTIAL_RATE = 5.0
+
+
+def build_envelope(sample_rate: int, start_value: float = 0.0, end_value: float = 0.0,
+                   duration: float = 0.0, curve: str = 'linear',
+                   points: Optional[Sequence[Tuple[float, float]]] = None) -> np.ndarray:
+    """Precompute a read-only per-sample float32 envelope.
+
+    ``points`` are ``(seconds, value)`` pairs for the ``'breakpoint'`` curve,
+    interpolated linearly; the other curves run from ``start_value`` to
+    ``end_value`` over ``duration`` seconds.
+    """
+    if curve not in CURVES:
+        raise ValueError(f"Unknown automation curve: {curve}")
+
+    if curve == 'breakpoint':
+        if not points:
+            raise ValueError("Breakpoint automation needs at least one point")
+        times, values = np.asarray(sorted(points), dtype=np.float64).T
+        length = max(1, int(round(times[-1] * sample_rate)))
+        envelope = np.interp(np.arange(1, length + 1), times * sample_rate, values)
+    else:
+        length = max(1, int(round(duration * sample_rate)))
+        progress = np.arange(1, length + 1) / length
+        if curve == 'exponential':
+            progress = (1 - np.exp(-EXPONENTIAL_RATE * progress)) / (1 - np.exp(-EXPONENTIAL_RATE))
+        envelope = start_value + (end_value - start_value) * progress
+
+    envelope = envelope.astype(np.float32)
+    envelope.flags.writeable = False
+    return envelope
+
+
+@dataclass(frozen=True)
+class AutomationLane:
+    id: int
+    key: Hashable
+    envelope: np.ndarray
+    layout: int = 0
+
+    @property
+    def end_value(self) -> float:
+        return float(self.envelope[-1])
+
+
 class ParameterAutomation:
-    def __init__(self):
-        self.automations: Dict[str, Dict[str, Any]] = {}
-        self._running = False
-        self._thread = None
-        self._lock = threading.Lock()
-
-    def add_automation(self, param_name: str, 
-                      start_value: float,
-                      end_value: float,
-                      duration: float,
-                      curve: str = 'linear',
-                      callback: Callable = None):
-        """Add parameter automation"""
-        with self._lock:
-            self.automations[param_name] = {
-                'start_value': start_value,
-                'end_value': end_value,
-                'duration': duration,
-                'start_time': time.time(),
-                'curve': curve,
-                'callback': callback
-            }
-        
-        if not self._running:
-            self._start_automation_thread()
-
-    def _start_automation_thread(self):
-        self._running = True
-        self._thread = threading.Thread(target=self._automation_loop)
-        self._thread.daemon = True
-        self._thread.start()
-
-    def _automation_loop(self):
-        while self._running:
-            current_time = time.time()
-            
-            with self._lock:
-                completed = []
-                for param_name, auto in self.automations.items():
-                    progress = (current_time - auto['start_time']) / auto['duration']
-                    
-                    if progress >= 1.0:
-                        if auto['callback']:
-                            auto['callback'](param_name, auto['end_value'])
-                        completed.append(param_name)
-                        continue
-
-                    # Calculate current value based on curve
-                    if auto['curve'] == 'exponential':
-                        value = self._exponential_interpolate(
-                            auto['start_value'],
-                            auto['end_value'],
-                            progress
-                        )
-                    else:  # linear
-                        value = self._linear_interpolate(
-                            auto['start_value'],
-                            auto['end_value'],
-                            progress
-                        )
-
-                    if auto['callback']:
-                        auto['callback'](param_name, value)
-
-                # Remove completed automations
-                for param_name in completed:
-                    del self.automations[param_name]
-
-                if not self.automations:
-                    self._running = False
-                    break
-
-            time.sleep(0.016)  # ~60 fps
-
-    @staticmethod
-    def _linear_interpolate(start: float, end: float, progress: float) -> float:
-        return start + (end - start) * progress
-
-    @staticmethod
-    def _exponential_interpolate(start: float, end: float, progress: float) -> float:
-        return start + (end - start) * (1 - np.exp(-5 * progress))
+    """Sample-accurate automation evaluated inside the audio block.
+
+    Control threads publish lanes with precomputed envelopes by swapping a
+    tuple; the audio thread picks up new lanes at the start of its next
+    block and slices every active envelope in :meth:`process`. There is no
+    polling thread and no callback, so the cost is a slice per active lane
+    per block. A newer lane for the same key replaces the older one.
+    """
+
+    def __init__(self, sample_rate: int = 44100):
+        self.sample_rate = sample_rate
+        self.position = 0  # Samples processed so far (audio thread)
+
+        # Written by control threads only
+        self._published: Tuple[AutomationLane, ...] = ()
+        self._next_id = 1
+        self._write_lock = threading.Lock()
+
+        # Owned by the audio thread
+        self._consumed = 0
+        self._active: Dict[Hashable, Tuple[AutomationLane, int]] = {}
+        self._buffers: Dict[Hashable, np.ndarray] = {}
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for lane in self._published if lane.id > self._consumed)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._active) or self.pending > 0
+
+    def add_lane(self, key: Hashable, envelope: np.ndarray, layout: int = 0) -> AutomationLane:
+        with self._write_lock:
+            lane = AutomationLane(self._next_id, key, envelope, layout)
+            self._next_id += 1
+            # Lanes the audio thread has already taken over need not stay published
+            consumed = self._consumed
+            self._published = tuple(
+                published for published in self._published if published.id > consumed
+            ) + (lane,)
+        return lane
+
+    def add_automation(self, key: Hashable, start_value: float, end_value: float,
+                       duration: float, curve: str = 'linear', layout: int = 0) -> AutomationLane:
+        """Ramp ``key`` from ``start_value`` to ``end_value`` over ``duration`` seconds"""
+        envelope = build_envelope(self.sample_rate, start_value, end_value, duration, curve)
+        return self.add_lane(key, envelope, layout)
+
+    def add_breakpoints(self, key: Hashable, points: Sequence[Tuple[float, float]],
+                        layout: int = 0) -> AutomationLane:
+        """Follow ``(seconds, value)`` breakpoints, starting with the next block"""
+        envelope = build_envelope(self.sample_rate, curve='breakpoint', points=points)
+        return self.add_lane(key, envelope, layout)
+
+    def _activate(self, published: Tuple[AutomationLane, ...], layout: int):
+        for lane in published:
+            if lane.id <= self._consumed:
+                continue
+            if lane.layout == layout:
+                self._active[lane.key] = (lane, self.position)
+            self._consumed = lane.id
+
+    def process(self, count: int, layout: int = 0) -> Dict[Hashable, np.ndarray]:
+        """Per-sample values of every automated key for the next ``count`` samples.
+
+        Lanes compiled for another chain ``layout`` are dropped. A lane that
+        ends inside the block holds its last value to the end of it. The
+        returned arrays are reused and only valid until the next call.
+        """
+        published = self._published
+        if published and published[-1].id > self._consumed:
+            self._activate(published, layout)
+        if not self._active:
+            self.position += count
+            return {}
+
+        values = {}
+        finished: List[Hashable] = []
+        for key, (lane, start) in self._active.items():
+            if lane.layout != layout:
+                finished.append(key)
+                continue
+            buffer = self._buffers.get(key)
+            if buffer is None or len(buffer) != count:
+                buffer = self._buffers[key] = np.empty(count, dtype=np.float32)
+
+            offset = self.position - start
+            segment = lane.envelope[offset:offset + count]
+            buffer[:len(segment)] = segment
+            buffer[len(segment):] = lane.envelope[-1]
+            values[key] = buffer
+            if offset + count >= len(lane.envelope):
+                finished.append(key)
+
+        for key in finished:
+            del self._active[key]
+        self.position += count
+        return values
@@ -1,8 +1,8 @@
 import argparse
 import logging
 import sys
-from .config import AudioConfig
-from .processor import VoiceProcessor
+import time
+from .config import AudioConfig, INFERENCE_BACKENDS
 
 def setup_logging():
     logging.basicConfig(
@@ -10,6 +10,81 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+def load_enhancement_model(weights: str = None):
+    import torch
+    from .effects.neural_enhancer import EnhancementModel
+
+    torch.manual_seed(0)  # Reproducible stand-in when no weights are given
+    model = EnhancementModel()
+    if weights:
+        model.load_state_dict(torch.load(weights, map_location='cpu'))
+    return model.eval()
+
+def export_model(args) -> int:
+    """Build, export and reload a backend, then check it against eager"""
+    from .effects.inference import build_backend, load_backend, parity_error
+
+    logger = logging.getLogger(__name__)
+    calibration = None
+    if args.calibration:
+        import soundfile as sf
+        calibration, _ = sf.read(args.calibration, dtype='float32', always_2d=True)
+        calibration = calibration[:, 0]
+
+    model = load_enhancement_model(args.weights)
+    backend = build_backend(args.backend, model, calibration)
+    backend.export(args.output)
+    error = parity_error(load_backend(args.backend, args.output), model)
+
+    logger.info(f"Exported {args.backend} model to {args.output} (max error {error:.2e})")
+    if error > args.tolerance:
+        logger.error(f"Parity check failed: {error:.2e} > tolerance {args.tolerance:.2e}")
+        return 1
+    return 0
+
+def bench_model(args) -> int:
+    """Print per-block latency and parity for each inference backend"""
+    from .effects.inference import benchmark_backends
+
+    config = AudioConfig.from_yaml(args.config) if args.config else AudioConfig()
+    block_size = args.block_size or config.CHUNK
+    budget_ms = 1000.0 * block_size / config.RATE
+    results = benchmark_backends(
+        load_enhancement_model(args.weights), block_size, args.blocks,
+        backends=args.backend or INFERENCE_BACKENDS, num_threads=args.threads
+    )
+
+    print(f"block={block_size} rate={config.RATE} threads={args.threads} budget={budget_ms:.2f} ms")
+    for name, stats in results.items():
+        print(f"{name:14s} {stats['mean_ms']:8.4f} ms/block  p95 {stats['p95_ms']:8.4f} ms  "
+              f"{100 * stats['mean_ms'] / budget_ms:6.2f}% of budget  max error {stats['max_error']:.2e}")
+    return 0
+
+def render(args) -> int:
+    """Render files or directories through an effect chain faster than real time"""
+    from .render import parse_effect, render_files
+
+    logger = logging.getLogger(__name__)
+    config = AudioConfig.from_yaml(args.config) if args.config else AudioConfig()
+    try:
+        chain = [parse_effect(spec) for spec in args.effects or ()]
+    except ValueError as e:
+        logger.error(f"Invalid effect: {e}")
+        return 2
+    if not chain and not args.preset:
+        logger.error("Give a --preset or at least one --effect")
+        return 2
+
+    try:
+        stats = render_files(args.inputs, args.output, config, chain, args.preset, args.jobs)
+    except ValueError as e:
+        logger.error(f"Invalid effect chain: {e}")
+        return 2
+    print(f"{stats['files']} files ({stats['failed']} failed) on {stats['jobs']} workers: "
+          f"{stats['duration']:.1f} s of audio in {stats['elapsed']:.2f} s, "
+          f"RTF {stats['rtf']:.4f} ({stats['throughput']:.1f}x real time)")
+    return 1 if stats['failed'] else 0
+
 def main():
     setup_logging()
     logger = logging.getLogger(__name__)
@@ -21,18 +96,58 @@ def main():
                        help='Voice effect to apply')
     parser.add_argument('--shift', type=int, default=200,
                        help='Pitch shift amount (for pitch_shift effect)')
-    
+
+    subparsers = parser.add_subparsers(dest='command')
+    export_parser = subparsers.add_parser('export-model', help='Export the enhancement model for a backend')
+    export_parser.add_argument('--backend', choices=INFERENCE_BACKENDS, required=True)
+    export_parser.add_argument('--output', type=str, required=True, help='Artifact path')
+    export_parser.add_argument('--weights', type=str, help='Eager state dict to start from')
+    export_parser.add_argument('--calibration', type=str,
+                               help='Audio file used to calibrate static int8 quantization')
+    export_parser.add_argument('--tolerance', type=float, default=0.02,
+                               help='Maximum allowed difference from eager output')
+
+    bench_parser = subparsers.add_parser('bench-model', help='Benchmark enhancement model backends')
+    bench_parser.add_argument('--backend', choices=INFERENCE_BACKENDS, action='append',
+                              help='Backend to include (repeatable, default: all)')
+    bench_parser.add_argument('--weights', type=str, help='Eager state dict to benchmark')
+    bench_parser.add_argument('--blocks', type=int, default=500)
+    bench_parser.add_argument('--block-size', type=int, help='Samples per block (default: CHUNK)')
+    bench_parser.add_argument('--threads', type=int, default=1)
+
+    render_parser = subparsers.add_parser('render', help='Process audio files offline')
+    render_parser.add_argument('inputs', nargs='+', help='Audio files or directories')
+    render_parser.add_argument('--output', type=str, required=True, help='Output directory')
+    render_parser.add_argument('--preset', type=str, help='Preset to apply')
+    render_parser.add_argument('--effect', dest='effects', action='append',
+                               help='Effect as name or name:key=value,... (repeatable, applied in order)')
+    render_parser.add_argument('--jobs', type=int, help='Worker processes (default: available cores)')
+
     args = parser.parse_args()
 
+    if args.command == 'export-model':
+        sys.exit(export_model(args))
+    if args.command == 'bench-model':
+        sys.exit(bench_model(args))
+    if args.command == 'render':
+        sys.exit(render(args))
+
+    from .processor import VoiceProcessor
+
+    processor = None
     try:
         config = AudioConfig.from_yaml(args.config) if args.config else AudioConfig()
         processor = VoiceProcessor(config)
+        if args.effect == 'pitch_shift':
+            processor.add_effect('pitch_shift', {'shift': args.shift})
+        else:
+            processor.add_effect('robot')
         processor.initialize_streams()
 
         logger.info(f"Starting voice changer with {args.effect} effect...")
+        # Audio is processed in the stream callback
         while True:
-            effect_args = {'shift': args.shift} if args.effect == 'pitch_shift' else {}
-            processor.process_audio(effect=args.effect, **effect_args)
+            time.sleep(0.5)
 
     except KeyboardInterrupt:
         logger.info("Stopping voice changer...")
@@ -40,7 +155,8 @@ def main():
         logger.error(f"Error: {e}")
         sys.exit(1)
     finally:
-        processor.cleanup()
+        if processor is not None:
+            processor.cleanup()
 
 if __name__ == '__main__':
     main()
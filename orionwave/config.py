@@ -2,6 +2,9 @@ import yaml
 from dataclasses import dataclass
 from typing import Dict, Any
 
+# Values accepted for EFFECTS.neural_enhancer.backend
+INFERENCE_BACKENDS = ('eager', 'torchscript', 'dynamic_int8', 'static_int8', 'onnx')
+
 @dataclass
 class AudioConfig:
     CHUNK: int = 1024
@@ -5,7 +5,9 @@ from .basic import (
     apply_compression,
     apply_eq
 )
-from .neural_enhancer import NeuralEnhancer
+from .eq import StreamingEQ
+from .pitch import PhaseVocoderPitchShifter, WSOLAPitchShifter
+from .reverb import ConvolutionReverb, PartitionedConvolver
 
 __all__ = [
     'apply_pitch_shift',
@@ -13,5 +15,18 @@ __all__ = [
     'apply_reverb',
     'apply_compression',
     'apply_eq',
+    'StreamingEQ',
+    'PhaseVocoderPitchShifter',
+    'WSOLAPitchShifter',
+    'ConvolutionReverb',
+    'PartitionedConvolver',
     'NeuralEnhancer'
 ]
+
+
+def __getattr__(name):
+    # NeuralEnhancer needs torch; only import it when asked for
+    if name == 'NeuralEnhancer':
+        from .neural_enhancer import NeuralEnhancer
+        return NeuralEnhancer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,31 +1,35 @@
 import numpy as np
 from scipy import signal
 import warnings
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional
+from .reverb import ConvolutionReverb
+from ..audio.sample_format import float_output, match_format, to_float32
 
 # Suppress warnings
 warnings.filterwarnings("ignore", message="path is deprecated")
 
-def apply_pitch_shift(data: np.ndarray, config: Any, shift: int = 200) -> np.ndarray:
+def apply_pitch_shift(data: np.ndarray, config: Any, shift: int = 200,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
     """Apply pitch shifting to audio data"""
     try:
         import librosa
-        return _apply_pitch_shift_librosa(data, config, shift)
+        shifted = _apply_pitch_shift_librosa(to_float32(data), config, shift)
     except ImportError:
-        return _apply_pitch_shift_basic(data, config, shift)
+        shifted = _apply_pitch_shift_basic(to_float32(data), config, shift)
+    return match_format(shifted, data, out)
 
 def _apply_pitch_shift_librosa(data: np.ndarray, config: Any, shift: int) -> np.ndarray:
     """Pitch shift using librosa if available"""
+    import librosa
+
     # Store original length
     original_length = len(data)
     
     try:
-        # Convert to float32 for processing
-        audio_float = data.astype(np.float32) / 32768.0
-        
         # Apply pitch shift
         shifted = librosa.effects.pitch_shift(
-            audio_float,
+            data,
             sr=config.RATE,
             n_steps=shift/100,
             res_type='kaiser_fast'
@@ -37,7 +41,7 @@ def _apply_pitch_shift_librosa(data: np.ndarray, config: Any, shift: int) -> np.
         elif len(shifted) < original_length:
             shifted = np.pad(shifted, (0, original_length - len(shifted)))
         
-        return np.clip(shifted * 32768.0, -32768, 32767).astype(np.int16)
+        return shifted
     except Exception as e:
         warnings.warn(f"Librosa pitch shift failed: {e}, falling back to basic method")
         return _apply_pitch_shift_basic(data, config, shift)
@@ -63,31 +67,45 @@ def _apply_pitch_shift_basic(data: np.ndarray, config: Any, shift: int) -> np.nd
     elif len(result) < len(data):
         result = np.pad(result, (0, len(data) - len(result)))
     
-    return result.astype(np.int16)
+    return result
+
+@lru_cache(maxsize=16)
+def _robot_carrier(length: int, sample_rate: int, frequency: float) -> np.ndarray:
+    t = np.arange(length) / sample_rate
+    carrier = (0.5 + 0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+    carrier.flags.writeable = False
+    return carrier
 
-def apply_robot_effect(data: np.ndarray, config: Any, frequency: float = 50) -> np.ndarray:
+def apply_robot_effect(data: np.ndarray, config: Any, frequency: float = 50,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
     """Apply robot-like modulation effect"""
-    t = np.arange(len(data)) / config.RATE
-    carrier = np.sin(2 * np.pi * frequency * t)
-    # Ensure modulation has an effect
-    modulated = (data.astype(np.float32) * (0.5 + 0.5 * carrier))
-    return np.clip(modulated, -32768, 32767).astype(np.int16)
+    carrier = _robot_carrier(len(data), config.RATE, frequency)
+    result = float_output(data, out)
+    np.multiply(to_float32(data), carrier, out=result)
+    return match_format(result, data, out)
 
-def apply_reverb(data: np.ndarray, config: Any, room_size: float = 0.8) -> np.ndarray:
-    """Apply reverb effect"""
-    reverb_time = int(room_size * config.RATE)
-    impulse_response = np.exp(-3 * np.arange(reverb_time) / reverb_time)
-    reverbed = signal.convolve(data, impulse_response, mode='same')
-    return (reverbed * 0.6).astype(np.int16)
+def apply_reverb(data: np.ndarray, config: Any, room_size: float = 0.8, mix: float = 0.6,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply reverb to a single block (use ConvolutionReverb to keep the tail)"""
+    reverb = ConvolutionReverb(config.RATE, len(data))
+    return reverb.process(data, room_size=room_size, mix=mix, out=out)
 
-def apply_compression(data: np.ndarray, config: Any, threshold: float = 0.5, ratio: float = 4.0) -> np.ndarray:
+def apply_compression(data: np.ndarray, config: Any, threshold: float = 0.5, ratio: float = 4.0,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
     """Apply dynamic range compression"""
-    data_float = data.astype(np.float32) / 32768.0
-    mask = np.abs(data_float) > threshold
-    data_float[mask] = (threshold + (np.abs(data_float[mask]) - threshold) / ratio) * np.sign(data_float[mask])
-    return (data_float * 32768).astype(np.int16)
+    samples = to_float32(data)
+    result = float_output(data, out)
+    # Above the threshold, scale the excess by 1/ratio: |y| = t + (|x| - t) / ratio
+    np.abs(samples, out=result)
+    np.maximum(result, threshold, out=result)
+    result -= threshold
+    result *= 1.0 - 1.0 / ratio
+    np.copysign(result, samples, out=result)
+    np.subtract(samples, result, out=result)
+    return match_format(result, data, out)
 
-def apply_eq(data: np.ndarray, config: Any, bands: Dict[str, float] = None) -> np.ndarray:
+def apply_eq(data: np.ndarray, config: Any, bands: Dict[str, float] = None,
+             out: Optional[np.ndarray] = None) -> np.ndarray:
     """Apply three-band equalizer"""
     if bands is None:
         bands = {'low': 1.0, 'mid': 1.0, 'high': 1.0}
@@ -99,8 +117,9 @@ def apply_eq(data: np.ndarray, config: Any, bands: Dict[str, float] = None) -> n
     b2, a2 = signal.butter(2, [low_cut/nyquist, mid_cut/nyquist], btype='bandpass')
     b3, a3 = signal.butter(2, mid_cut/nyquist, btype='highpass')
 
-    low = signal.filtfilt(b1, a1, data) * bands['low']
-    mid = signal.filtfilt(b2, a2, data) * bands['mid']
-    high = signal.filtfilt(b3, a3, data) * bands['high']
+    samples = to_float32(data)
+    low = signal.filtfilt(b1, a1, samples) * bands['low']
+    mid = signal.filtfilt(b2, a2, samples) * bands['mid']
+    high = signal.filtfilt(b3, a3, samples) * bands['high']
 
-    return (low + mid + high).astype(np.int16)
+    return match_format(low + mid + high, data, out)
@@ -0,0 +1,292 @@
+import inspect
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+import logging
+from .basic import apply_compression
+from .parameters import ParameterKey, ParameterSmoother, ParameterSnapshot
+from ..monitoring import StageTimings
+
+logger = logging.getLogger(__name__)
+
+LEGACY_FILTER_TYPES = {'highshelf': 'high_shelf', 'lowshelf': 'low_shelf'}
+
+# Bypass rules for stateless effect functions; classes define is_identity()
+IDENTITY_CHECKS: Dict[Callable, Callable[[Mapping[str, Any]], bool]] = {
+    apply_compression: lambda params: params.get('ratio') == 1.0,
+}
+
+# Continuous parameters of stateless effect functions that accept a
+# per-sample array; classes list theirs in ``smoothed_params``
+SMOOTHED_PARAMS: Dict[Callable, Tuple[str, ...]] = {
+    apply_compression: ('threshold', 'ratio'),
+}
+
+# Default length of a parameter ramp
+RAMP_SECONDS = 0.02
+
+
+def is_factory(entry: Any) -> bool:
+    """Registry entries that are classes (or partials of one) build a new instance per stage"""
+    target = entry.func if isinstance(entry, partial) else entry
+    return isinstance(target, type)
+
+
+@lru_cache(maxsize=64)
+def _effect_signature(effect_type: Any) -> inspect.Signature:
+    call = effect_type.__call__ if isinstance(effect_type, type) else effect_type
+    signature = inspect.signature(call)
+    if isinstance(effect_type, type):
+        # Drop ``self`` so it lines up with calling the instance
+        parameters = list(signature.parameters.values())[1:]
+        signature = signature.replace(parameters=parameters)
+    return signature
+
+
+def effect_signature(target: Any) -> inspect.Signature:
+    """Call signature of an effect function, class or instance"""
+    if isinstance(target, partial):
+        target = target.func
+    if not (inspect.isfunction(target) or isinstance(target, type)):
+        target = type(target)
+    return _effect_signature(target)
+
+
+def normalize_params(name: str, params: Mapping[str, Any]) -> Dict[str, Any]:
+    """Copy ``params`` with legacy spellings replaced"""
+    params = dict(params)
+    if name == 'equalizer' and params.get('type') in LEGACY_FILTER_TYPES:
+        params['type'] = LEGACY_FILTER_TYPES[params['type']]
+    return params
+
+
+def is_identity(effect: Callable, params: Mapping[str, Any]) -> bool:
+    check = getattr(effect, 'is_identity', None) or IDENTITY_CHECKS.get(effect)
+    return bool(check and check(params))
+
+
+def smoothed_params(effect: Callable) -> Tuple[str, ...]:
+    return tuple(getattr(effect, 'smoothed_params', None) or SMOOTHED_PARAMS.get(effect, ()))
+
+
+@dataclass(frozen=True)
+class PlanStage:
+    name: str
+    effect: Callable
+    params: Mapping[str, Any]
+    call: Callable
+    writes_out: bool
+    index: int = 0
+    smoothers: Mapping[str, ParameterSmoother] = field(default_factory=lambda: MappingProxyType({}))
+
+
+class EffectsPlan:
+    """Immutable, pre-validated form of an effects chain.
+
+    Each stage holds its own effect instance with its parameters already
+    bound, so running a block is a walk over a flat tuple. Stages whose
+    ``__call__`` accepts ``out=`` write into a pair of preallocated buffers
+    in turn. The array returned by :meth:`run` may be one of those buffers
+    and is only valid until the next call.
+
+    Continuous parameters get a :class:`ParameterSmoother` per stage. Their
+    targets come from a :class:`ParameterSnapshot` compiled for the same
+    ``layout``, and changes are ramped per sample inside the block. Per-sample
+    ``automation`` values, keyed like the snapshot, take precedence.
+    """
+
+    def __init__(self, stages: Sequence[PlanStage] = (), effects: Sequence[Callable] = (),
+                 bypassed: Sequence[str] = (), layout: int = 0, tracer: Any = None):
+        self.stages: Tuple[PlanStage, ...] = tuple(stages)
+        # One effect per chain entry (including bypassed ones) for reuse on recompile
+        self.effects: Tuple[Callable, ...] = tuple(effects)
+        self.bypassed: Tuple[str, ...] = tuple(bypassed)
+        self.layout = layout
+        self._smoothed = {stage.index: stage for stage in self.stages if stage.smoothers}
+        self._buffers: Dict[Tuple[int, np.dtype], Tuple[np.ndarray, np.ndarray]] = {}
+        self.stage_timings: Tuple[StageTimings, ...] = tuple(
+            StageTimings(f"effect_{stage.name}") for stage in self.stages
+        )
+        # Spans for a SpanTracer, when tracing is on
+        self.tracer = tracer
+        self._trace_ids = tuple(tracer.name_id(timings.name) for timings in self.stage_timings) if tracer else ()
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    @property
+    def latency(self) -> int:
+        """Samples the output lags the input by, summed over the stages"""
+        return sum(getattr(stage.effect, 'latency', 0) for stage in self.stages)
+
+    @property
+    def tail(self) -> int:
+        """Samples the output keeps ringing after the input stops"""
+        return sum(getattr(stage.effect, 'tail', 0) for stage in self.stages)
+
+    def _buffer_pair(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        key = (len(data), data.dtype)
+        pair = self._buffers.get(key)
+        if pair is None:
+            pair = (np.empty(len(data), dtype=data.dtype), np.empty(len(data), dtype=data.dtype))
+            self._buffers[key] = pair
+        return pair
+
+    def targets(self) -> Dict[ParameterKey, float]:
+        """Compiled value of every smoothed parameter, keyed by chain index"""
+        return {
+            (stage.index, name): stage.params[name]
+            for stage in self._smoothed.values() for name in stage.smoothers
+        }
+
+    def is_smoothed(self, index: int, name: str) -> bool:
+        stage = self._smoothed.get(index)
+        return stage is not None and name in stage.smoothers
+
+    def current_value(self, index: int, name: str) -> Optional[float]:
+        """Where a smoothed parameter stood at the end of the last block, ramps included"""
+        stage = self._smoothed.get(index)
+        smoother = stage.smoothers.get(name) if stage is not None else None
+        return smoother.value if smoother is not None else None
+
+    def run(self, data: np.ndarray, parameters: Optional[ParameterSnapshot] = None,
+            automation: Optional[Mapping[ParameterKey, np.ndarray]] = None) -> np.ndarray:
+        stages = self.stages
+        if not stages:
+            return data
+        if parameters is not None and parameters.layout != self.layout:
+            parameters = None  # Compiled for another chain; keep the current targets
+
+        buffers = self._buffer_pair(data)
+        turn = 0
+        for index, stage in enumerate(stages):
+            start = time.perf_counter_ns()
+            ramps = self._ramps(stage, len(data), parameters, automation)
+            if stage.writes_out:
+                out = buffers[turn]
+                stage.call(data, out=out, **ramps)
+                data = out
+                turn ^= 1
+            else:
+                data = stage.call(data, **ramps)
+            end = time.perf_counter_ns()
+            self.stage_timings[index].record(end - start)
+            if self.tracer is not None:
+                self.tracer.record(self._trace_ids[index], start, end)
+        return data
+
+    def advance(self, count: int, parameters: Optional[ParameterSnapshot] = None,
+                automation: Optional[Mapping[ParameterKey, np.ndarray]] = None):
+        """Move parameter ramps on by ``count`` samples without running the effects"""
+        if parameters is not None and parameters.layout != self.layout:
+            parameters = None
+        for stage in self._smoothed.values():
+            self._ramps(stage, count, parameters, automation)
+
+    @staticmethod
+    def _ramps(stage: PlanStage, count: int, parameters: Optional[ParameterSnapshot],
+               automation: Optional[Mapping[ParameterKey, np.ndarray]]) -> Dict[str, Any]:
+        ramps = {}
+        for name, smoother in stage.smoothers.items():
+            if parameters is not None:
+                target = parameters.values.get((stage.index, name))
+                if target is not None:
+                    smoother.set_target(target)
+            automated = automation.get((stage.index, name)) if automation else None
+            if automated is not None:
+                # Continue from where the automation left off once it ends
+                smoother.jump(automated[-1])
+                ramps[name] = automated
+            else:
+                ramps[name] = smoother.next_block(count)
+        return ramps
+
+    def timings(self) -> Dict[str, float]:
+        """Average seconds per block for each stage"""
+        return {
+            timings.name: timings.total_ns / timings.count / 1e9
+            for timings in self.stage_timings if timings.count
+        }
+
+    def latency_stats(self, window: bool = False) -> Dict[str, Dict[str, float]]:
+        """Percentile summary of each stage, see :meth:`StageTimings.summary`"""
+        return {timings.name: timings.summary(window) for timings in self.stage_timings if timings.count}
+
+
+def compile_plan(chain: Sequence[Tuple[str, Optional[Mapping[str, Any]]]],
+                 registry: Mapping[str, Any], config: Any,
+                 previous: Optional[EffectsPlan] = None, layout: int = 0,
+                 ramp_samples: Optional[int] = None, tracer: Any = None) -> EffectsPlan:
+    """Validate ``chain`` against ``registry`` and build an :class:`EffectsPlan`.
+
+    Effect instances from ``previous`` are reused for entries whose position
+    and effect type are unchanged, so recompiling keeps their streaming state
+    and any parameter ramp in progress. Raises ``ValueError`` for unknown
+    effects or parameters they do not accept.
+    """
+    reusable = dict(enumerate(previous.effects)) if previous is not None else {}
+    previous_stages = {stage.index: stage for stage in previous.stages} if previous is not None else {}
+    if ramp_samples is None:
+        ramp_samples = int(RAMP_SECONDS * config.RATE)
+
+    stages: List[PlanStage] = []
+    effects: List[Callable] = []
+    bypassed: List[str] = []
+    for index, (name, params) in enumerate(chain):
+        entry = registry.get(name)
+        if entry is None:
+            raise ValueError(f"Unknown effect: {name}")
+
+        params = normalize_params(name, params or {})
+        signature = effect_signature(entry)
+        try:
+            bound = signature.bind_partial(None, config, **params)
+        except TypeError as e:
+            raise ValueError(f"Invalid parameters for {name}: {e}") from None
+        bound.apply_defaults()
+        positional = list(signature.parameters)[:2]
+        resolved = {key: value for key, value in bound.arguments.items() if key not in positional}
+
+        effect = reusable.get(index)
+        if effect is None or not _same_kind(effect, entry):
+            effect = entry() if is_factory(entry) else entry
+        effects.append(effect)
+
+        if is_identity(effect, resolved):
+            bypassed.append(name)
+            continue
+
+        previous_stage = previous_stages.get(index)
+        smoothers = {}
+        for param in smoothed_params(effect):
+            value = resolved.get(param)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            smoother = previous_stage.smoothers.get(param) if previous_stage else None
+            if smoother is None or previous_stage.effect is not effect:
+                smoother = ParameterSmoother(value, ramp_samples)
+            smoothers[param] = smoother
+
+        stages.append(PlanStage(
+            name=name,
+            effect=effect,
+            params=MappingProxyType(resolved),
+            call=partial(effect, config=config, **params),
+            writes_out='out' in signature.parameters,
+            index=index,
+            smoothers=MappingProxyType(smoothers)
+        ))
+
+    if bypassed:
+        logger.debug(f"Bypassing identity effects: {bypassed}")
+    return EffectsPlan(stages, effects, bypassed, layout, tracer)
+
+
+def _same_kind(effect: Callable, entry: Any) -> bool:
+    if is_factory(entry):
+        target = entry.func if isinstance(entry, partial) else entry
+        return type(effect) is target
+    return effect is entry
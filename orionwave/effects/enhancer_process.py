@@ -0,0 +1,224 @@
+import numpy as np
+import multiprocessing as mp
+import time
+import logging
+from multiprocessing import shared_memory
+from typing import Optional
+from ..audio.sample_format import match_format, to_float32
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for a late result when a ``timeout`` is set
+POLL_INTERVAL = 0.0002
+
+
+class SharedBlockRing:
+    """Fixed-size float32 blocks in shared memory.
+
+    Each slot is stamped with the sequence number of the block it holds, and
+    the stamp is written last, so a reader can tell a finished block from a
+    stale or overwritten one without a lock.
+    """
+
+    def __init__(self, slots: int, block_size: int, name: Optional[str] = None):
+        self.slots = slots
+        self.block_size = block_size
+        self._owner = name is None
+        size = 8 + 16 * slots + 4 * slots * block_size
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size)
+
+        buffer = self.shm.buf
+        self.header = np.ndarray((1,), dtype=np.int64, buffer=buffer)
+        self.sequence = np.ndarray((slots,), dtype=np.int64, buffer=buffer, offset=8)
+        self.lengths = np.ndarray((slots,), dtype=np.int64, buffer=buffer, offset=8 + 8 * slots)
+        self.blocks = np.ndarray((slots, block_size), dtype=np.float32, buffer=buffer,
+                                 offset=8 + 16 * slots)
+        if self._owner:
+            self.header[0] = -1
+            self.sequence.fill(-1)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def latest(self) -> int:
+        return int(self.header[0])
+
+    def write(self, sequence: int, block: np.ndarray):
+        slot = sequence % self.slots
+        count = len(block)
+        self.sequence[slot] = -1
+        self.blocks[slot, :count] = block
+        self.lengths[slot] = count
+        self.sequence[slot] = sequence
+        self.header[0] = sequence
+
+    def read(self, sequence: int, out: np.ndarray) -> Optional[int]:
+        """Copy block ``sequence`` into ``out`` if it is still in the ring"""
+        slot = sequence % self.slots
+        if self.sequence[slot] != sequence:
+            return None
+        count = int(self.lengths[slot])
+        out[:count] = self.blocks[slot, :count]
+        # Reject the copy if the slot was overwritten while reading
+        return count if self.sequence[slot] == sequence else None
+
+    def close(self):
+        # Only the creating process unlinks; spawned workers share its resource tracker
+        del self.header, self.sequence, self.lengths, self.blocks
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _enhancer_worker(input_name: str, output_name: str, slots: int, block_size: int,
+                     requests, ready, stop, settings: dict):
+    """Child process loop: enhance each submitted block in order"""
+    from .neural_enhancer import NeuralEnhancer
+
+    inputs = SharedBlockRing(slots, block_size, input_name)
+    outputs = SharedBlockRing(slots, block_size, output_name)
+    enhancer = NeuralEnhancer(**settings)
+    block = np.empty(block_size, dtype=np.float32)
+    next_sequence = 0
+    ready.set()
+
+    try:
+        while not stop.is_set():
+            if not requests.acquire(timeout=0.1):
+                continue
+            latest = inputs.latest
+            if latest - next_sequence >= slots:
+                next_sequence = latest  # Fell behind; older blocks are gone
+            while next_sequence <= latest:
+                count = inputs.read(next_sequence, block)
+                if count is not None:
+                    outputs.write(next_sequence, enhancer.enhance(block[:count]))
+                next_sequence += 1
+    finally:
+        inputs.close()
+        outputs.close()
+
+
+class ProcessEnhancer:
+    """Runs :class:`NeuralEnhancer` in a separate process.
+
+    Blocks go through shared-memory rings with a one-block pipeline delay:
+    each call submits the current block and returns the enhanced previous
+    one, giving the worker a full block period to run the model. Results are
+    found by their sequence stamp in the output ring; if the previous one is
+    not there yet the unenhanced input is returned instead, delayed by the
+    same ``latency``, so the audio thread never waits on inference. A ``timeout`` makes the call
+    poll for a late result that long, for offline use where every block
+    should be enhanced.
+    """
+
+    def __init__(self, block_size: int = 1024, sample_rate: int = 44100, slots: int = 4,
+                 timeout: float = 0.0, **settings):
+        from .neural_enhancer import EnhancementModel
+
+        self.block_size = block_size
+        self.slots = slots
+        self.timeout = timeout
+        self.lookahead = EnhancementModel().lookahead
+        self.latency = block_size + self.lookahead
+        self.settings = settings
+        self.enabled = True
+        self.initialized = True
+        self.blocks_processed = 0
+        self.deadline_misses = 0
+
+        self._sequence = 0
+        # The previous block behind the ``lookahead`` samples before it, for the fallback
+        self._line = np.zeros(self.lookahead + block_size, dtype=np.float32)
+        self._staged = np.zeros(block_size, dtype=np.float32)
+        self._previous_count = 0
+        self._output = np.zeros(block_size, dtype=np.float32)
+        self._process = None
+        self.start()
+
+    def start(self):
+        if self._process is not None:
+            return
+        context = mp.get_context('spawn')
+        self._inputs = SharedBlockRing(self.slots, self.block_size)
+        self._outputs = SharedBlockRing(self.slots, self.block_size)
+        self._requests = context.Semaphore(0)
+        self._ready = context.Event()
+        self._stop = context.Event()
+        self._process = context.Process(
+            target=_enhancer_worker,
+            args=(self._inputs.name, self._outputs.name, self.slots, self.block_size,
+                  self._requests, self._ready, self._stop, self.settings),
+            name='neural-enhancer',
+            daemon=True
+        )
+        self._process.start()
+        self._sequence = 0
+        self._previous_count = 0
+
+    def wait_ready(self, timeout: float = 30.0) -> bool:
+        return self._process is not None and self._ready.wait(timeout)
+
+    def stop(self, timeout: float = 2.0):
+        if self._process is None:
+            return
+        self._stop.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        self._inputs.close()
+        self._outputs.close()
+
+    def _collect(self, sequence: int) -> Optional[int]:
+        """The worker's result for ``sequence``, if it is in the ring (or arrives within ``timeout``)"""
+        count = self._outputs.read(sequence, self._output)
+        if count is None and self.timeout > 0:
+            deadline = time.perf_counter() + self.timeout
+            while count is None and time.perf_counter() < deadline:
+                time.sleep(POLL_INTERVAL)
+                count = self._outputs.read(sequence, self._output)
+        return count
+
+    def enhance(self, audio_data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Submit this block and return the previous one, enhanced if in time"""
+        count = len(audio_data)
+        if not self.enabled or self._process is None or not count or count > self.block_size:
+            return audio_data
+
+        samples = to_float32(audio_data)
+
+        sequence = self._sequence
+        self._inputs.write(sequence, samples)
+        self._requests.release()
+        self._sequence += 1
+
+        if out is None:
+            out = np.empty(count, dtype=audio_data.dtype)
+        if count != self._previous_count:
+            # First block, or the block size changed: nothing aligned to return yet
+            result = self._output[:count]
+            result.fill(0)
+            self._line.fill(0)
+        elif self._collect(sequence - 1) == count:
+            result = self._output[:count]
+            self.blocks_processed += 1
+        else:
+            # The previous block as the model would have aligned it
+            result = self._line[:count]
+            self.deadline_misses += 1
+            if not self._process.is_alive():
+                logger.error("Neural enhancer process exited; disabling enhancement")
+                self.enabled = False
+
+        # Keep this block before writing ``out``, which may alias ``audio_data``,
+        # and move it into the line only once ``result`` has been written
+        self._staged[:count] = samples
+        match_format(result, audio_data, out)
+        lookahead = self.lookahead
+        self._line[:lookahead] = self._line[count:count + lookahead]
+        self._line[lookahead:lookahead + count] = self._staged[:count]
+        self._previous_count = count
+        return out
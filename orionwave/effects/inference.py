@@ -0,0 +1,236 @@
+import copy
+import time
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Dict, Optional, Union
+import logging
+from ..audio.sample_format import to_float32
+from ..config import INFERENCE_BACKENDS as BACKENDS
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_ENGINES = ('x86', 'fbgemm', 'qnnpack')
+
+
+class InferenceBackend:
+    """Runs a ``(1, 1, n)`` float32 tensor through a prepared model.
+
+    Every backend is called the same way, so :class:`NeuralEnhancer` can swap
+    them without changing its streaming logic. ``export`` writes the artifact
+    that :func:`load_backend` reads back.
+    """
+
+    name = 'eager'
+    cpu_only = False
+
+    def __init__(self, module: nn.Module):
+        self.module = module
+
+    def __call__(self, tensor: torch.Tensor) -> torch.Tensor:
+        return self.module(tensor)
+
+    def export(self, path: str):
+        torch.save(self.module.state_dict(), path)
+
+
+class TorchScriptBackend(InferenceBackend):
+    """Frozen TorchScript module; also used to ship the int8 variants"""
+
+    def __init__(self, module, name: str = 'torchscript'):
+        if not isinstance(module, torch.jit.ScriptModule):
+            module = torch.jit.freeze(torch.jit.script(module.eval()))
+        super().__init__(module)
+        self.name = name
+        self.cpu_only = name != 'torchscript'
+
+    def export(self, path: str):
+        torch.jit.save(self.module, path)
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime session with a dynamic sample axis.
+
+    ``model`` is the path of an ``.onnx`` file or its serialized bytes.
+    """
+
+    name = 'onnx'
+    cpu_only = True
+
+    def __init__(self, model: Union[str, bytes], num_threads: int = 1):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        self.model = model
+        self.session = onnxruntime.InferenceSession(
+            model, options, providers=['CPUExecutionProvider']
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, tensor: torch.Tensor) -> torch.Tensor:
+        result = self.session.run(None, {self.input_name: tensor.numpy()})[0]
+        return torch.from_numpy(result)
+
+    def export(self, path: str):
+        if isinstance(self.model, bytes):
+            with open(path, 'wb') as f:
+                f.write(self.model)
+        else:
+            import shutil
+            shutil.copyfile(self.model, path)
+
+
+def _quantized_engine() -> str:
+    supported = torch.backends.quantized.supported_engines
+    for engine in QUANTIZED_ENGINES:
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return engine
+    raise RuntimeError("No quantized engine available in this PyTorch build")
+
+
+def calibration_inputs(calibration: Optional[np.ndarray] = None, block_size: int = 1024,
+                       blocks: int = 32) -> list:
+    """Split calibration audio into model inputs (seeded noise if none given)"""
+    if calibration is None:
+        rng = np.random.default_rng(0)
+        calibration = rng.standard_normal(block_size * blocks) * 0.1
+    samples = to_float32(np.asarray(calibration))
+    return [
+        torch.from_numpy(samples[i:i + block_size].copy()).view(1, 1, -1)
+        for i in range(0, len(samples) - block_size + 1, block_size)
+    ]
+
+
+def build_backend(name: str, model: nn.Module, calibration: Optional[np.ndarray] = None,
+                  onnx_path: Optional[str] = None, num_threads: int = 1) -> InferenceBackend:
+    """Convert an eager model into the named backend"""
+    model = model.eval()
+    if name == 'eager':
+        return InferenceBackend(model)
+    if name == 'torchscript':
+        return TorchScriptBackend(model)
+
+    model = copy.deepcopy(model).cpu()
+    if name == 'dynamic_int8':
+        import torch.ao.nn.quantized.dynamic as quantized_dynamic
+        from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+
+        _quantized_engine()
+        # Conv1d is not in the default dynamic mapping, so name it explicitly
+        quantized = quantize_dynamic(
+            model, {nn.Conv1d: default_dynamic_qconfig},
+            mapping={nn.Conv1d: quantized_dynamic.Conv1d}
+        )
+        return TorchScriptBackend(quantized, name)
+
+    if name == 'static_int8':
+        from torch.ao.quantization import get_default_qconfig_mapping
+        from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+        inputs = calibration_inputs(calibration)
+        prepared = prepare_fx(model, get_default_qconfig_mapping(_quantized_engine()), (inputs[0],))
+        with torch.inference_mode():
+            for tensor in inputs:
+                prepared(tensor)
+        return TorchScriptBackend(convert_fx(prepared), name)
+
+    if name == 'onnx':
+        def export(path):
+            torch.onnx.export(
+                model, calibration_inputs(None, blocks=1)[0], path, dynamo=False,
+                input_names=['audio'], output_names=['enhanced'],
+                dynamic_axes={'audio': {2: 'samples'}, 'enhanced': {2: 'samples'}}
+            )
+
+        if onnx_path is not None:
+            export(onnx_path)
+            return OnnxBackend(onnx_path, num_threads)
+        # Without a destination the session is built from memory and nothing is left behind
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.onnx')
+            export(path)
+            with open(path, 'rb') as f:
+                return OnnxBackend(f.read(), num_threads)
+
+    raise ValueError(f"Unknown inference backend: {name}")
+
+
+def load_backend(name: str, path: str, num_threads: int = 1) -> InferenceBackend:
+    """Load an artifact written by ``InferenceBackend.export``"""
+    if name == 'onnx':
+        return OnnxBackend(path, num_threads)
+    if name == 'eager':
+        from .neural_enhancer import EnhancementModel
+
+        model = EnhancementModel()
+        model.load_state_dict(torch.load(path, map_location='cpu'))
+        return InferenceBackend(model.eval())
+    if name in BACKENDS:
+        if name != 'torchscript':
+            _quantized_engine()
+        return TorchScriptBackend(torch.jit.load(path, map_location='cpu'), name)
+    raise ValueError(f"Unknown inference backend: {name}")
+
+
+def parity_error(backend: InferenceBackend, reference: nn.Module,
+                 inputs: Optional[list] = None) -> float:
+    """Largest absolute difference from the eager model's output"""
+    inputs = inputs or calibration_inputs(blocks=8)
+    error = 0.0
+    with torch.inference_mode():
+        for tensor in inputs:
+            expected = reference(tensor)
+            actual = backend(tensor)
+            error = max(error, float(torch.max(torch.abs(actual - expected))))
+    return error
+
+
+def benchmark_backends(model: nn.Module, block_size: int = 1024, blocks: int = 500,
+                       warmup: int = 20, backends=BACKENDS,
+                       num_threads: int = 1) -> Dict[str, Dict[str, float]]:
+    """Per-block latency and parity of each backend that can be built here.
+
+    Torch runs on ``num_threads`` threads while benchmarking; the previous
+    setting is restored afterwards.
+    """
+    previous_threads = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    try:
+        return _benchmark_backends(model, block_size, blocks, warmup, backends, num_threads)
+    finally:
+        torch.set_num_threads(previous_threads)
+
+
+def _benchmark_backends(model: nn.Module, block_size: int, blocks: int, warmup: int,
+                        backends, num_threads: int) -> Dict[str, Dict[str, float]]:
+    model = model.eval().cpu()
+    inputs = calibration_inputs(block_size=block_size, blocks=8)
+    results = {}
+    for name in backends:
+        try:
+            backend = build_backend(name, model, num_threads=num_threads)
+        except Exception as e:
+            logger.warning(f"Skipping {name} backend: {e}")
+            continue
+
+        timings = np.empty(blocks)
+        with torch.inference_mode():
+            for i in range(warmup):
+                backend(inputs[i % len(inputs)])
+            for i in range(blocks):
+                start = time.perf_counter()
+                backend(inputs[i % len(inputs)])
+                timings[i] = time.perf_counter() - start
+
+        timings *= 1000.0
+        results[name] = {
+            'mean_ms': float(np.mean(timings)),
+            'p95_ms': float(np.percentile(timings, 95)),
+            'max_error': parity_error(backend, model, inputs)
+        }
+    return results
@@ -1,12 +1,17 @@
 import numpy as np
+import time
 import torch
 import torch.nn as nn
-from typing import Optional
+from typing import Dict, Optional
 import logging
+from .inference import InferenceBackend, build_backend, load_backend
+from ..audio.sample_format import match_format
 
 logger = logging.getLogger(__name__)
 
 class EnhancementModel(nn.Module):
+    __jit_unused_properties__ = ['receptive_field', 'lookahead']
+
     def __init__(self):
         super().__init__()
         self.conv1 = nn.Conv1d(1, 32, kernel_size=3, padding=1)
@@ -22,59 +27,145 @@ class EnhancementModel(nn.Module):
         x = self.conv4(x)
         return x
 
+    @property
+    def receptive_field(self) -> int:
+        convs = [m for m in self.modules() if isinstance(m, nn.Conv1d)]
+        return 1 + sum((m.kernel_size[0] - 1) * m.dilation[0] for m in convs)
+
+    @property
+    def lookahead(self) -> int:
+        """Future samples each output depends on (right-hand padding)"""
+        return sum(m.padding[0] for m in self.modules() if isinstance(m, nn.Conv1d))
+
 class NeuralEnhancer:
-    def __init__(self, model_path: Optional[str] = None):
+    """Streaming wrapper around :class:`EnhancementModel`.
+
+    Each block is run with the previous ``receptive_field - 1`` samples as
+    left context, so block edges match whole-signal inference. Output is the
+    same length as the input and ``latency`` samples behind it. Input and
+    output tensors share preallocated numpy buffers.
+
+    ``backend`` selects how the model is run (see ``inference.BACKENDS``).
+    It is built from the eager weights, or loaded from ``backend_path`` when
+    that points at an exported artifact.
+    """
+
+    TIMING_WINDOW = 256
+
+    def __init__(self, model_path: Optional[str] = None, num_threads: Optional[int] = 1,
+                 backend: str = 'eager', backend_path: Optional[str] = None,
+                 calibration: Optional[np.ndarray] = None):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        if num_threads:
+            torch.set_num_threads(num_threads)
         self.model = EnhancementModel().to(self.device)
+        self.initialized = True
         if model_path:
             self._load_model(model_path)
-        self.initialized = True
-        self.buffer_size = 2048  # Fixed buffer size for processing
+        self.model.eval()
         self.enabled = True
+        self._setup_backend(backend, backend_path, calibration, num_threads or 1)
+
+        self.context = self.model.receptive_field - 1
+        self.latency = self.model.lookahead
+        self._block_size = 0
+        self._input = np.zeros(self.context, dtype=np.float32)
+        self._timings = np.zeros(self.TIMING_WINDOW)
+        self.blocks_processed = 0
 
     def _load_model(self, model_path: str):
         try:
             state_dict = torch.load(model_path, map_location=self.device)
             self.model.load_state_dict(state_dict)
-            self.model.eval()
             logger.info(f"Loaded neural enhancement model from {model_path}")
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             self.initialized = False
 
-    @torch.no_grad()
-    def enhance(self, audio_data: np.ndarray) -> np.ndarray:
-        """Enhance audio with error handling and proper array copying"""
-        if not self.initialized or not self.enabled:
+    def _setup_backend(self, name: str, path: Optional[str],
+                       calibration: Optional[np.ndarray], num_threads: int):
+        try:
+            if path:
+                self.backend = load_backend(name, path, num_threads)
+            else:
+                self.backend = build_backend(name, self.model, calibration, num_threads=num_threads)
+        except Exception as e:
+            logger.error(f"Failed to set up {name} backend, using eager: {e}")
+            self.backend = InferenceBackend(self.model)
+            path = None
+        # Quantized, ONNX and loaded artifacts all run on the CPU
+        if self.backend.cpu_only or path:
+            self.device = torch.device('cpu')
+        logger.info(f"Neural enhancer using {self.backend.name} backend on {self.device}")
+
+    def _allocate(self, block_size: int):
+        """Size the shared buffers for a new block length, keeping the context"""
+        history = self._input[:self.context].copy()
+        self._input = np.zeros(self.context + block_size, dtype=np.float32)
+        self._input[:self.context] = history
+        self._output = np.empty(block_size, dtype=np.float32)
+        self._input_tensor = torch.from_numpy(self._input).view(1, 1, -1)
+        self._output_tensor = torch.from_numpy(self._output)
+        if self.device.type != 'cpu':
+            self._device_input = torch.empty_like(self._input_tensor, device=self.device)
+        self._block_size = block_size
+
+    def reset(self):
+        self._input.fill(0)
+        self._timings.fill(0)
+        self.blocks_processed = 0
+
+    def timing_stats(self) -> Dict[str, float]:
+        """Per-block inference time over the most recent blocks"""
+        count = min(self.blocks_processed, self.TIMING_WINDOW)
+        if not count:
+            return {'blocks': 0, 'mean_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        timings = self._timings[:count] * 1000.0
+        return {
+            'blocks': self.blocks_processed,
+            'mean_ms': float(np.mean(timings)),
+            'p95_ms': float(np.percentile(timings, 95)),
+            'max_ms': float(np.max(timings))
+        }
+
+    def enhance(self, audio_data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Enhance one block, returning exactly ``len(audio_data)`` samples.
+
+        ``out`` may be ``audio_data`` itself.
+        """
+        if not self.initialized or not self.enabled or not len(audio_data):
             return audio_data
 
         try:
-            # Make a writable copy of the input array
-            audio_copy = np.array(audio_data, dtype=np.float32, copy=True) / 32768.0
-            
-            # Pad or truncate to fixed buffer size
-            if len(audio_copy) < self.buffer_size:
-                audio_copy = np.pad(audio_copy, (0, self.buffer_size - len(audio_copy)))
-            elif len(audio_copy) > self.buffer_size:
-                audio_copy = audio_copy[:self.buffer_size]
-            
-            # Convert to tensor
-            audio_tensor = torch.from_numpy(audio_copy).to(self.device)
-            audio_tensor = audio_tensor.unsqueeze(0).unsqueeze(0)
-            
-            # Process through model
+            start = time.perf_counter()
+            count = len(audio_data)
+            if count != self._block_size:
+                self._allocate(count)
+
+            block = self._input[self.context:]
+            if audio_data.dtype == np.int16:
+                np.multiply(audio_data, 1.0 / 32768.0, out=block, casting='unsafe')
+            else:
+                block[:] = audio_data
+
+            tensor = self._input_tensor
+            if self.device.type != 'cpu':
+                tensor = self._device_input.copy_(tensor)
             with torch.inference_mode():
-                enhanced = self.model(audio_tensor)
-            
-            # Convert back to numpy and original length
-            result = enhanced.squeeze().cpu().numpy()
-            result = result[:len(audio_data)]  # Truncate to original length
-            
-            # Scale and convert to int16
-            result = np.clip(result * 32768.0, -32768, 32767).astype(np.int16)
-            
-            return result
-            
+                enhanced = self.backend(tensor)
+
+            # Only outputs whose receptive field lies inside the buffer are valid
+            offset = self.context - self.latency
+            self._output_tensor.copy_(enhanced[0, 0, offset:offset + count])
+            self._input[:self.context] = self._input[count:]
+
+            self._timings[self.blocks_processed % self.TIMING_WINDOW] = time.perf_counter() - start
+            self.blocks_processed += 1
+
+            if out is None:
+                out = np.empty(count, dtype=audio_data.dtype)  # ``_output`` is reused
+            return match_format(self._output, audio_data, out)
+
         except Exception as e:
             logger.error(f"Neural enhancement failed: {e}")
             self.enabled = False  # Disable enhancement on error
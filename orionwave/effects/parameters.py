@@ -0,0 +1,127 @@
+import threading
+import numpy as np
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+ParameterKey = Tuple[int, str]  # (chain index, parameter name)
+
+
+@dataclass(frozen=True)
+class ParameterSnapshot:
+    """One immutable version of every parameter target.
+
+    ``layout`` changes whenever the effects chain is recompiled, so a plan
+    can tell whether the chain indices in ``values`` refer to its stages.
+    """
+    version: int
+    layout: int
+    values: Mapping[ParameterKey, float]
+
+
+class ParameterStore:
+    """Versioned, copy-on-write parameter targets.
+
+    Every write publishes a new :class:`ParameterSnapshot` by swapping one
+    reference, so the audio thread reads ``snapshot`` once per block without
+    locking and never sees a half-applied update. Writers only serialize
+    among themselves.
+    """
+
+    def __init__(self):
+        self._snapshot = ParameterSnapshot(0, 0, MappingProxyType({}))
+        self._write_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> ParameterSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def layout(self) -> int:
+        return self._snapshot.layout
+
+    def get(self, key: ParameterKey, default=None):
+        return self._snapshot.values.get(key, default)
+
+    def update(self, values: Mapping[ParameterKey, float]) -> int:
+        """Publish new targets for some parameters; returns the new version"""
+        with self._write_lock:
+            current = self._snapshot
+            merged = dict(current.values)
+            merged.update((key, float(value)) for key, value in values.items())
+            self._snapshot = ParameterSnapshot(current.version + 1, current.layout,
+                                               MappingProxyType(merged))
+            return self._snapshot.version
+
+    def set(self, index: int, name: str, value: float) -> int:
+        return self.update({(index, name): value})
+
+    def reset(self, values: Mapping[ParameterKey, float], layout: int) -> int:
+        """Replace every target for a newly compiled chain ``layout``"""
+        with self._write_lock:
+            current = self._snapshot
+            self._snapshot = ParameterSnapshot(
+                current.version + 1, layout,
+                MappingProxyType({key: float(value) for key, value in values.items()})
+            )
+            return self._snapshot.version
+
+
+class ParameterSmoother:
+    """Per-sample linear ramp from the current value to the latest target.
+
+    :meth:`next_block` returns a plain float while the value is steady, so
+    effects keep their scalar fast path, and a float32 ramp spanning the
+    block while a change is in progress. The ramp buffer is reused and only
+    valid until the next call.
+    """
+
+    def __init__(self, value: float, ramp_samples: int):
+        self.value = float(value)
+        self.target = self.value
+        self.ramp_samples = max(1, int(ramp_samples))
+        self._remaining = 0
+        self._step = 0.0
+        self._steps = np.zeros(0)
+        self._ramp = np.zeros(0, dtype=np.float32)
+
+    @property
+    def smoothing(self) -> bool:
+        return self._remaining > 0
+
+    def set_target(self, target: float):
+        target = float(target)
+        if target == self.target:
+            return
+        self.target = target
+        self._remaining = self.ramp_samples
+        self._step = (target - self.value) / self.ramp_samples
+
+    def next_block(self, count: int) -> Union[float, np.ndarray]:
+        if not self._remaining:
+            return self.value
+        if len(self._steps) < count:
+            self._steps = np.arange(1, count + 1, dtype=np.float64)
+            self._ramp = np.empty(count, dtype=np.float32)
+
+        ramp = self._ramp[:count]
+        active = min(count, self._remaining)
+        np.multiply(self._steps[:count], self._step, out=ramp, casting='same_kind')
+        ramp += self.value
+        ramp[active:] = self.target
+
+        self._remaining -= active
+        self.value = self.target if not self._remaining else self.value + self._step * active
+        return ramp
+
+    def jump(self, value: float):
+        """Move to ``value`` immediately, without a ramp"""
+        self.value = self.target = float(value)
+        self._remaining = 0
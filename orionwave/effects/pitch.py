@@ -0,0 +1,294 @@
+import numpy as np
+from scipy import fft, signal
+from typing import Any, Mapping, Optional
+import logging
+from ..audio.sample_format import float_output, match_format, to_float32
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseVocoderPitchShifter:
+    """Streaming STFT phase-vocoder pitch shifter.
+
+    Input is framed with a fixed hop into a persistent analysis buffer. Each
+    frame's spectral peaks are moved to ``ratio`` times their measured
+    instantaneous frequency, carrying the bins around them along unchanged
+    and phase-locked to the peak (Laroche & Dolson), so partials keep their
+    shape and level. The cost per block only depends on the block length.
+    The algorithmic latency is ``frame_size`` samples.
+    """
+
+    def __init__(self, sample_rate: int = 44100, frame_size: int = 1024, overlap: int = 4):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.hop_size = frame_size // overlap
+        self.latency = frame_size
+        self._history = frame_size - self.hop_size
+
+        n_bins = frame_size // 2 + 1
+        self.window = signal.windows.hann(frame_size, sym=False)
+        self.scale = self.hop_size / np.sum(self.window ** 2)
+        self.bins = np.arange(n_bins)
+        self.expected_advance = 2 * np.pi * self.hop_size / frame_size
+        self._bin_advance = self.bins * self.expected_advance
+        self._synthesis_window = self.window * self.scale
+
+        self._input = np.zeros(frame_size)
+        self._output = np.zeros(self.hop_size)
+        self._accumulator = np.zeros(frame_size)
+        self._last_phase = np.zeros(n_bins)
+        self._phase_sum = np.zeros(n_bins)  # Output phase of every bin in the last frame
+        self._frame = np.empty(frame_size)
+        # Per-frame scratch, so a frame allocates little beyond the FFTs
+        self._magnitude = np.empty(n_bins)
+        self._phase = np.empty(n_bins)
+        self._delta = np.empty(n_bins)
+        self._synth = np.empty(n_bins, dtype=np.complex128)
+        self._rover = self._history
+
+    @property
+    def latency_ms(self) -> float:
+        return 1000.0 * self.latency / self.sample_rate
+
+    def __call__(self, data: np.ndarray, config: Any, shift: int = 200,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        self.sample_rate = config.RATE
+        return self.process(data, shift=shift, out=out)
+
+    @staticmethod
+    def is_identity(params: Mapping[str, Any]) -> bool:
+        return params.get('shift') == 0
+
+    def reset(self):
+        for buffer in (self._input, self._output, self._accumulator,
+                       self._last_phase, self._phase_sum):
+            buffer.fill(0)
+        self._rover = self._history
+
+    def _peak_regions(self, magnitude: np.ndarray):
+        """Local maxima of ``magnitude`` and the nearest one to every bin"""
+        inner = magnitude[1:-1]
+        peaks = np.flatnonzero((inner > magnitude[:-2]) & (inner >= magnitude[2:])) + 1
+        if not len(peaks):
+            return peaks, peaks
+        right = np.minimum(np.searchsorted(peaks, self.bins), len(peaks) - 1)
+        left = np.maximum(right - 1, 0)
+        nearer_left = self.bins - peaks[left] < peaks[right] - self.bins
+        return peaks, np.where(nearer_left, left, right)
+
+    def _process_frame(self, ratio: float):
+        np.multiply(self._input, self.window, out=self._frame)
+        spectrum = fft.rfft(self._frame)
+        magnitude = np.abs(spectrum, out=self._magnitude)
+        phase = np.arctan2(spectrum.imag, spectrum.real, out=self._phase)
+
+        # Instantaneous frequency of each bin, in bins
+        delta = np.subtract(phase, self._last_phase, out=self._delta)
+        self._last_phase, self._phase = phase, self._last_phase
+        delta -= self._bin_advance
+        delta += np.pi
+        np.mod(delta, 2 * np.pi, out=delta)
+        delta -= np.pi
+        delta *= 1.0 / self.expected_advance
+        true_bins = np.add(delta, self.bins, out=delta)
+
+        # Move each peak to ratio times its frequency, its region with it
+        peaks, owner = self._peak_regions(magnitude)
+        n_bins = len(self.bins)
+        synth_magnitude = np.zeros(n_bins)
+        synth_phase = np.zeros(n_bins)
+        if len(peaks):
+            peak_freq = true_bins[peaks] * ratio
+            peak_target = np.rint(peak_freq).astype(np.intp)
+            target = self.bins + (peak_target - peaks)[owner]
+            valid = np.flatnonzero((target >= 0) & (target < n_bins))
+            # Where regions collide the louder bin wins: it is written last
+            valid = valid[np.argsort(magnitude[valid], kind='stable')]
+            kept = np.minimum(peak_target, n_bins - 1)
+            # Peaks advance from the phase last written to their new bin
+            peak_phase = self._phase_sum[kept] + peak_freq * self.expected_advance
+            source_peak = owner[valid]
+            synth_magnitude[target[valid]] = magnitude[valid]
+            synth_phase[target[valid]] = (peak_phase[source_peak] + phase[valid]
+                                          - phase[peaks[source_peak]])
+        self._phase_sum = synth_phase
+
+        np.cos(self._phase_sum, out=self._synth.real)
+        np.sin(self._phase_sum, out=self._synth.imag)
+        self._synth *= synth_magnitude
+        synthesized = fft.irfft(self._synth, n=self.frame_size)
+
+        # Overlap-add and shift both buffers by one hop
+        synthesized *= self._synthesis_window
+        self._accumulator += synthesized
+        self._output[:] = self._accumulator[:self.hop_size]
+        self._accumulator[:-self.hop_size] = self._accumulator[self.hop_size:]
+        self._accumulator[-self.hop_size:] = 0
+        self._input[:self._history] = self._input[self.hop_size:]
+
+    def process(self, data: np.ndarray, shift: int = 200,
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Pitch shift a block by ``shift`` cents"""
+        ratio = 2.0 ** (shift / 1200.0)
+        samples = to_float32(data)
+        result = float_output(data, out)
+
+        position = 0
+        while position < len(data):
+            count = min(len(data) - position, self.frame_size - self._rover)
+            read = self._rover - self._history
+            self._input[self._rover:self._rover + count] = samples[position:position + count]
+            result[position:position + count] = self._output[read:read + count]
+            self._rover += count
+            position += count
+
+            if self._rover >= self.frame_size:
+                self._process_frame(ratio)
+                self._rover = self._history
+
+        return match_format(result, data, out)
+
+
+class WSOLAPitchShifter:
+    """Low-CPU time-domain pitch shifter (WSOLA-style overlap-add).
+
+    Each output grain reads the input from a ring buffer resampled by the
+    pitch ratio and is overlap-added with a fixed synthesis hop. The source
+    position of every grain is chosen near its nominal position by a
+    vectorized cross-correlation against the natural continuation of the
+    previous grain, so splices land on matching waveform cycles. ``mode``
+    trades quality for CPU through grain size and search range.
+    """
+
+    MODES = {
+        'fast': {'grain_size': 1024, 'search': 256, 'decimation': 8},
+        'balanced': {'grain_size': 1024, 'search': 256, 'decimation': 4},
+        'quality': {'grain_size': 2048, 'search': 256, 'decimation': 1},
+    }
+    MAX_RATIO = 2.0
+    MAX_BLOCK = 4096
+
+    def __init__(self, sample_rate: int = 44100, mode: str = 'balanced'):
+        self.sample_rate = sample_rate
+        self._configure(mode)
+
+    def _configure(self, mode: str):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown pitch shift mode: {mode}")
+        settings = self.MODES[mode]
+        self.mode = mode
+        self.grain_size = settings['grain_size']
+        self.hop_size = self.grain_size // 2
+        self.search = settings['search']
+        self.decimation = settings['decimation']
+
+        # Grains are centred on their nominal input time, so the furthest
+        # sample read lies search + grain * (1 + ratio) / 2 after it
+        self.latency = self.search + int(np.ceil(self.grain_size * (1 + self.MAX_RATIO) / 2)) + 1
+
+        self.window = signal.windows.hann(self.grain_size, sym=False)
+        self._steps = np.arange(self.grain_size)
+        history = self.MAX_BLOCK + self.latency + 2 * self.search + 3 * self.grain_size
+        self._input = np.zeros(1 << int(np.ceil(np.log2(history))))
+        self._output = np.zeros(1 << int(np.ceil(np.log2(self.MAX_BLOCK + 2 * self.grain_size))))
+        self._input_mask = len(self._input) - 1
+        self._output_mask = len(self._output) - 1
+        self._total_in = 0
+        self._total_out = 0
+        self._next_grain = 0
+        self._previous_source = None
+
+    @property
+    def latency_ms(self) -> float:
+        return 1000.0 * self.latency / self.sample_rate
+
+    def __call__(self, data: np.ndarray, config: Any, shift: int = 200,
+                 mode: str = 'balanced', out: Optional[np.ndarray] = None) -> np.ndarray:
+        self.sample_rate = config.RATE
+        return self.process(data, shift=shift, mode=mode, out=out)
+
+    @staticmethod
+    def is_identity(params: Mapping[str, Any]) -> bool:
+        return params.get('shift') == 0
+
+    def reset(self):
+        self._configure(self.mode)
+
+    def _read(self, start: int, count: int) -> np.ndarray:
+        return self._input[(start + np.arange(count)) & self._input_mask]
+
+    def _find_source(self, nominal: int, ratio: float) -> int:
+        """Pick the grain start that best continues the previous grain"""
+        if self.search == 0 or self._previous_source is None:
+            return nominal
+
+        overlap = int((self.grain_size - self.hop_size) * ratio)
+        continuation = int(round(self._previous_source + self.hop_size * ratio))
+        template = self._read(continuation, overlap)[::self.decimation]
+        region = self._read(nominal - self.search, 2 * self.search + overlap)[::self.decimation]
+        correlation = np.correlate(region, template, mode='valid')
+        best = int(np.argmax(correlation))
+        centre = self.search // self.decimation
+        if correlation[best] <= correlation[centre]:
+            return nominal  # stay on the nominal position unless something matches better
+        offset = best * self.decimation
+        if self.decimation > 1:
+            # The decimated grid is coarse; refine at full resolution around its best
+            low = max(0, offset - self.decimation)
+            high = min(2 * self.search, offset + self.decimation)
+            region = self._read(nominal - self.search + low, high - low + overlap)
+            refined = np.correlate(region, self._read(continuation, overlap), mode='valid')
+            offset = low + int(np.argmax(refined))
+        return nominal - self.search + offset
+
+    def _add_grain(self, ratio: float):
+        grain_start = self._next_grain * self.hop_size
+        half = self.grain_size / 2
+        nominal = int(round(grain_start + half - self.latency - half * ratio))
+        source = self._find_source(nominal, ratio)
+        self._previous_source = source
+
+        # Linear interpolation at the resampled read positions
+        positions = source + self._steps * ratio
+        index = np.floor(positions).astype(np.intp)
+        fraction = positions - index
+        current = self._input[index & self._input_mask]
+        following = self._input[(index + 1) & self._input_mask]
+        grain = (current + (following - current) * fraction) * self.window
+
+        self._output[(grain_start + self._steps) & self._output_mask] += grain
+        self._next_grain += 1
+
+    def _write_input(self, data: np.ndarray):
+        start = self._total_in & self._input_mask
+        first = min(len(data), len(self._input) - start)
+        self._input[start:start + first] = data[:first]
+        self._input[:len(data) - first] = data[first:]
+        self._total_in += len(data)
+
+    def _read_output(self, out: np.ndarray):
+        start = self._total_out & self._output_mask
+        first = min(len(out), len(self._output) - start)
+        out[:first] = self._output[start:start + first]
+        out[first:] = self._output[:len(out) - first]
+        self._output[start:start + first] = 0
+        self._output[:len(out) - first] = 0
+        self._total_out += len(out)
+
+    def process(self, data: np.ndarray, shift: int = 200, mode: str = 'balanced',
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Pitch shift a block by ``shift`` cents"""
+        if mode != self.mode:
+            self._configure(mode)
+        ratio = float(np.clip(2.0 ** (shift / 1200.0), 1 / self.MAX_RATIO, self.MAX_RATIO))
+        samples = to_float32(data)
+        result = float_output(data, out)
+
+        for start in range(0, len(samples), self.MAX_BLOCK):
+            piece = samples[start:start + self.MAX_BLOCK]
+            self._write_input(piece)
+            while self._next_grain * self.hop_size < self._total_in:
+                self._add_grain(ratio)
+            self._read_output(result[start:start + len(piece)])
+
+        return match_format(result, data, out)
@@ -0,0 +1,186 @@
+import numpy as np
+from scipy import fft
+from typing import Any, List, Mapping, Optional
+import logging
+from ..audio.sample_format import match_format, to_float32
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionedConvolver:
+    """Uniformly partitioned overlap-add convolver for streaming use.
+
+    The impulse response is split into partitions of ``block_size`` taps which
+    are transformed once. Each call pushes the spectrum of the new block into a
+    frequency-domain delay line, so every block costs one forward and one
+    inverse FFT regardless of the impulse response length.
+
+    Input that stops part way into a partition is convolved as a zero-padded
+    partial frame; the next call completes the same frame, so blocks of any
+    length are exact and add no latency.
+    """
+
+    def __init__(self, impulse_response: np.ndarray, block_size: int):
+        self.block_size = int(block_size)
+        self.fft_size = 2 * self.block_size
+        n_bins = self.block_size + 1
+
+        ir = np.asarray(impulse_response, dtype=np.float64)
+        self.impulse_response = ir
+        self.num_partitions = max(1, -(-len(ir) // self.block_size))
+        padded = np.zeros(self.num_partitions * self.block_size)
+        padded[:len(ir)] = ir
+        partitions = padded.reshape(self.num_partitions, self.block_size)
+
+        # Pre-transformed impulse response partitions
+        self.ir_spectra = fft.rfft(partitions, n=self.fft_size, axis=1)
+
+        # Frequency-domain delay line, written backwards from ``_head``
+        self.fdl = np.zeros((self.num_partitions, n_bins), dtype=np.complex128)
+        self._head = 0
+        self._products = np.empty_like(self.fdl)
+        self._accumulator = np.empty(n_bins, dtype=np.complex128)
+        self._frame = np.zeros(self.fft_size)
+        self._overlap = np.zeros(self.block_size)
+        self._fill = 0  # Samples already in the current partition frame
+
+    def reset(self):
+        """Clear the delay line and the pending tail"""
+        self.fdl.fill(0)
+        self._frame.fill(0)
+        self._overlap.fill(0)
+        self._head = 0
+        self._fill = 0
+
+    def process_block(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Convolve up to the rest of the current partition into ``out``"""
+        fill, stop = self._fill, self._fill + len(block)
+        if not fill:
+            # A new frame takes the slot of the oldest one, which no partition needs any more
+            self._head = (self._head - 1) % self.num_partitions
+            self._frame[:self.block_size] = 0.0
+        self._frame[fill:stop] = block
+        self.fdl[self._head] = fft.rfft(self._frame)
+
+        # Y = sum_p H[p] * X[k - p], split around the ring head
+        split = self.num_partitions - self._head
+        np.multiply(self.ir_spectra[:split], self.fdl[self._head:],
+                    out=self._products[:split])
+        np.multiply(self.ir_spectra[split:], self.fdl[:self._head],
+                    out=self._products[split:])
+        self._products.sum(axis=0, out=self._accumulator)
+
+        result = fft.irfft(self._accumulator, n=self.fft_size)
+        np.add(result[fill:stop], self._overlap[fill:stop], out=out)
+        if stop == self.block_size:
+            self._overlap[:] = result[self.block_size:]
+            stop = 0
+        self._fill = stop
+        return out
+
+    def process(self, data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Convolve a buffer of any length"""
+        if out is None:
+            out = np.empty(len(data))
+        start = 0
+        while start < len(data):
+            stop = min(len(data), start + self.block_size - self._fill)
+            self.process_block(data[start:stop], out[start:stop])
+            start = stop
+        return out
+
+
+class ConvolutionReverb:
+    """Stateful convolution reverb that carries its tail across blocks.
+
+    The impulse response and its partition spectra are only rebuilt when
+    ``room_size`` changes; blocks of any length reuse the same partitions.
+    On a change the old convolver is fed silence until its tail has rung
+    out, so what the old room already heard decays instead of cutting off.
+    """
+
+    # ``mix`` may also be a per-sample array while it is being ramped
+    smoothed_params = ('mix',)
+
+    def __init__(self, sample_rate: int = 44100, block_size: int = 1024, seed: int = 0):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.seed = seed
+        self.room_size: Optional[float] = None
+        self.convolver: Optional[PartitionedConvolver] = None
+        # Replaced convolvers still ringing out, with the samples of tail they have left
+        self._draining: List[List[Any]] = []
+        self._wet = np.zeros(0)
+        self._dry = np.zeros(0)
+        self._silence = np.zeros(0)
+        self._ringing = np.zeros(0)
+
+    def __call__(self, data: np.ndarray, config: Any, room_size: float = 0.8,
+                 mix: float = 0.6, out: Optional[np.ndarray] = None) -> np.ndarray:
+        self.sample_rate = config.RATE
+        return self.process(data, room_size=room_size, mix=mix, out=out)
+
+    @staticmethod
+    def is_identity(params: Mapping[str, Any]) -> bool:
+        return params.get('mix') == 0
+
+    def make_impulse_response(self, room_size: float) -> np.ndarray:
+        """Exponentially decaying noise normalized to unit energy"""
+        length = max(1, int(room_size * self.sample_rate))
+        rng = np.random.default_rng(self.seed)
+        envelope = np.exp(-3 * np.arange(length) / length)
+        impulse_response = rng.standard_normal(length) * envelope
+        return impulse_response / np.sqrt(np.sum(impulse_response ** 2))
+
+    def _prepare(self, room_size: float):
+        if self.convolver is not None and room_size == self.room_size:
+            return
+        if self.convolver is not None:
+            self._draining.append([self.convolver, len(self.convolver.impulse_response)])
+        self.room_size = room_size
+        self.convolver = PartitionedConvolver(
+            self.make_impulse_response(room_size), self.block_size
+        )
+
+    @property
+    def tail(self) -> int:
+        """Length of the current impulse response, 0 before the first block"""
+        current = len(self.convolver.impulse_response) if self.convolver is not None else 0
+        return max([current] + [remaining for _, remaining in self._draining])
+
+    def reset(self):
+        if self.convolver is not None:
+            self.convolver.reset()
+        self._draining.clear()
+
+    def _add_draining(self, wet: np.ndarray):
+        """Mix the tails of replaced convolvers into ``wet``, dropping finished ones"""
+        if len(self._silence) != len(wet):
+            self._silence = np.zeros(len(wet))
+            self._ringing = np.empty(len(wet))
+        for entry in self._draining:
+            wet += entry[0].process(self._silence, out=self._ringing)
+            entry[1] -= len(wet)
+        self._draining = [entry for entry in self._draining if entry[1] > 0]
+
+    def process(self, data: np.ndarray, room_size: float = 0.8, mix: float = 0.6,
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply reverb to a block, keeping the tail for the next call"""
+        if len(data) == 0:
+            return data
+
+        self._prepare(room_size)
+
+        if len(self._wet) != len(data):
+            self._wet = np.empty(len(data))
+            self._dry = np.empty(len(data))
+        dry = to_float32(data)
+        wet = self.convolver.process(dry, out=self._wet)
+        if self._draining:
+            self._add_draining(wet)
+        wet *= mix
+        wet += np.multiply(dry, 1.0 - mix, out=self._dry)
+
+        if out is None:
+            out = np.empty(len(data), dtype=data.dtype)
+        return match_format(wet, data, out)
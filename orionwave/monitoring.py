@@ -1,39 +1,169 @@
 import time
 import psutil
 import json
+import numpy as np
 from contextlib import contextmanager
-from typing import Dict
+from typing import Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Log-bucket histogram layout: bucket 0 holds everything under MIN_NS, then
+# 2**SUB_BITS buckets per doubling (~9% wide) for OCTAVES doublings (~1 s),
+# and the last bucket catches anything longer.
+MIN_BITS = 10
+MIN_NS = 1 << MIN_BITS
+SUB_BITS = 3
+OCTAVES = 20
+HISTOGRAM_BUCKETS = 2 + OCTAVES * (1 << SUB_BITS)
+
+# Recent durations kept per stage for sliding-window views
+WINDOW_SIZE = 1024
+
+
+def bucket_index(duration_ns: int) -> int:
+    """Histogram bucket of a duration, from integer bit operations only"""
+    if duration_ns < MIN_NS:
+        return 0
+    bits = duration_ns.bit_length()
+    sub = (duration_ns >> (bits - 1 - SUB_BITS)) & ((1 << SUB_BITS) - 1)
+    return min(1 + ((bits - 1 - MIN_BITS) << SUB_BITS) + sub, HISTOGRAM_BUCKETS - 1)
+
+
+def _bucket_bounds() -> np.ndarray:
+    bounds = np.empty(HISTOGRAM_BUCKETS, dtype=np.float64)
+    bounds[0] = MIN_NS
+    for index in range(1, HISTOGRAM_BUCKETS - 1):
+        octave, sub = divmod(index - 1, 1 << SUB_BITS)
+        bounds[index] = ((1 << SUB_BITS) + sub + 1) << (octave + MIN_BITS - SUB_BITS)
+    bounds[-1] = np.inf
+    return bounds
+
+
+# Upper edge of each bucket in nanoseconds
+BUCKET_BOUNDS = _bucket_bounds()
+
+
+class StageTimings:
+    """Latency record of one processing stage.
+
+    :meth:`record` only updates preallocated counters: a fixed log-bucket
+    histogram over the stage's lifetime, a ring of the last ``window``
+    durations for sliding-window views, and a count of durations over
+    ``deadline_ns``. Summaries are computed on read.
+    """
+
+    def __init__(self, name: str, deadline_ns: int = 0, window: int = WINDOW_SIZE):
+        self.name = name
+        self.deadline_ns = deadline_ns
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.recent = np.zeros(window, dtype=np.int64)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.misses = 0
+
+    def record(self, duration_ns: int):
+        self.counts[bucket_index(duration_ns)] += 1
+        self.recent[self.count % len(self.recent)] = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        if self.deadline_ns and duration_ns > self.deadline_ns:
+            self.misses += 1
+
+    def reset(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.recent.fill(0)
+        self.count = self.total_ns = self.max_ns = self.misses = 0
+
+    def percentile(self, q: float) -> float:
+        """Upper edge in seconds of the bucket holding the ``q``th percentile"""
+        if not self.count:
+            return 0.0
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, q / 100.0 * cumulative[-1]))
+        return min(BUCKET_BOUNDS[index], self.max_ns) / 1e9
+
+    def summary(self, window: bool = False) -> Dict[str, float]:
+        """Count, mean, p50/p95/p99, max (seconds) and deadline misses.
+
+        With ``window`` the figures are exact and cover only the last
+        ``len(recent)`` durations; otherwise they come from the lifetime
+        histogram.
+        """
+        if window:
+            durations = self.recent[:min(self.count, len(self.recent))].copy()
+            if not len(durations):
+                return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0,
+                        'max': 0.0, 'misses': 0}
+            p50, p95, p99 = np.percentile(durations, (50, 95, 99)) / 1e9
+            return {
+                'count': len(durations),
+                'mean': float(durations.mean()) / 1e9,
+                'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                'max': float(durations.max()) / 1e9,
+                'misses': int(np.count_nonzero(durations > self.deadline_ns)) if self.deadline_ns else 0,
+            }
+        return {
+            'count': self.count,
+            'mean': self.total_ns / self.count / 1e9 if self.count else 0.0,
+            'p50': self.percentile(50), 'p95': self.percentile(95), 'p99': self.percentile(99),
+            'max': self.max_ns / 1e9,
+            'misses': self.misses,
+        }
+
+
 class PerformanceMonitor:
-    def __init__(self):
-        self.timings = {}
-        self.timing_counts = {}
+    """Per-stage latency statistics for the processing path.
+
+    Hot paths register a stage once with :meth:`stage` and call
+    ``record(time.perf_counter_ns() - start)`` on it, which does not
+    allocate. Stages registered with ``deadline=True`` count a miss
+    whenever they take longer than ``block_seconds``, the time one block
+    of audio lasts.
+    """
+
+    def __init__(self, block_seconds: Optional[float] = None):
+        self.deadline_ns = int(block_seconds * 1e9) if block_seconds else 0
+        self.stages: Dict[str, StageTimings] = {}
         self.process = psutil.Process()
         self.start_time = time.time()
 
+    def stage(self, operation: str, deadline: bool = False) -> StageTimings:
+        timings = self.stages.get(operation)
+        if timings is None:
+            timings = StageTimings(operation, self.deadline_ns if deadline else 0)
+            self.stages[operation] = timings
+        return timings
+
     @contextmanager
     def measure_performance(self, operation: str):
-        start_time = time.time()
+        """Time a block of code; convenient, but allocates, so not for the callback"""
+        timings = self.stage(operation)
+        start = time.perf_counter_ns()
         try:
             yield
         finally:
-            duration = time.time() - start_time
-            if operation not in self.timings:
-                self.timings[operation] = 0
-                self.timing_counts[operation] = 0
-            self.timings[operation] += duration
-            self.timing_counts[operation] += 1
+            timings.record(time.perf_counter_ns() - start)
+
+    @property
+    def deadline_misses(self) -> int:
+        return sum(timings.misses for timings in self.stages.values())
 
     def get_average_time(self, operation: str) -> float:
-        if operation in self.timings:
-            return self.timings[operation] / self.timing_counts[operation]
+        timings = self.stages.get(operation)
+        if timings and timings.count:
+            return timings.total_ns / timings.count / 1e9
         return 0.0
 
     def get_all_timings(self) -> Dict[str, float]:
-        return {op: self.get_average_time(op) for op in self.timings}
+        return {op: self.get_average_time(op) for op in self.stages}
+
+    def get_latency_stats(self, window: bool = False) -> Dict[str, Dict[str, float]]:
+        """:meth:`StageTimings.summary` of every stage"""
+        return {op: timings.summary(window) for op, timings in self.stages.items()}
 
     def get_cpu_usage(self) -> float:
         return self.process.cpu_percent()
@@ -49,10 +179,12 @@ class PerformanceMonitor:
         stats = {
             "total_runtime": time.time() - self.start_time,
             "average_timings": self.get_all_timings(),
+            "latency": self.get_latency_stats(),
+            "deadline_misses": self.deadline_misses,
             "cpu_usage": self.get_cpu_usage(),
             "memory_usage": self.get_memory_usage()
         }
-        
+
         try:
             with open("performance_stats.json", "w") as f:
                 json.dump(stats, f, indent=2)
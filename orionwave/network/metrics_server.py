@@ -0,0 +1,195 @@
+import asyncio
+import time
+import logging
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from ..monitoring import BUCKET_BOUNDS, SUB_BITS, StageTimings
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Exported histogram edges: one per doubling of the monitor's buckets
+EXPORT_BUCKETS = tuple(range(0, len(BUCKET_BOUNDS) - 1, 1 << SUB_BITS))
+
+
+class Sample(NamedTuple):
+    suffix: str
+    labels: Tuple[Tuple[str, str], ...]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    name: str  # Without the _total suffix for counters
+    type: str
+    help: str
+    samples: List[Sample]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics(families: Sequence[MetricFamily], openmetrics: bool = False) -> bytes:
+    """Render metric families in the Prometheus 0.0.4 or OpenMetrics text format"""
+    lines = []
+    for family in families:
+        # Prometheus names the counter family after its samples; OpenMetrics does not
+        name = family.name + '_total' if family.type == 'counter' and not openmetrics else family.name
+        lines.append(f"# HELP {name} {family.help}")
+        lines.append(f"# TYPE {name} {family.type}")
+        for sample in family.samples:
+            labels = ','.join(f'{key}="{_escape(value)}"' for key, value in sample.labels)
+            labels = f"{{{labels}}}" if labels else ''
+            lines.append(f"{family.name}{sample.suffix}{labels} {_format_value(sample.value)}")
+    if openmetrics:
+        lines.append('# EOF')
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def _histogram_samples(stage: str, timings: StageTimings) -> List[Sample]:
+    samples, cumulative, previous = [], 0, 0
+    for index in EXPORT_BUCKETS:
+        cumulative += sum(timings.counts[previous:index + 1])
+        previous = index + 1
+        samples.append(Sample('_bucket', (('stage', stage), ('le', _format_value(BUCKET_BOUNDS[index] / 1e9))),
+                              cumulative))
+    samples.append(Sample('_bucket', (('stage', stage), ('le', '+Inf')), timings.count))
+    samples.append(Sample('_sum', (('stage', stage),), timings.total_ns / 1e9))
+    samples.append(Sample('_count', (('stage', stage),), timings.count))
+    return samples
+
+
+class MetricsServer:
+    """Serves processor telemetry to Prometheus over HTTP.
+
+    A task on the server's event loop rebuilds the exposition every
+    ``interval`` seconds from counters the audio thread already keeps;
+    scrapes only send the latest bytes, so they cost the audio thread
+    nothing. ``GET /metrics`` answers in OpenMetrics when the scraper asks
+    for it and in the Prometheus text format otherwise.
+    """
+
+    def __init__(self, processor, host: str = 'localhost', port: int = 9108,
+                 interval: float = 1.0):
+        self.processor = processor
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self._payloads: Dict[bool, bytes] = {False: b'', True: b'# EOF\n'}
+        self._vad_frames = (0, 0)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        try:
+            self._server = await asyncio.start_server(self.handle_scrape, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            logger.info(f"Metrics server running on http://{self.host}:{self.port}/metrics")
+            while True:
+                self.refresh()
+                await asyncio.sleep(self.interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Metrics server error: {e}")
+        finally:
+            if self._server is not None:
+                self._server.close()
+
+    def refresh(self):
+        tracer = getattr(self.processor, 'tracer', None)
+        start = time.perf_counter_ns()
+        try:
+            families = self.collect()
+            self._payloads = {False: render_metrics(families), True: render_metrics(families, True)}
+        except Exception as e:
+            logger.error(f"Failed to collect metrics: {e}")
+        if tracer is not None:
+            tracer.record(tracer.name_id('metrics_refresh'), start, time.perf_counter_ns())
+
+    def collect(self) -> List[MetricFamily]:
+        processor = self.processor
+        monitor = processor.monitor
+        stages = processor.stage_timings()
+
+        latency = MetricFamily('orionwave_stage_latency_seconds', 'histogram',
+                               'Processing time per block by stage', [])
+        recent = MetricFamily('orionwave_stage_latency_recent_seconds', 'gauge',
+                              'Quantiles of processing time over the last blocks by stage', [])
+        misses = MetricFamily('orionwave_deadline_misses', 'counter',
+                              'Blocks processed slower than real time', [])
+        for name, timings in stages.items():
+            latency.samples.extend(_histogram_samples(name, timings))
+            summary = timings.summary(window=True)
+            for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99'), ('1', 'max')):
+                recent.samples.append(Sample('', (('stage', name), ('quantile', quantile)), summary[key]))
+            if timings.deadline_ns:
+                misses.samples.append(Sample('_total', (('stage', name),), timings.misses))
+
+        depth = MetricFamily('orionwave_queue_depth', 'gauge', 'Items waiting in each queue', [])
+        dropped = MetricFamily('orionwave_queue_dropped', 'counter',
+                               'Items dropped because a queue was full', [])
+        for queue, stats in processor.queue_stats().items():
+            depth.samples.append(Sample('', (('queue', queue),), stats['depth']))
+            dropped.samples.append(Sample('_total', (('queue', queue),), stats['dropped']))
+
+        vad = processor.vad
+        frames, active = vad.frames - self._vad_frames[0], vad.active_frames - self._vad_frames[1]
+        self._vad_frames = (vad.frames, vad.active_frames)
+        memory = monitor.get_memory_usage()
+
+        return [
+            latency, recent, misses, depth, dropped,
+            MetricFamily('orionwave_vad_frames', 'counter', 'Blocks classified by the VAD',
+                         [Sample('_total', (), vad.frames)]),
+            MetricFamily('orionwave_vad_active_frames', 'counter', 'Blocks the VAD passed as speech',
+                         [Sample('_total', (), vad.active_frames)]),
+            MetricFamily('orionwave_vad_duty_cycle', 'gauge',
+                         'Share of blocks passed as speech since the previous refresh',
+                         [Sample('', (), active / frames if frames else 0.0)]),
+            MetricFamily('orionwave_process_cpu_percent', 'gauge',
+                         'CPU use of the process since the previous refresh',
+                         [Sample('', (), monitor.get_cpu_usage())]),
+            MetricFamily('orionwave_process_resident_memory_bytes', 'gauge', 'Resident memory size',
+                         [Sample('', (), int(memory['rss'] * 1024 * 1024))]),
+            MetricFamily('orionwave_process_virtual_memory_bytes', 'gauge', 'Virtual memory size',
+                         [Sample('', (), int(memory['vms'] * 1024 * 1024))]),
+            MetricFamily('orionwave_uptime_seconds', 'gauge', 'Seconds since the monitor started',
+                         [Sample('', (), time.time() - monitor.start_time)]),
+        ]
+
+    async def handle_scrape(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            parts = request.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET' or parts[1].split('?')[0] != '/metrics':
+                status, content_type, body = '404 Not Found', 'text/plain', b'Not found\n'
+            else:
+                openmetrics = 'application/openmetrics-text' in headers.get('accept', '')
+                status = '200 OK'
+                content_type = OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+                body = self._payloads[openmetrics]
+
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except Exception as e:
+            logger.error(f"Metrics scrape error: {e}")
+        finally:
+            writer.close()
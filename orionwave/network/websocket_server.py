@@ -1,4 +1,5 @@
 import asyncio
+import time
 import websockets
 import json
 from typing import Dict, Any
@@ -49,6 +50,8 @@ class VoiceChangerServer:
 
     async def process_command(self, websocket, message):
         """Process incoming commands"""
+        tracer = getattr(self.processor, 'tracer', None)
+        start = time.perf_counter_ns()
         try:
             data = json.loads(message)
             command = data.get('command')
@@ -58,6 +61,10 @@ class VoiceChangerServer:
                 self.processor.add_effect(params['name'], params.get('settings'))
                 await self.broadcast_status()
 
+            elif command == 'set_param':
+                self.processor.set_effect_param(params['name'], params['param'], params['value'])
+                await self.broadcast_status()
+
             elif command == 'load_preset':
                 self.processor.load_preset(params['name'])
                 await self.broadcast_status()
@@ -73,6 +80,9 @@ class VoiceChangerServer:
                 'type': 'error',
                 'message': str(e)
             }))
+        finally:
+            if tracer is not None:
+                tracer.record(tracer.name_id('server_command'), start, time.perf_counter_ns())
 
     async def broadcast_status(self):
         """Broadcast current status to all clients"""
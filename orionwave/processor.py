@@ -1,28 +1,31 @@
 import numpy as np
-import pyaudio
 import logging
 import time
 import threading
-from typing import Optional, Dict, Callable
+from functools import cached_property, partial
+from typing import Optional, Dict, Callable, Mapping, Tuple
 from .config import AudioConfig
 from .effects import (
     apply_pitch_shift, 
     apply_robot_effect,
-    apply_reverb, 
     apply_compression, 
-    apply_eq
+    StreamingEQ,
+    ConvolutionReverb,
+    PhaseVocoderPitchShifter,
+    WSOLAPitchShifter
 )
-from .plugins.plugin_manager import PluginManager
-from .monitoring import PerformanceMonitor
-from .recording import RecordingManager
+from .effects.chain import RAMP_SECONDS, EffectsPlan, compile_plan
+from .effects.parameters import ParameterStore
+from .monitoring import PerformanceMonitor, StageTimings
+from .tracing import TRACE_CAPACITY, SpanTracer, TraceDumper
 from .audio.noise_reduction import NoiseReducer  # Updated import path
 from .audio.vad import VoiceActivityDetector
-from .audio.presets import PresetManager
+from .audio.analysis_worker import AnalysisWorker
 from .audio.enhancer import AudioEnhancer
 from .audio.analyzer import AudioAnalyzer
-from .automation import ParameterAutomation
-from .visualization.spectrum_analyzer import SpectrumAnalyzer
-from .effects.neural_enhancer import NeuralEnhancer
+from .audio.sample_format import BlockConverter
+from .automation import ParameterAutomation, build_envelope
+from .visualization.spectrum_analyzer import SpectrumAnalyzer, VisualizationData
 from .audio.routing import AudioRouter
 import asyncio
 
@@ -30,63 +33,165 @@ import asyncio
 import warnings
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
-try:
-    import sounddevice as sd
-    sd._initialize()
-except Exception as e:
-    logger.warning(f"Audio initialization warning: {e}")
+logger = logging.getLogger(__name__)
 
-try:
-    from .audio.plugins.vst_wrapper import VSTPlugin
-except ImportError:
-    logger.warning("VST support not available")
-    VSTPlugin = None
+# Smallest change worth publishing when adapting effects to the analysis
+ADAPT_TOLERANCE = 0.02
 
-logger = logging.getLogger(__name__)
+# Stages of process_block timed by the performance monitor
+PROCESSING_STAGES = ('analysis', 'vad', 'neural_enhancer', 'noise_reduction', 'effects', 'enhancer', 'recording')
 
 class VoiceProcessor:
-    def __init__(self, config: AudioConfig, start_server: bool = False):
-        try:
-            self.pyaudio = pyaudio.PyAudio()
-        except Exception as e:
-            logger.warning(f"PyAudio initialization warning: {e}")
-            self.pyaudio = None
+    def __init__(self, config: AudioConfig, start_server: bool = False, vad_enabled: bool = True):
         self.config = config
         self.input_stream = None
         self.output_stream = None
-        self.monitor = PerformanceMonitor()
+        self.monitor = PerformanceMonitor(config.CHUNK / config.RATE)
+        # Registered up front so the callback only records into them
+        self._timings = {
+            'audio_processing': self.monitor.stage('audio_processing', deadline=True),
+            **{name: self.monitor.stage(name) for name in PROCESSING_STAGES}
+        }
+        tracing = (config.EFFECTS or {}).get('tracing', {})
+        self.tracer = SpanTracer(tracing.get('capacity', TRACE_CAPACITY)) if tracing.get('enabled') else None
+        self.trace_dumper = None
+        self._trace_ids = {name: self.tracer.name_id(name) for name in self._timings} if self.tracer else {}
         self.effects_chain = []
+        self._plan = EffectsPlan()
+        # Control-side only: serializes chain edits, never taken by the audio thread
+        self._plan_lock = threading.RLock()
+        self.parameters = ParameterStore()
+        ramp_ms = (config.EFFECTS or {}).get('parameters', {}).get('ramp_ms', 1000 * RAMP_SECONDS)
+        self.ramp_samples = max(1, int(config.RATE * ramp_ms / 1000))
         self.audio_buffer = np.array([], dtype=np.int16)
+        # int16 PCM is converted once on the way in and once on the way out
+        self.converter = BlockConverter(config.CHUNK)
+        self._work = np.zeros(config.CHUNK, dtype=np.float32)
+        self._fade = np.zeros(0, dtype=np.float32)
+        # Dry signal delayed by ``latency`` so the VAD crossfades aligned blocks
+        self._dry_line = np.zeros(0, dtype=np.float32)
+        self._dry = np.zeros(0, dtype=np.float32)
+        # Samples since the VAD gate closed, and whether the stages are sitting out
+        self._quiet = 0
+        self._idle = False
+        # Without the VAD gate every block is treated as voice, as for offline rendering
+        self.vad_enabled = vad_enabled
         self.setup_effects_chain()
-        self.recording_manager = RecordingManager(config)
-        self.plugin_manager = PluginManager()
-        self.plugin_manager.discover_plugins()
         self.noise_reducer = NoiseReducer(config.RATE)
-        self.vad = VoiceActivityDetector(config.RATE)
-        self.preset_manager = PresetManager()
+        self.vad = VoiceActivityDetector(config.RATE, **(config.EFFECTS or {}).get('vad', {}))
         self.enhancer = AudioEnhancer(config.RATE)
         self.analyzer = AudioAnalyzer(config.RATE, config.CHUNK)
-        self.automation = ParameterAutomation()
-        self.analysis_results = {}
-        self.voice_active = False
+        self.automation = ParameterAutomation(config.RATE)
+        self.voice_active = not vad_enabled
         self.spectrum_analyzer = SpectrumAnalyzer(config.RATE, config.CHUNK)
-        self.visualization_data = None
+        self.analysis_worker = AnalysisWorker(
+            config.RATE, config.CHUNK,
+            spectrum_analyzer=self.spectrum_analyzer,
+            analyzer=self.analyzer,
+            on_results=self._adapt_effects_to_audio,
+            tracer=self.tracer
+        )
         self.router = AudioRouter()
-        self.neural_enhancer = NeuralEnhancer()
-        self.vst_plugins = {}
         self.recording_active = False
+        # PortAudio's paContinue/paAbort; replaced by pyaudio's own values once it loads
+        self._pa_continue = 0
+        self._pa_abort = 2
+        self._devices = None
         self._setup_routing()
-        self._load_vst_plugins()
+        self.metrics_server = None
         self._initialize_server() if start_server else None
 
+    # Subsystems below are built on first use, so heavy imports (PortAudio,
+    # torch, soundfile) and their side effects only happen when needed.
+
+    @cached_property
+    def pyaudio(self):
+        """PortAudio handle, opened on first device query or stream"""
+        try:
+            import pyaudio
+            self._pa_continue, self._pa_abort = pyaudio.paContinue, pyaudio.paAbort
+            return pyaudio.PyAudio()
+        except Exception as e:
+            logger.warning(f"PyAudio initialization warning: {e}")
+            return None
+
+    @cached_property
+    def recording_manager(self):
+        from .recording import RecordingManager
+        return RecordingManager(self.config)
+
+    @cached_property
+    def plugin_manager(self):
+        from .plugins.plugin_manager import PluginManager
+        plugin_manager = PluginManager()
+        plugin_manager.discover_plugins()
+        return plugin_manager
+
+    @cached_property
+    def preset_manager(self):
+        from .audio.presets import PresetManager
+        return PresetManager()
+
+    @cached_property
+    def vst_plugins(self) -> Dict:
+        return self._load_vst_plugins()
+
+    @property
+    def neural_enhancer_enabled(self) -> bool:
+        """Enabled in config explicitly, or implicitly by giving it a model"""
+        settings = (self.config.EFFECTS or {}).get('neural_enhancer', {})
+        return settings.get('enabled', bool(settings.get('model_path') or settings.get('backend_path')))
+
+    @cached_property
+    def neural_enhancer(self):
+        settings = dict((self.config.EFFECTS or {}).get('neural_enhancer', {}))
+        settings.pop('enabled', None)
+        if settings.pop('out_of_process', False):
+            from .effects.enhancer_process import ProcessEnhancer
+            # Keeps model inference off the audio callback's core and GIL
+            return ProcessEnhancer(self.config.CHUNK, self.config.RATE, **settings)
+        from .effects.neural_enhancer import NeuralEnhancer
+        return NeuralEnhancer(**settings)
+
+    @property
+    def latency(self) -> int:
+        """Samples the processed signal lags the input by"""
+        latency = self._plan.latency
+        if self.neural_enhancer_enabled and self.neural_enhancer.enabled:
+            latency += self.neural_enhancer.latency
+        if self.noise_reducer.initialized:
+            latency += self.noise_reducer.latency
+        return latency
+
+    @property
+    def tail(self) -> int:
+        """Samples the effects keep ringing after the input stops"""
+        return self._plan.tail
+
+    @property
+    def analysis_results(self) -> Mapping[str, float]:
+        """Latest immutable analysis snapshot from the worker"""
+        return self.analysis_worker.analysis_results
+
+    @property
+    def visualization_data(self) -> Optional[VisualizationData]:
+        return self.analysis_worker.visualization_data
+
     def _initialize_server(self):
         """Initialize WebSocket server separately to avoid circular imports"""
         from .network.websocket_server import VoiceChangerServer
         self.server = VoiceChangerServer(self)
+        settings = dict((self.config.EFFECTS or {}).get('metrics', {}))
+        if settings.pop('enabled', False):
+            from .network.metrics_server import MetricsServer
+            self.metrics_server = MetricsServer(self, **settings)
         self._start_server()
 
-    def get_available_devices(self) -> Dict[int, str]:
-        """Get available audio devices with better detection"""
+    def get_available_devices(self, refresh: bool = False) -> Dict[int, str]:
+        """Get available audio devices, probing PortAudio only once unless refreshed"""
+        if self._devices is not None and not refresh:
+            return dict(self._devices)
+
         devices = {}
         try:
             default_input = self.pyaudio.get_default_input_device_info()
@@ -124,16 +229,19 @@ class VoiceProcessor:
             # Fallback to default devices
             devices[-1] = "Input: Default System Input"
             devices[-2] = "Output: Default System Output"
-            
-        return devices
+
+        self._devices = devices
+        return dict(devices)
 
     def setup_effects_chain(self):
+        # Classes are factories: every chain entry gets its own instance and state
         self.effects_registry = {
-            'pitch_shift': apply_pitch_shift,
+            'pitch_shift': partial(PhaseVocoderPitchShifter, self.config.RATE),
+            'pitch_shift_wsola': partial(WSOLAPitchShifter, self.config.RATE),
             'robot': apply_robot_effect,
-            'reverb': apply_reverb,
+            'reverb': partial(ConvolutionReverb, self.config.RATE, self.config.CHUNK),
             'compressor': apply_compression,
-            'equalizer': apply_eq
+            'equalizer': partial(StreamingEQ, self.config.RATE)
         }
 
     def initialize_streams(self, input_device_index=None, output_device_index=None):
@@ -157,6 +265,19 @@ class VoiceProcessor:
                 frames_per_buffer=self.config.CHUNK
             )
             
+            if self.neural_enhancer_enabled:
+                # Load the model now rather than inside the first callback
+                self.neural_enhancer
+            if (self.config.EFFECTS or {}).get('recording', {}).get('pre_roll'):
+                # Pre-roll needs the recorder listening before recording starts
+                self.recording_manager.start()
+            if self.tracer is not None:
+                tracing = self.config.EFFECTS['tracing']
+                self.trace_dumper = TraceDumper(self.tracer, tracing.get('directory', 'traces'),
+                                                tracing.get('before_ms', 500) / 1000,
+                                                tracing.get('after_ms', 100) / 1000)
+                self.trace_dumper.start()
+            self.analysis_worker.start()
             logger.info("Audio streams initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize audio streams: {e}")
@@ -173,148 +294,353 @@ class VoiceProcessor:
         self.noise_reducer.calibrate(noise_sample)
 
     def _audio_callback(self, in_data, frame_count, time_info, status):
-        with self.monitor.measure_performance("audio_processing"):
+        try:
+            samples = self.converter.to_float(np.frombuffer(in_data, dtype=np.int16))
+            processed = self.process_block(samples)
+            return (self.converter.to_pcm(processed).tobytes(), self._pa_continue)
+        except Exception as e:
+            logger.error(f"Critical error in audio callback: {e}")
+            return (in_data, self._pa_abort)
+
+    def process_block(self, samples: np.ndarray) -> np.ndarray:
+        """Run one float32 block through analysis and processing.
+
+        ``samples`` is left untouched. The returned array may be an internal
+        buffer and is only valid until the next call.
+        """
+        timings = self._timings
+        clock = time.perf_counter_ns
+        block_start = start = clock()
+        was_active = self.voice_active
+        try:
+            # Spectrum and feature analysis run on the worker thread
             try:
-                audio_data = np.frombuffer(in_data, dtype=np.int16)
-                processed_data = audio_data  # Default to unprocessed audio
-                
-                # Safe analysis
-                try:
-                    self.visualization_data = self.spectrum_analyzer.analyze(audio_data)
-                    self.analysis_results = self.analyzer.analyze_frame(audio_data)
-                    
-                    # Use safe get() for dict access
-                    rms = self.analysis_results.get('rms', 0)
-                    self.voice_active = self.vad.is_speech(audio_data) and rms > 0.1
-                except Exception as e:
-                    logger.error(f"Analysis error: {e}")
-                    self.voice_active = True  # Default to active on error
-                
-                if self.voice_active:
-                    try:
-                        # Neural enhancement with error check
-                        if hasattr(self.neural_enhancer, 'enabled') and self.neural_enhancer.enabled:
-                            audio_data = self.neural_enhancer.enhance(audio_data)
-                        
-                        # Rest of processing chain
-                        if self.noise_reducer.initialized:
-                            audio_data = self.noise_reducer.process(audio_data)
-                        
-                        self._adapt_effects_to_audio()
-                        processed_data = self.process_effects_chain(audio_data)
-                        processed_data = self.enhancer.process(processed_data)
-                        
-                        if self.recording_active:
-                            self.recording_manager.add_audio(processed_data)
-                    except Exception as e:
-                        logger.error(f"Processing error: {e}")
-                        processed_data = audio_data  # Use original audio on error
-
-                return (processed_data.tobytes(), pyaudio.paContinue)
-                
+                self.analysis_worker.submit(samples)
             except Exception as e:
-                logger.error(f"Critical error in audio callback: {e}")
-                return (in_data, pyaudio.paAbort)
+                logger.error(f"Analysis error: {e}")
+            start = self._lap('analysis', start)
+
+            # Only the VAD decision is needed inline; it holds through
+            # short pauses so the effect chain does not chatter
+            try:
+                self.voice_active = self.vad.is_speech(samples) if self.vad_enabled else True
+            except Exception as e:
+                logger.error(f"VAD error: {e}")
+                self.voice_active = True  # Default to active on error
+            start = self._lap('vad', start)
+
+            try:
+                if len(self._work) != len(samples):
+                    self._work = np.empty(len(samples), dtype=np.float32)
+
+                # The stages keep running through the VAD hangover and, once the
+                # gate has closed, until latency buffers and tails have rung out.
+                # After that they sit out silence and are primed again on voice
+                if self.voice_active or was_active:
+                    if self._idle:
+                        self._idle = False
+                        start = self._prime(start)
+                    self._quiet = 0
+                elif self._quiet < self.latency + self.tail:
+                    self._quiet += len(samples)
+                else:
+                    self._idle = True
+
+                if self._idle:
+                    self._advance_effects_chain(len(samples))
+                    processed_data = self._delay_dry(samples)
+                else:
+                    audio_data = self._work
+                    np.copyto(audio_data, samples)
+                    processed_data, start = self._run_stages(audio_data, start)
+                    processed_data = self._gate(self._delay_dry(samples), processed_data, was_active)
+                self._record(processed_data)
+                self._lap('recording', start)
+                return processed_data
+            except Exception as e:
+                logger.error(f"Processing error: {e}")
+                return samples  # Use original audio on error
+        finally:
+            end = clock()
+            timings['audio_processing'].record(end - block_start)
+            tracer = self.tracer
+            if tracer is not None:
+                tracer.record(self._trace_ids['audio_processing'], block_start, end)
+                deadline_ns = timings['audio_processing'].deadline_ns
+                if deadline_ns and end - block_start > deadline_ns:
+                    tracer.mark_miss(end)
+
+    def _run_stages(self, audio_data: np.ndarray, start: int,
+                    priming: bool = False) -> Tuple[np.ndarray, int]:
+        """Enhancement, noise reduction, effects and EQ, in place on ``audio_data``"""
+        if self.neural_enhancer_enabled and self.neural_enhancer.enabled:
+            self.neural_enhancer.enhance(audio_data, out=audio_data)
+            start = self._lap('neural_enhancer', start)
+        if self.noise_reducer.initialized:
+            self.noise_reducer.process(audio_data, out=audio_data)
+            start = self._lap('noise_reduction', start)
+
+        # Priming replays past input, so parameters and lanes stay where they are
+        processed_data = self._plan.run(audio_data) if priming else self.process_effects_chain(audio_data)
+        start = self._lap('effects', start)
+        processed_data = self.enhancer.process(processed_data, out=audio_data)
+        start = self._lap('enhancer', start)
+        return processed_data, start
+
+    def _prime(self, start: int) -> int:
+        """Run the stages over the recent input kept by the dry line, discarding the output.
+
+        Their buffers then hold the input they missed while idle, so the
+        next block comes out aligned behind ``latency`` as usual.
+        """
+        size = len(self._work)
+        if len(self._dry) != size:
+            return start  # The block size changed; the line has no whole blocks to replay
+        for offset in range(0, len(self._dry_line) - size, size):
+            np.copyto(self._work, self._dry_line[offset:offset + size])
+            _, start = self._run_stages(self._work, start, priming=True)
+        return start
+
+    def _delay_dry(self, samples: np.ndarray) -> np.ndarray:
+        """``samples`` delayed by ``latency`` through a line kept across blocks.
+
+        The line holds the latency rounded up to whole blocks of past input,
+        which :meth:`_prime` replays.
+        """
+        latency, size = self.latency, len(samples)
+        if not latency:
+            return samples
+        history = -(-latency // size) * size
+        line = self._dry_line
+        if len(line) != history + size:
+            line = self._dry_line = np.zeros(history + size, dtype=np.float32)
+            self._dry = np.empty(size, dtype=np.float32)
+        line[history:] = samples
+        np.copyto(self._dry, line[history - latency:history - latency + size])
+        line[:history] = line[size:]
+        return self._dry
+
+    def _gate(self, dry: np.ndarray, wet: np.ndarray, was_active: bool) -> np.ndarray:
+        """Pick the wet or dry block by the VAD, crossfading over a block when it flips"""
+        if self.voice_active and was_active:
+            return wet
+        if not (self.voice_active or was_active):
+            return dry
+        if len(self._fade) != len(wet):
+            self._fade = ((np.arange(len(wet)) + 0.5) / len(wet)).astype(np.float32)
+        wet -= dry
+        wet *= self._fade if self.voice_active else self._fade[::-1]
+        wet += dry
+        return wet
+
+    def _lap(self, stage: str, start: int) -> int:
+        now = time.perf_counter_ns()
+        self._timings[stage].record(now - start)
+        if self.tracer is not None:
+            self.tracer.record(self._trace_ids[stage], start, now)
+        return now
+
+    def _record(self, audio_data: np.ndarray):
+        # Only a recorder that already exists can want audio (recording or pre-roll)
+        recorder = self.__dict__.get('recording_manager')
+        if recorder is not None:
+            recorder.add_audio(audio_data)
 
     def process_effects_chain(self, audio_data: np.ndarray) -> np.ndarray:
-        processed_data = audio_data
-        for effect, params in self.effects_chain:
-            with self.monitor.measure_performance(f"effect_{effect}"):
-                effect_func = self.effects_registry.get(effect)
-                if effect_func:
-                    # Handle legacy filter types
-                    if effect == 'equalizer' and 'type' in params:
-                        if params['type'] == 'highshelf':
-                            params['type'] = 'high_shelf'
-                        elif params['type'] == 'lowshelf':
-                            params['type'] = 'low_shelf'
-                    processed_data = effect_func(processed_data, self.config, **params)
-        return processed_data
+        # One read each; neither the plan nor the snapshot changes underneath us.
+        # The snapshot is read before the lanes: automate_effect_param publishes
+        # in the opposite order, so a block that sees a lane's target also sees the lane
+        plan = self._plan
+        snapshot = self.parameters.snapshot
+        automation = self.automation.process(len(audio_data), plan.layout)
+        return plan.run(audio_data, snapshot, automation)
+
+    def _advance_effects_chain(self, count: int):
+        """Keep parameter ramps and automation lanes moving while the effects are idle"""
+        plan = self._plan
+        snapshot = self.parameters.snapshot
+        plan.advance(count, snapshot, self.automation.process(count, plan.layout))
+
+    def _set_effects_chain(self, chain, reuse: bool = True):
+        """Compile ``chain`` and swap it in, leaving everything unchanged on error"""
+        with self._plan_lock:
+            plan = compile_plan(chain, self.effects_registry, self.config,
+                                previous=self._plan if reuse else None,
+                                layout=self.parameters.layout + 1,
+                                ramp_samples=self.ramp_samples,
+                                tracer=self.tracer)
+            # Until the plan is swapped the old one ignores the new layout's targets
+            self.parameters.reset(plan.targets(), plan.layout)
+            self.effects_chain = list(chain)
+            self._plan = plan
+
+    def set_effect_param(self, effect: str, param: str, value):
+        """Change a parameter of the first ``effect`` in the chain.
+
+        Continuous parameters are published to the parameter store and ramped
+        per sample by the audio thread; anything else recompiles the chain.
+        """
+        with self._plan_lock:
+            index = self._find_effect(effect)
+            if index is None:
+                return
+            name, params = self.effects_chain[index]
+            if params.get(param) == value:
+                return
+
+            chain = list(self.effects_chain)
+            chain[index] = (name, {**params, param: value})
+            if self._plan.is_smoothed(index, param):
+                self.parameters.set(index, param, value)
+                self.effects_chain = chain
+            else:
+                self._set_effects_chain(chain)
+
+    def automate_effect_param(self, effect: str, param: str, end_value: float = None,
+                              duration: float = 0.2, curve: str = 'linear',
+                              start_value: float = None, points=None):
+        """Automate a continuous parameter of the first ``effect`` in the chain.
+
+        The envelope is precomputed here and followed sample by sample from
+        the next audio block; ``start_value`` defaults to the current value,
+        part way along any ramp or lane in progress, so replacing a lane
+        does not jump.
+        ``points`` gives ``(seconds, value)`` breakpoints for ``curve='breakpoint'``.
+        """
+        with self._plan_lock:
+            index = self._find_effect(effect)
+            plan = self._plan
+            if index is None or not plan.is_smoothed(index, param):
+                raise ValueError(f"Cannot automate {effect}.{param}")
+            if start_value is None:
+                start_value = plan.current_value(index, param)
+            envelope = build_envelope(self.config.RATE, start_value, end_value,
+                                      duration, curve, points)
+            lane = self.automation.add_lane((index, param), envelope, plan.layout)
+
+            # Where the parameter rests once the lane ends; published after the
+            # lane, and read before it by process_effects_chain, so no block
+            # sees the new target without the lane
+            name, params = self.effects_chain[index]
+            chain = list(self.effects_chain)
+            chain[index] = (name, {**params, param: lane.end_value})
+            self.parameters.set(index, param, lane.end_value)
+            self.effects_chain = chain
+            return lane
+
+    def _find_effect(self, effect: str):
+        for index, (name, _) in enumerate(self.effects_chain):
+            if name == effect:
+                return index
+        return None
 
     def add_effect(self, effect_name: str, params: Dict = None):
-        if effect_name in self.effects_registry:
-            self.effects_chain.append((effect_name, params or {}))
-            logger.info(f"Added effect: {effect_name} with params: {params}")
-        else:
-            raise ValueError(f"Unknown effect: {effect_name}")
+        self._set_effects_chain(self.effects_chain + [(effect_name, dict(params or {}))])
+        logger.info(f"Added effect: {effect_name} with params: {params}")
 
     def clear_effects(self):
-        self.effects_chain.clear()
+        self._set_effects_chain([], reuse=False)
         logger.info("Effects chain cleared")
 
     def load_preset(self, preset_name: str):
         """Load and apply an effect preset"""
         preset = self.preset_manager.load_preset(preset_name)
         if preset:
-            self.clear_effects()
-            for effect, params in preset['effects']:
-                self.add_effect(effect, params)
+            chain = [(effect, dict(params)) for effect, params in preset['effects']]
+            self._set_effects_chain(chain, reuse=False)
             logger.info(f"Applied preset: {preset_name}")
 
     def get_audio_stats(self) -> Dict:
         """Get current audio processing statistics"""
+        visualization_data = self.visualization_data
         stats = {
             'latency': self.monitor.get_average_time("audio_processing"),
-            'effects_timing': self.monitor.get_all_timings(),
+            'latency_stats': {**self.monitor.get_latency_stats(), **self._plan.latency_stats()},
+            'recent_latency_stats': {**self.monitor.get_latency_stats(window=True),
+                                     **self._plan.latency_stats(window=True)},
+            'deadline_misses': self.monitor.deadline_misses,
+            'effects_timing': {**self.monitor.get_all_timings(), **self._plan.timings()},
             'cpu_usage': self.monitor.get_cpu_usage(),
             'memory_usage': self.monitor.get_memory_usage(),
-            'analysis': self.analysis_results,
+            'analysis': dict(self.analysis_results),
             'voice_active': self.voice_active
         }
         
-        if self.visualization_data:
+        if visualization_data:
             stats.update({
                 'visualization': {
-                    'spectrum': self.visualization_data.spectrum.tolist(),
-                    'peak_frequencies': self.visualization_data.peak_frequencies,
-                    'rms_level': self.visualization_data.rms_level,
+                    'spectrum': visualization_data.spectrum.tolist(),
+                    'peak_frequencies': visualization_data.peak_frequencies,
+                    'rms_level': visualization_data.rms_level,
                     'frequency_bands': self.spectrum_analyzer.get_frequency_bands(
-                        self.visualization_data.spectrum
+                        visualization_data.spectrum
                     )
                 }
             })
         return stats
 
-    def _adapt_effects_to_audio(self):
-        """Adapt effect parameters with error handling"""
+    def dump_trace(self, path: str, seconds: float = 1.0) -> Optional[str]:
+        """Write the last ``seconds`` of spans as Chrome trace JSON (needs tracing enabled)"""
+        if self.tracer is None:
+            return None
+        return self.tracer.dump(path, time.perf_counter_ns() - int(seconds * 1e9))
+
+    def stage_timings(self) -> Dict[str, StageTimings]:
+        """Live latency records of every processing stage and effect"""
+        return {**self.monitor.stages, **{timings.name: timings for timings in self._plan.stage_timings}}
+
+    def queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Depth and drop count of the queues fed from the audio thread"""
+        ring = self.analysis_worker.ring
+        stats = {'analysis': {'depth': ring.depth, 'dropped': ring.dropped}}
+        recorder = self.__dict__.get('recording_manager')
+        if recorder is not None:
+            stats['recording'] = {'depth': recorder.ring.depth, 'dropped': recorder.dropped}
+            if recorder.transcoder is not None:
+                stats['transcode'] = {'depth': recorder.transcode_backlog,
+                                      'dropped': recorder.transcoder.rejected}
+        return stats
+
+    def _adapt_effects_to_audio(self, analysis_results: Mapping[str, float]):
+        """Steer effect parameters from the latest analysis (analysis thread)"""
         try:
-            if not self.analysis_results:
-                return
+            clarity = analysis_results.get('clarity', 0.5)  # Default value if missing
+            rms = analysis_results.get('rms', 0.0)  # Default value if missing
+            chain = dict(reversed(self.effects_chain))  # First entry of each effect wins
+
+            # A reverb at mix 0 is compiled out of the plan; it stays off
+            if 'reverb' in chain and self._plan.is_smoothed(self._find_effect('reverb'), 'mix'):
+                mix = 0.3 + (0.6 * clarity)
+                if abs(mix - chain['reverb'].get('mix', -1.0)) > ADAPT_TOLERANCE:
+                    self.automate_effect_param('reverb', 'mix', mix, duration=0.2)
+
+            if 'compressor' in chain:
+                # -20 dB, rising 10 dB per unit of RMS; the compressor takes a linear threshold
+                threshold = 10 ** ((-20 + rms * 10) / 20)
+                if abs(threshold - chain['compressor'].get('threshold', -1.0)) > ADAPT_TOLERANCE:
+                    self.set_effect_param('compressor', 'threshold', threshold)
 
-            clarity = self.analysis_results.get('clarity', 0.5)  # Default value if missing
-            rms = self.analysis_results.get('rms', 0.0)  # Default value if missing
-
-            if 'reverb' in self.effects_registry:
-                self.automation.add_automation(
-                    'reverb_mix',
-                    start_value=0.5,
-                    end_value=0.3 + (0.6 * clarity),
-                    duration=0.2,
-                    callback=lambda name, value: self._update_effect_param('reverb', 'mix', value)
-                )
-
-            if 'compressor' in self.effects_registry:
-                threshold = -20 + (rms * 10)
-                self._update_effect_param('compressor', 'threshold', threshold)
-                
         except Exception as e:
             logger.error(f"Error in effects adaptation: {e}")
 
-    def _update_effect_param(self, effect: str, param: str, value: float):
-        """Update a specific effect parameter"""
-        for i, (eff_name, params) in enumerate(self.effects_chain):
-            if eff_name == effect:
-                self.effects_chain[i][1][param] = value
-                break
-
-    def cleanup(self):
+    def cleanup(self, save_statistics: bool = True):
         logger.info("Cleaning up audio streams")
         for stream in [self.input_stream, self.output_stream]:
             if stream:
                 stream.stop_stream()
                 stream.close()
-        self.pyaudio.terminate()
-        self.monitor.save_statistics()
+        self.analysis_worker.stop()
+        if self.trace_dumper is not None:
+            self.trace_dumper.stop()
+        # Only tear down subsystems that were actually created
+        if 'recording_manager' in self.__dict__:
+            self.recording_manager.close()
+        if hasattr(self.__dict__.get('neural_enhancer'), 'stop'):
+            self.neural_enhancer.stop()
+        if self.__dict__.get('pyaudio') is not None:
+            self.pyaudio.terminate()
+        if save_statistics:
+            self.monitor.save_statistics()
         asyncio.get_event_loop().stop()
 
     def _start_server(self):
@@ -324,11 +650,14 @@ class VoiceProcessor:
         self.server_thread.start()
 
     def _run_server(self):
-        """Run WebSocket server in event loop"""
+        """Run the WebSocket and metrics servers in one event loop"""
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.server.start())
+            servers = [self.server.start()]
+            if self.metrics_server is not None:
+                servers.append(self.metrics_server.start())
+            loop.run_until_complete(asyncio.gather(*servers))
         except Exception as e:
             logger.error(f"Server error: {e}")
             # Don't raise, allow program to continue without server
@@ -339,19 +668,24 @@ class VoiceProcessor:
         self.router.add_route('input', 'monitor', volume=0.5)
         logger.info("Audio routing initialized")
 
-    def _load_vst_plugins(self):
+    def _load_vst_plugins(self) -> Dict:
         """Load VST plugins from config"""
-        if not VSTPlugin:
+        plugins = {}
+        if not (self.config.EFFECTS and 'vst_plugins' in self.config.EFFECTS):
+            return plugins
+
+        try:
+            from .audio.plugins.vst_wrapper import VSTPlugin
+        except ImportError:
             logger.warning("VST plugins not supported")
-            return
-            
-        if self.config.EFFECTS and 'vst_plugins' in self.config.EFFECTS:
-            for plugin_path in self.config.EFFECTS['vst_plugins']:
-                try:
-                    plugin = VSTPlugin(plugin_path, self.config.RATE)
-                    self.vst_plugins[plugin_path] = plugin
-                except Exception as e:
-                    logger.error(f"Failed to load VST plugin {plugin_path}: {e}")
+            return plugins
+
+        for plugin_path in self.config.EFFECTS['vst_plugins']:
+            try:
+                plugins[plugin_path] = VSTPlugin(plugin_path, self.config.RATE)
+            except Exception as e:
+                logger.error(f"Failed to load VST plugin {plugin_path}: {e}")
+        return plugins
 
     def pitch_shift(self, data: bytes, shift: int) -> bytes:
         """Legacy method for pitch shift effect"""
@@ -1,64 +1,424 @@
-import wave
+import math
+import multiprocessing
+import queue
 import threading
+import time
 import numpy as np
 import soundfile as sf
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
+from typing import Callable, Deque, Optional
 import logging
+from .audio.analysis_worker import BlockRingBuffer
 
 logger = logging.getLogger(__name__)
 
+# Container and sample encoding for each output format, rather than
+# whatever soundfile guesses from the extension
+AUDIO_FORMATS = {
+    'wav': ('WAV', 'PCM_16'),
+    'flac': ('FLAC', 'PCM_16'),
+    'ogg': ('OGG', 'VORBIS'),
+    'opus': ('OGG', 'OPUS'),
+    'mp3': ('MP3', 'MPEG_LAYER_III'),
+}
+
+# Formats the writer thread can record to directly
+RECORDING_FORMATS = ('wav', 'flac')
+
+# Frames per read when transcoding, so memory does not grow with file length
+TRANSCODE_BLOCK = 65536
+
+
+def transcode(input_path: str, output_path: str, file_format: str,
+              delete_source: bool = False) -> str:
+    """Re-encode an audio file block by block into ``file_format``"""
+    container, subtype = AUDIO_FORMATS[file_format]
+    with sf.SoundFile(input_path) as source, \
+            sf.SoundFile(output_path, 'w', samplerate=source.samplerate, channels=source.channels,
+                         format=container, subtype=subtype) as sink:
+        for block in source.blocks(TRANSCODE_BLOCK, dtype='float32', always_2d=True):
+            sink.write(block)
+    if delete_source:
+        Path(input_path).unlink()
+    return str(output_path)
+
+
+class SegmentTranscoder:
+    """Encodes finished recordings in a process pool, off the capture path.
+
+    :meth:`submit` never blocks. Once ``max_backlog`` files are waiting,
+    further ones are left as recorded and counted in ``rejected``, so a slow
+    encoder shows up as backlog instead of stalling capture.
+    """
+
+    def __init__(self, file_format: str, workers: int = 1, max_backlog: int = 8,
+                 keep_source: bool = False):
+        if file_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported transcode format: {file_format}")
+        self.file_format = file_format
+        self.workers = workers
+        self.max_backlog = max_backlog
+        self.keep_source = keep_source
+        self.backlog = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, path: Path) -> bool:
+        with self._lock:
+            if self.backlog >= self.max_backlog:
+                self.rejected += 1
+                logger.warning(f"Transcode backlog full ({self.backlog}); keeping {path} as is")
+                return False
+            self.backlog += 1
+            if self._pool is None:
+                # Spawned, not forked: the parent runs audio and writer threads
+                self._pool = ProcessPoolExecutor(self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        output_path = Path(path).with_suffix(f'.{self.file_format}')
+        future = self._pool.submit(transcode, str(path), str(output_path), self.file_format,
+                                   not self.keep_source)
+        future.add_done_callback(self._done)
+        return True
+
+    def _done(self, future: Future):
+        with self._lock:
+            self.backlog -= 1
+        try:
+            logger.info(f"Transcoded {future.result()}")
+            self.completed += 1
+        except Exception as e:
+            logger.error(f"Transcoding failed: {e}")
+            self.failed += 1
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+class PreRollBuffer:
+    """Fixed-size history of the most recent samples"""
+
+    def __init__(self, size: int):
+        self.samples = np.zeros(size, dtype=np.float32)
+        self.filled = 0
+        self._position = 0
+
+    def write(self, block: np.ndarray):
+        size = len(self.samples)
+        if len(block) >= size:
+            self.samples[:] = block[-size:]
+            self._position, self.filled = 0, size
+            return
+        end = self._position + len(block)
+        if end <= size:
+            self.samples[self._position:end] = block
+        else:
+            split = size - self._position
+            self.samples[self._position:] = block[:split]
+            self.samples[:end - size] = block[split:]
+        self._position = end % size
+        self.filled = min(size, self.filled + len(block))
+
+    def segments(self):
+        """Oldest-first views of the history; valid until the next write"""
+        start = (self._position - self.filled) % len(self.samples)
+        if start + self.filled <= len(self.samples):
+            return (self.samples[start:start + self.filled],)
+        return self.samples[start:], self.samples[:self._position]
+
+    def clear(self):
+        self.filled = self._position = 0
+
+
+@dataclass
+class _Session:
+    path: Path
+    start_block: int
+    stop_block: Optional[int] = None
+    segments: int = 0
+
+
 class RecordingManager:
-    def __init__(self, config):
+    """Streams recordings to disk from a background writer thread.
+
+    The audio thread only copies each block into a preallocated
+    :class:`BlockRingBuffer`; the writer drains it and appends to the open
+    file, so memory stays flat however long the take and stopping returns
+    at once. Recordings start and stop on block boundaries counted by the
+    ring, not on whenever the writer gets to them.
+
+    With ``pre_roll`` seconds set the writer also keeps the latest audio in
+    a :class:`PreRollBuffer`, which opens each recording. Call :meth:`start`
+    before audio flows so there is history to use.
+
+    ``segment_seconds`` and ``segment_bytes`` (of PCM data) rotate long
+    recordings into numbered files at exact sample counts. Each finished
+    file goes to ``transcoder`` and then to ``on_segment``, both on the
+    writer thread.
+    """
+
+    def __init__(self, config, pre_roll: Optional[float] = None,
+                 file_format: Optional[str] = None, buffer_seconds: Optional[float] = None,
+                 segment_seconds: Optional[float] = None, segment_bytes: Optional[int] = None,
+                 transcoder: Optional[SegmentTranscoder] = None,
+                 on_segment: Optional[Callable[[Path], None]] = None):
+        settings = (config.EFFECTS or {}).get('recording', {})
         self.config = config
+        self.pre_roll = settings.get('pre_roll', 0.0) if pre_roll is None else pre_roll
+        self.file_format = (file_format or settings.get('format', 'wav')).lower()
+        if self.file_format not in RECORDING_FORMATS:
+            raise ValueError(f"Unsupported recording format: {self.file_format}")
+        buffer_seconds = buffer_seconds or settings.get('buffer_seconds', 2.0)
+
+        segment_seconds = segment_seconds or settings.get('segment_seconds')
+        segment_bytes = segment_bytes or settings.get('segment_bytes')
+        sample_bytes = int(AUDIO_FORMATS[self.file_format][1].split('_')[1]) // 8
+        limits = [int(segment_seconds * config.RATE) if segment_seconds else 0,
+                  segment_bytes // sample_bytes if segment_bytes else 0]
+        self.segment_samples = min((limit for limit in limits if limit > 0), default=0)
+
+        if transcoder is None and settings.get('transcode'):
+            transcoder = SegmentTranscoder(settings['transcode'],
+                                           workers=settings.get('transcode_workers', 1),
+                                           max_backlog=settings.get('transcode_backlog', 8),
+                                           keep_source=settings.get('keep_source', False))
+        if transcoder is not None and transcoder.file_format == self.file_format:
+            raise ValueError(f"Recordings are already {self.file_format}")
+        self.transcoder = transcoder
+        self.on_segment = on_segment
+
         self.recording = False
-        self.buffer: List[np.ndarray] = []
-        self._lock = threading.Lock()
         self.output_dir = Path("recordings")
         self.output_dir.mkdir(exist_ok=True)
+        capacity = max(4, math.ceil(buffer_seconds * config.RATE / config.CHUNK))
+        self.ring = BlockRingBuffer(capacity, config.CHUNK)
+        self.history = PreRollBuffer(int(self.pre_roll * config.RATE)) if self.pre_roll > 0 else None
+        self.poll_interval = config.CHUNK / config.RATE / 2
+
+        # Control side only
+        self._lock = threading.Lock()
+        self._path: Optional[Path] = None
+        self._commands: queue.SimpleQueue = queue.SimpleQueue()
+        self._idle = threading.Event()
+        self._idle.set()
+
+        # Owned by the writer thread
+        self._pending: Deque[tuple] = deque()
+        self._block = np.zeros(config.CHUNK, dtype=np.float32)
+        self._session: Optional[_Session] = None
+        self._file: Optional[sf.SoundFile] = None
+        self._file_path: Optional[Path] = None
+        self._file_samples = 0
+        self._running = False
+        self._thread = None
+
+    @property
+    def listening(self) -> bool:
+        """Whether the audio thread should hand over blocks"""
+        return self.recording or (self.history is not None and self._running)
+
+    @property
+    def transcode_backlog(self) -> int:
+        """Finished files waiting to be encoded"""
+        return self.transcoder.backlog if self.transcoder is not None else 0
+
+    @property
+    def dropped(self) -> int:
+        """Blocks lost because the writer fell behind"""
+        return self.ring.dropped
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="recording-writer")
+        self._thread.daemon = True
+        self._thread.start()
 
     def start_recording(self):
         with self._lock:
+            if self.recording:
+                return
+            self.start()
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._path = self.output_dir / f"recording_{timestamp}.{self.file_format}"
+            # Blocks from this ring position on belong to the recording
+            self._commands.put(('start', self._path, self.ring._write))
+            self._idle.clear()
             self.recording = True
-            self.buffer.clear()
         logger.info("Started recording")
 
     def stop_recording(self) -> Optional[str]:
+        """Stop recording and return the file path; the writer finishes it in the background.
+
+        With rotation this is the path the numbered segments are named after.
+        """
         with self._lock:
-            self.recording = False
-            if not self.buffer:
+            if not self.recording:
                 return None
-                
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.output_dir / f"recording_{timestamp}.wav"
-            
+            self.recording = False
+            self._commands.put(('stop', self.ring._write))
+            path = self._path
+        logger.info(f"Stopped recording to {path}")
+        return str(path)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every stopped recording has been written"""
+        return self._idle.wait(timeout)
+
+    def add_audio(self, audio_data: np.ndarray):
+        """Hand a block to the writer (audio thread); never blocks"""
+        if self.listening:
+            self.ring.push(audio_data)
+
+    def close(self, timeout: float = 1.0):
+        self.stop_recording()
+        self.wait(timeout)
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.transcoder is not None:
+            self.transcoder.shutdown()
+
+    def _run(self):
+        dropped = 0
+        while self._running:
             try:
-                audio_data = np.concatenate(self.buffer)
-                sf.write(
-                    output_path,
-                    audio_data,
-                    self.config.RATE,
-                    subtype='PCM_16'
-                )
-                logger.info(f"Saved recording to {output_path}")
-                return str(output_path)
+                self._advance()
+                wrote = self._drain()
+                self._finish_session()
             except Exception as e:
-                logger.error(f"Failed to save recording: {e}")
-                return None
-            finally:
-                self.buffer.clear()
+                logger.error(f"Recording writer error: {e}")
+                self._abandon_session()
+                wrote = False
+            if self.ring.dropped != dropped:
+                logger.warning(f"Recording dropped {self.ring.dropped - dropped} blocks")
+                dropped = self.ring.dropped
+            if not wrote:
+                time.sleep(self.poll_interval)
 
-    def add_audio(self, audio_data: np.ndarray):
-        if self.recording:
-            with self._lock:
-                self.buffer.append(audio_data.copy())
+    def _advance(self):
+        """Apply queued commands; a start waits until the previous recording is finished"""
+        while True:
+            try:
+                self._pending.append(self._commands.get_nowait())
+            except queue.Empty:
+                break
+        while self._pending:
+            command = self._pending[0]
+            if command[0] == 'start':
+                if self._session is not None:
+                    return
+                self._session = _Session(command[1], command[2])
+            elif self._session is not None:
+                self._session.stop_block = command[1]
+            self._pending.popleft()
+
+    def _drain(self) -> bool:
+        wrote = False
+        while True:
+            index = self.ring._read
+            count = self.ring.pop(self._block)
+            if count is None:
+                return wrote
+            wrote = True
+            block = self._block[:count]
+            session = self._session
+            if session is not None and index >= session.start_block and (
+                    session.stop_block is None or index < session.stop_block):
+                self._write(block)
+            elif self.history is not None:
+                self.history.write(block)
+            self._finish_session()
+
+    def _write(self, block: np.ndarray):
+        session = self._session
+        if not session.segments and self._file is None and self.history is not None:
+            # The pre-roll opens the recording
+            segments = self.history.segments()
+            self.history.clear()
+            for segment in segments:
+                self._append(segment)
+        self._append(block)
 
-    def convert_format(self, input_path: str, output_format: str = 'mp3'):
+    def _append(self, samples: np.ndarray):
+        while len(samples):
+            if self._file is None:
+                self._open_file()
+            count = len(samples)
+            if self.segment_samples:
+                count = min(count, self.segment_samples - self._file_samples)
+            self._file.write(samples[:count])
+            self._file_samples += count
+            samples = samples[count:]
+            if self._file_samples == self.segment_samples:
+                self._close_file()
+
+    def _open_file(self):
+        session = self._session
+        path = session.path
+        if self.segment_samples:
+            path = path.with_name(f"{path.stem}_{session.segments:04d}{path.suffix}")
+        container, subtype = AUDIO_FORMATS[self.file_format]
+        self._file = sf.SoundFile(path, 'w', samplerate=self.config.RATE,
+                                  channels=1, format=container, subtype=subtype)
+        self._file_path = path
+        self._file_samples = 0
+        session.segments += 1
+
+    def _close_file(self):
+        self._file.close()
+        self._file = None
+        logger.info(f"Saved recording to {self._file_path}")
+        if self.transcoder is not None:
+            self.transcoder.submit(self._file_path)
+        if self.on_segment is not None:
+            self.on_segment(self._file_path)
+
+    def _finish_session(self):
+        session = self._session
+        if session is None or session.stop_block is None or self.ring._read < session.stop_block:
+            return
+        if not session.segments:
+            # Nothing arrived in between; keep any pre-roll, or leave an empty file
+            self._write(self._block[:0])
+            if self._file is None:
+                self._open_file()
+        if self._file is not None:
+            self._close_file()
+        self._session = None
+        self._advance()
+        if self._session is None and not self._pending:
+            self._idle.set()
+
+    def _abandon_session(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+        self._file = None
+        self._session = None
+        if not self._pending:
+            self._idle.set()
+
+    def convert_format(self, input_path: str, output_format: str = 'mp3') -> Optional[str]:
+        """Re-encode a recording into ``output_format`` (see ``AUDIO_FORMATS``)"""
+        if output_format not in AUDIO_FORMATS:
+            logger.error(f"Unsupported output format: {output_format}")
+            return None
         try:
-            data, sample_rate = sf.read(input_path)
-            output_path = str(Path(input_path).with_suffix(f'.{output_format}'))
-            sf.write(output_path, data, sample_rate)
+            output_path = transcode(input_path, str(Path(input_path).with_suffix(f'.{output_format}')),
+                                    output_format)
             logger.info(f"Converted audio to {output_path}")
             return output_path
         except Exception as e:
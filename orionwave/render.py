@@ -0,0 +1,216 @@
+import os
+import time
+import logging
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import yaml
+from .config import AudioConfig
+
+logger = logging.getLogger(__name__)
+
+# Files picked up when a directory is given
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg', '.aif', '.aiff')
+
+# Seconds between progress log lines while rendering a file
+PROGRESS_INTERVAL = 5.0
+
+EffectChain = List[Tuple[str, Dict[str, Any]]]
+
+
+def available_cores() -> int:
+    """Cores this process may run on, which can be fewer than the machine has"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_effect(spec: str) -> Tuple[str, Dict[str, Any]]:
+    """Parse ``name`` or ``name:key=value,key=value`` into a chain entry"""
+    name, _, settings = spec.partition(':')
+    params = {}
+    for setting in filter(None, settings.split(',')):
+        key, sep, value = setting.partition('=')
+        if not sep:
+            raise ValueError(f"Expected key=value in effect {spec!r}")
+        params[key.strip()] = yaml.safe_load(value)
+    return name.strip(), params
+
+
+def collect_inputs(paths: Sequence[str]) -> List[Tuple[Path, Path]]:
+    """Expand files and directories into ``(file, path relative to output)`` pairs"""
+    inputs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            for file in sorted(path.rglob('*')):
+                if file.suffix.lower() in AUDIO_EXTENSIONS:
+                    inputs.append((file, file.relative_to(path)))
+        else:
+            inputs.append((path, Path(path.name)))
+    return inputs
+
+
+def apply_chain(processor, chain: Optional[EffectChain] = None,
+                preset: Optional[str] = None) -> EffectChain:
+    """Set up ``processor`` with ``preset``'s effects followed by ``chain``.
+
+    Raises ValueError for an unknown preset or effect, or invalid parameters.
+    Returns the resolved chain.
+    """
+    effects = []
+    if preset:
+        settings = processor.preset_manager.load_preset(preset)
+        if not settings:
+            raise ValueError(f"Unknown preset: {preset}")
+        effects = [(name, dict(params)) for name, params in settings['effects']]
+    effects += [(name, dict(params)) for name, params in chain or ()]
+    for name, params in effects:
+        processor.add_effect(name, params)
+    return effects
+
+
+def resolve_chain(config: AudioConfig, chain: Optional[EffectChain] = None,
+                  preset: Optional[str] = None) -> EffectChain:
+    """Resolve and validate a preset and chain once, before any file is rendered"""
+    from .processor import VoiceProcessor
+    return apply_chain(VoiceProcessor(config), chain, preset)
+
+
+def render_file(input_path: str, output_path: str, config: AudioConfig,
+                chain: Optional[EffectChain] = None, preset: Optional[str] = None,
+                progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """Stream one file through the same stages as the live callback.
+
+    Input is read and output written one ``config.CHUNK`` block at a time
+    into preallocated buffers, so memory stays bounded by a few blocks
+    however long the file is. The file's own sample rate replaces
+    ``config.RATE``; multichannel input is mixed down to mono.
+
+    The chain's latency is dropped from the start of the output so it
+    lines up with the input, and silence is fed in after the input ends
+    until the effects' tail has rung out; the output is ``tail`` samples
+    longer than the input.
+
+    ``progress(frames_done, frames_total)`` is called after each block;
+    without it progress is logged every ``PROGRESS_INTERVAL`` seconds.
+    Returns the audio duration and processing time.
+    """
+    import soundfile as sf
+    from .processor import VoiceProcessor
+
+    start = time.perf_counter()
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with sf.SoundFile(input_path) as source:
+        config = dataclasses.replace(config, RATE=source.samplerate)
+        # Every block is processed: the live VAD gate would leave quiet passages dry
+        processor = VoiceProcessor(config, vad_enabled=False)
+        try:
+            apply_chain(processor, chain, preset)
+
+            total = source.frames
+            block_size = config.CHUNK
+            frames = np.zeros((block_size, source.channels), dtype=np.float32)
+            block = np.zeros(block_size, dtype=np.float32)
+            done, written, reported = 0, 0, start
+            # Leading samples still to drop, and the output length once the input ends
+            skip, end = None, None
+
+            with sf.SoundFile(output_path, 'w', samplerate=source.samplerate, channels=1,
+                              subtype=source.subtype, format=source.format) as sink:
+                while end is None or written < end:
+                    count = 0 if end is not None else \
+                        source.read(block_size, dtype='float32', always_2d=True, out=frames).shape[0]
+                    if count:
+                        # Pad the last block so streaming effects always see full blocks
+                        np.mean(frames[:count], axis=1, out=block[:count])
+                        block[count:] = 0.0
+                        output = processor.process_block(block)
+                        # Analysis runs inline so audio-driven adaptation matches live use
+                        processor.analysis_worker.analyze_pending()
+                        done += count
+                    else:
+                        if end is None:
+                            end = done + processor.tail
+                            if written >= end:
+                                break
+                        # Silence flushes the latency buffers and tails
+                        block.fill(0.0)
+                        output = processor.process_block(block)
+
+                    if skip is None:
+                        # Effects settle their latency on their first block
+                        skip = processor.latency
+                    dropped = min(skip, len(output))
+                    skip -= dropped
+                    output = output[dropped:dropped + (end if end is not None else done) - written]
+                    sink.write(output)
+                    written += len(output)
+
+                    if not count:
+                        continue
+                    if progress is not None:
+                        progress(done, total)
+                    elif time.perf_counter() - reported >= PROGRESS_INTERVAL:
+                        reported = time.perf_counter()
+                        speed = done / config.RATE / (reported - start)
+                        logger.info(f"{input_path}: {100 * done / max(total, 1):.0f}% "
+                                    f"({speed:.1f}x real time)")
+        finally:
+            # Workers share a working directory, so no statistics file per render
+            processor.cleanup(save_statistics=False)
+
+    return {
+        'input': str(input_path),
+        'output': str(output_path),
+        'duration': done / config.RATE,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def render_files(paths: Sequence[str], output_dir: str, config: AudioConfig,
+                 chain: Optional[EffectChain] = None, preset: Optional[str] = None,
+                 jobs: Optional[int] = None) -> Dict[str, Any]:
+    """Render every input into ``output_dir`` across a process pool.
+
+    The preset and chain are resolved here, once, and workers get the
+    resulting chain; an invalid one raises ValueError before any work
+    starts. ``jobs`` defaults to the number of usable cores. Files that
+    fail are logged and counted; the rest still render.
+    """
+    chain = resolve_chain(config, chain, preset)
+    inputs = collect_inputs(paths)
+    jobs = max(1, min(jobs or available_cores(), len(inputs) or 1))
+    results, failed = [], 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(render_file, str(file), str(Path(output_dir) / relative),
+                        config, chain): file
+            for file, relative in inputs
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Failed to render {futures[future]}: {e}")
+                failed += 1
+                continue
+            results.append(result)
+            logger.info(f"Rendered {result['output']} "
+                        f"({result['duration']:.1f} s in {result['elapsed']:.2f} s)")
+    elapsed = time.perf_counter() - start
+
+    duration = sum(result['duration'] for result in results)
+    return {
+        'files': len(results),
+        'failed': failed,
+        'jobs': jobs,
+        'duration': duration,
+        'elapsed': elapsed,
+        # Wall-clock seconds per second of audio; below 1.0 is faster than real time
+        'rtf': elapsed / duration if duration else 0.0,
+        'throughput': duration / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,177 @@
+import itertools
+import json
+import os
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Spans kept by default; at ~10 spans per block this is over a minute of audio
+TRACE_CAPACITY = 65536
+
+# Deadline misses remembered until the dumper gets to them
+MISS_CAPACITY = 64
+
+
+class SpanTracer:
+    """Preallocated ring of timed spans from any thread.
+
+    :meth:`record` writes a name id, thread id and start/end timestamps
+    (``perf_counter_ns``) into fixed arrays; slots are handed out by an
+    atomic counter, so threads never share one and nothing is allocated or
+    locked. Names are registered once with :meth:`name_id`. Old spans are
+    overwritten once the ring wraps.
+    """
+
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        self.capacity = capacity
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._starts = np.zeros(capacity, dtype=np.int64)
+        self._ends = np.zeros(capacity, dtype=np.int64)
+        self._name_ids = np.zeros(capacity, dtype=np.int32)
+        self._threads = np.zeros(capacity, dtype=np.uint64)
+        self._sequence = np.zeros(capacity, dtype=np.int64)  # 0 marks an empty slot
+        self._counter = itertools.count(1)
+        self._misses = np.zeros(MISS_CAPACITY, dtype=np.int64)
+        self._miss_counter = itertools.count(1)
+        self._miss_sequence = np.zeros(MISS_CAPACITY, dtype=np.int64)
+        self._register_lock = threading.Lock()
+
+    def name_id(self, name: str) -> int:
+        with self._register_lock:
+            if name not in self._ids:
+                self._ids[name] = len(self.names)
+                self.names.append(name)
+            return self._ids[name]
+
+    def record(self, name_id: int, start_ns: int, end_ns: int):
+        sequence = next(self._counter)
+        slot = sequence % self.capacity
+        self._sequence[slot] = 0  # Invalid while the slot is rewritten
+        self._starts[slot] = start_ns
+        self._ends[slot] = end_ns
+        self._name_ids[slot] = name_id
+        self._threads[slot] = threading.get_ident()
+        self._sequence[slot] = sequence
+
+    def mark_miss(self, time_ns: int):
+        """Note a deadline miss at ``time_ns`` for :class:`TraceDumper`"""
+        sequence = next(self._miss_counter)
+        slot = sequence % MISS_CAPACITY
+        self._misses[slot] = time_ns
+        self._miss_sequence[slot] = sequence
+
+    def misses_since(self, sequence: int) -> List[tuple]:
+        """``(sequence, time_ns)`` of misses newer than ``sequence``, oldest first"""
+        newer = np.flatnonzero(self._miss_sequence > sequence)
+        order = newer[np.argsort(self._miss_sequence[newer])]
+        return [(int(self._miss_sequence[slot]), int(self._misses[slot])) for slot in order]
+
+    def chrome_trace(self, start_ns: int = 0, end_ns: Optional[int] = None,
+                     markers: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Spans overlapping ``[start_ns, end_ns]`` as Chrome trace-event JSON.
+
+        Opens in ``chrome://tracing`` and Perfetto. ``markers`` are drawn as
+        instant ``deadline_miss`` events.
+        """
+        valid = np.flatnonzero(self._sequence)
+        starts, ends = self._starts[valid], self._ends[valid]
+        keep = ends >= start_ns
+        if end_ns is not None:
+            keep &= starts <= end_ns
+        valid = valid[keep]
+        valid = valid[np.argsort(self._starts[valid], kind='stable')]
+
+        pid = os.getpid()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        events = []
+        for slot in valid:
+            events.append({
+                'name': self.names[self._name_ids[slot]],
+                'ph': 'X',
+                'ts': self._starts[slot] / 1000.0,
+                'dur': (self._ends[slot] - self._starts[slot]) / 1000.0,
+                'pid': pid,
+                'tid': int(self._threads[slot]),
+            })
+        for marker in markers or ():
+            events.append({'name': 'deadline_miss', 'ph': 'i', 's': 'g', 'ts': marker / 1000.0,
+                           'pid': pid, 'tid': 0})
+        for tid in sorted({event['tid'] for event in events if event['ph'] == 'X'}):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread_names.get(tid, str(tid))}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: str, start_ns: int = 0, end_ns: Optional[int] = None,
+             markers: Optional[List[int]] = None) -> str:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(start_ns, end_ns, markers), f)
+        return str(path)
+
+
+class TraceDumper:
+    """Writes a trace around every deadline miss, off the audio thread.
+
+    Once ``after`` seconds have passed since a miss, the spans from
+    ``before`` seconds ahead of it to ``after`` seconds past it are written
+    to ``directory`` as Chrome trace JSON. Misses that fall inside a window
+    already written are marked in it rather than dumped again.
+    """
+
+    def __init__(self, tracer: SpanTracer, directory: str = 'traces',
+                 before: float = 0.5, after: float = 0.1, poll_interval: float = 0.05):
+        self.tracer = tracer
+        self.directory = Path(directory)
+        self.before_ns = int(before * 1e9)
+        self.after_ns = int(after * 1e9)
+        self.poll_interval = poll_interval
+        self.dumps: List[str] = []
+        self._seen = 0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="trace-dumper")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while self._running:
+            try:
+                self.dump_ready()
+            except Exception as e:
+                logger.error(f"Trace dump failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def dump_ready(self, now_ns: Optional[int] = None) -> List[str]:
+        """Write traces for misses whose window has closed; returns the new files"""
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        written = []
+        pending = self.tracer.misses_since(self._seen)
+        while pending and pending[0][1] + self.after_ns <= now_ns:
+            first = pending[0][1]
+            end_ns = first + self.after_ns
+            markers = [miss for _, miss in pending if miss <= end_ns]
+            path = self.directory / f"deadline_miss_{first}.json"
+            self.tracer.dump(str(path), first - self.before_ns, end_ns, markers)
+            logger.warning(f"Deadline miss; wrote trace to {path}")
+            written.append(str(path))
+            self._seen = max(sequence for sequence, miss in pending if miss <= end_ns)
+            pending = [(sequence, miss) for sequence, miss in pending if miss > end_ns]
+        self.dumps.extend(written)
+        return written
@@ -1,12 +1,13 @@
 import numpy as np
 from scipy import signal
 import logging
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 from dataclasses import dataclass
+from ..audio.spectral import SpectralContext, SpectralContextBuilder
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(frozen=True)
 class VisualizationData:
     spectrum: np.ndarray
     frequencies: np.ndarray
@@ -18,30 +19,22 @@ class SpectrumAnalyzer:
     def __init__(self, sample_rate: int, chunk_size: int):
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
-        self.window = signal.windows.hann(chunk_size)
+        self.context_builder = SpectralContextBuilder(sample_rate)
         self.smoothing_factor = 0.7
         self.previous_spectrum = None
         
-    def analyze(self, audio_data: np.ndarray) -> VisualizationData:
+    def analyze(self, audio_data: np.ndarray,
+                context: Optional[SpectralContext] = None) -> VisualizationData:
         """Analyze audio frame for visualization"""
-        # Normalize audio
-        audio_normalized = audio_data.astype(np.float32) / 32768.0
-        
-        # Calculate spectrum
-        frequencies, times, spectogram = signal.spectrogram(
-            audio_normalized,
-            fs=self.sample_rate,
-            window=self.window,
-            nperseg=self.chunk_size,
-            noverlap=self.chunk_size // 2,
-            scaling='spectrum'
-        )
+        if context is None:
+            context = self.context_builder.build(audio_data)
+        frequencies = context.frequencies
 
         # Get current spectrum
-        current_spectrum = np.mean(spectogram, axis=1)
+        current_spectrum = context.power
         
         # Apply smoothing
-        if self.previous_spectrum is not None:
+        if self.previous_spectrum is not None and len(self.previous_spectrum) == len(current_spectrum):
             current_spectrum = (self.smoothing_factor * self.previous_spectrum + 
                               (1 - self.smoothing_factor) * current_spectrum)
         self.previous_spectrum = current_spectrum
@@ -50,15 +43,18 @@ class SpectrumAnalyzer:
         peak_indices = signal.find_peaks(current_spectrum)[0]
         peak_frequencies = frequencies[peak_indices]
 
-        # Calculate RMS level
-        rms_level = np.sqrt(np.mean(audio_normalized**2))
+        # The snapshot outlives the block: context.samples may be a view of a
+        # buffer the caller reuses, so the waveform is copied, and both are frozen
+        waveform = context.samples.copy()
+        waveform.flags.writeable = False
+        current_spectrum.flags.writeable = False
 
         return VisualizationData(
             spectrum=current_spectrum,
             frequencies=frequencies,
-            waveform=audio_normalized,
+            waveform=waveform,
             peak_frequencies=peak_frequencies.tolist(),
-            rms_level=float(rms_level)
+            rms_level=context.rms
         )
 
     def get_frequency_bands(self, spectrum: np.ndarray) -> Dict[str, float]:
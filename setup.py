@@ -60,6 +60,10 @@ setup(
             'torch>=1.9.0',
             'torchaudio>=0.9.0',
         ],
+        'onnx': [
+            'onnx>=1.12.0',
+            'onnxruntime>=1.12.0',
+        ],
         'dev': [
             'pytest>=6.0.0',
             'pytest-cov>=2.12.0',
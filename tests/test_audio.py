@@ -0,0 +1,257 @@
+import os
+import sys
+import unittest
+import unittest.mock
+import numpy as np
+from scipy import signal
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orionwave.config import AudioConfig
+from orionwave.audio.enhancer import AudioEnhancer
+from orionwave.audio.filters import rbj_biquad
+from orionwave.audio.analyzer import AudioAnalyzer
+from orionwave.audio.analysis_worker import AnalysisWorker, BlockRingBuffer
+from orionwave.audio.noise_reduction import NoiseReducer
+from orionwave.audio.pitch_tracker import PitchTracker
+from orionwave.audio.sample_format import BlockConverter, match_format, to_float32
+from orionwave.audio.spectral import SpectralContextBuilder
+from orionwave.audio.vad import VoiceActivityDetector
+from orionwave.visualization.spectrum_analyzer import SpectrumAnalyzer
+
+
+class TestSampleFormat(unittest.TestCase):
+    def test_converter_round_trip_reuses_buffers(self):
+        pcm = np.array([-32768, -1, 0, 1, 32767], dtype=np.int16)
+        converter = BlockConverter(len(pcm))
+        samples = converter.to_float(pcm)
+        self.assertEqual(samples.dtype, np.float32)
+        self.assertIs(converter.to_float(pcm), samples)
+        np.testing.assert_array_equal(converter.to_pcm(samples), pcm)
+
+    def test_pcm_output_clips(self):
+        converter = BlockConverter(3)
+        pcm = converter.to_pcm(np.array([-2.0, 0.5, 2.0], dtype=np.float32))
+        np.testing.assert_array_equal(pcm, [-32768, 16384, 32767])
+
+    def test_match_format(self):
+        samples = np.array([0.25, -0.5], dtype=np.float32)
+        self.assertIs(to_float32(samples), samples)
+        self.assertIs(match_format(samples, samples), samples)
+        np.testing.assert_array_equal(match_format(samples, np.zeros(2, dtype=np.int16)), [8192, -16384])
+
+
+class TestAudioEnhancer(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        rng = np.random.default_rng(4)
+        self.test_data = (rng.standard_normal(self.config.CHUNK * 4) * 3000).astype(np.int16)
+
+    def test_shelf_gains(self):
+        sos = rbj_biquad('low_shelf', 200.0, 0.707, 6.0, self.config.RATE)
+        _, response = signal.sosfreqz(sos[np.newaxis], worN=[20.0, 15000.0], fs=self.config.RATE)
+        gains_db = 20 * np.log10(np.abs(response))
+        self.assertAlmostEqual(gains_db[0], 6.0, delta=0.2)
+        self.assertAlmostEqual(gains_db[1], 0.0, delta=0.2)
+
+    def test_state_persists_across_blocks(self):
+        enhancer = AudioEnhancer(self.config.RATE)
+        chunk = self.config.CHUNK
+        streamed = np.concatenate([
+            enhancer.process(self.test_data[i:i + chunk])
+            for i in range(0, len(self.test_data), chunk)
+        ])
+        whole = AudioEnhancer(self.config.RATE).process(self.test_data)
+        self.assertLessEqual(np.abs(streamed.astype(int) - whole).max(), 1)
+
+    def test_coefficients_follow_settings(self):
+        enhancer = AudioEnhancer(self.config.RATE)
+        enhancer.process(self.test_data[:256])
+        sos = enhancer.sos
+        enhancer.process(self.test_data[256:512])
+        self.assertIs(enhancer.sos, sos)
+
+        enhancer.settings['warmth'] = 1.0
+        enhancer.process(self.test_data[512:768])
+        self.assertIsNot(enhancer.sos, sos)
+
+
+class TestSpectralContext(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        t = np.arange(self.config.CHUNK) / self.config.RATE
+        self.tone = (np.sin(2 * np.pi * 200 * t) * 10000).astype(np.int16)
+        self.builder = SpectralContextBuilder(self.config.RATE)
+
+    def test_power_matches_spectrogram(self):
+        context = self.builder.build(self.tone)
+        _, _, expected = signal.spectrogram(
+            self.tone.astype(np.float32) / 32768.0,
+            fs=self.config.RATE,
+            window=signal.windows.hann(self.config.CHUNK),
+            nperseg=self.config.CHUNK,
+            scaling='spectrum'
+        )
+        np.testing.assert_allclose(context.power, expected[:, 0], rtol=1e-3, atol=1e-12)
+
+    def test_analyzers_share_context(self):
+        context = self.builder.build(self.tone)
+        results = AudioAnalyzer(self.config.RATE, self.config.CHUNK).analyze_frame(self.tone, context)
+        visualization = SpectrumAnalyzer(self.config.RATE, self.config.CHUNK).analyze(self.tone, context)
+        vad = VoiceActivityDetector(self.config.RATE, attack_frames=1)
+
+        self.assertAlmostEqual(results['rms'], context.rms)
+        self.assertAlmostEqual(results['dominant_frequency'], context.dominant_frequency)
+        self.assertAlmostEqual(visualization.rms_level, context.rms)
+        self.assertTrue(vad.is_speech(self.tone, context))
+
+
+class TestVoiceActivityDetector(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        t = np.arange(self.config.CHUNK) / self.config.RATE
+        self.tone = (np.sin(2 * np.pi * 200 * t) * 10000).astype(np.int16)
+        self.silence = np.zeros(self.config.CHUNK, dtype=np.int16)
+
+    def test_attack_and_hangover(self):
+        vad = VoiceActivityDetector(self.config.RATE, attack_frames=2, hangover_frames=3)
+        self.assertFalse(vad.is_speech(self.tone))
+        self.assertTrue(vad.is_speech(self.tone))
+
+        decisions = [vad.is_speech(self.silence) for _ in range(5)]
+        self.assertEqual(decisions, [True, True, True, False, False])
+
+    def test_running_energy_matches_mean(self):
+        vad = VoiceActivityDetector(self.config.RATE)
+        energies = np.random.default_rng(7).random(25)
+        for energy in energies:
+            vad.is_speech_fast(energy)
+        self.assertAlmostEqual(vad._energy_sum / vad._history_count,
+                               energies[-vad.history_size:].mean())
+
+    def test_rejects_out_of_band_noise(self):
+        rng = np.random.default_rng(8)
+        hiss = (signal.sosfilt(signal.butter(4, 8000, 'highpass', fs=self.config.RATE, output='sos'),
+                               rng.standard_normal(self.config.CHUNK)) * 8000).astype(np.int16)
+        vad = VoiceActivityDetector(self.config.RATE, attack_frames=1)
+        self.assertFalse(vad.is_speech(hiss))
+
+    def test_quiet_blocks_are_silent(self):
+        # Blocks below min_rms (0.1 by default) never open the gate, however steady
+        quiet = (self.tone * 0.25).astype(np.int16)
+        vad = VoiceActivityDetector(self.config.RATE, attack_frames=1)
+        self.assertFalse(any(vad.is_speech(quiet) for _ in range(5)))
+        self.assertTrue(VoiceActivityDetector(self.config.RATE, attack_frames=1, min_rms=0.01).is_speech(quiet))
+
+    def test_missing_webrtc_falls_back(self):
+        with unittest.mock.patch.dict(sys.modules, {'webrtcvad': None}):
+            vad = VoiceActivityDetector(self.config.RATE, backend='webrtc')
+        self.assertEqual(vad.backend, 'energy')
+
+
+class TestAnalysisWorker(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        t = np.arange(self.config.CHUNK) / self.config.RATE
+        self.tone = (np.sin(2 * np.pi * 200 * t) * 10000).astype(np.int16)
+
+    def test_ring_drops_when_full(self):
+        ring = BlockRingBuffer(2, self.config.CHUNK)
+        self.assertTrue(ring.push(self.tone))
+        self.assertTrue(ring.push(self.tone))
+        self.assertFalse(ring.push(self.tone))
+        self.assertEqual(ring.dropped, 1)
+
+        out = np.zeros(self.config.CHUNK, dtype=np.int16)
+        self.assertEqual(ring.pop(out), self.config.CHUNK)
+        np.testing.assert_array_equal(out, self.tone)
+        self.assertEqual(ring.depth, 1)
+
+    def test_publishes_immutable_snapshots(self):
+        worker = AnalysisWorker(self.config.RATE, self.config.CHUNK)
+        worker.submit(self.tone)
+        self.assertEqual(worker.analyze_pending(), 1)
+
+        results = worker.analysis_results
+        self.assertGreater(results['rms'], 0.1)
+        self.assertIsNotNone(worker.visualization_data)
+        with self.assertRaises(TypeError):
+            results['rms'] = 0.0
+
+    def test_snapshot_survives_the_next_block(self):
+        worker = AnalysisWorker(self.config.RATE, self.config.CHUNK)
+        worker.submit(np.full(self.config.CHUNK, 0.5, dtype=np.float32))
+        worker.analyze_pending()
+        held = worker.visualization_data
+
+        worker.submit(np.full(self.config.CHUNK, -0.25, dtype=np.float32))
+        worker.analyze_pending()
+        self.assertIsNot(worker.visualization_data, held)
+        np.testing.assert_array_equal(held.waveform, 0.5)
+        with self.assertRaises(ValueError):
+            held.waveform[0] = 0.0
+
+
+class TestPitchTracker(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+
+    def track(self, tracker: PitchTracker, data: np.ndarray):
+        chunk = self.config.CHUNK
+        for i in range(0, len(data) - chunk + 1, chunk):
+            result = tracker.process(data[i:i + chunk])
+        return result
+
+    def test_synthetic_tones(self):
+        t = np.arange(self.config.RATE // 4) / self.config.RATE
+        for decimation in (1, 2, 4):
+            for frequency in (82.4, 196.0, 440.0, 659.3):
+                with self.subTest(decimation=decimation, frequency=frequency):
+                    tone = (0.5 * np.sin(2 * np.pi * frequency * t)
+                            + 0.2 * np.sin(2 * np.pi * 2 * frequency * t + 1.0))
+                    tracker = PitchTracker(self.config.RATE, decimation=decimation)
+                    pitch, confidence = self.track(tracker, tone.astype(np.float32))
+                    self.assertAlmostEqual(pitch, frequency, delta=frequency * 0.005)
+                    self.assertGreater(confidence, 0.9)
+
+    def test_noise_is_unvoiced(self):
+        rng = np.random.default_rng(5)
+        noise = rng.standard_normal(self.config.CHUNK * 8).astype(np.float32)
+        pitch, confidence = self.track(PitchTracker(self.config.RATE), noise)
+        self.assertEqual(pitch, 0.0)
+        self.assertLess(confidence, 0.5)
+
+
+class TestNoiseReducer(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        t = np.arange(self.config.RATE // 2) / self.config.RATE
+        self.tone = (np.sin(2 * np.pi * 300 * t) * 8000).astype(np.int16)
+        rng = np.random.default_rng(6)
+        self.noise = (rng.standard_normal(len(self.tone)) * 300).astype(np.int16)
+
+    def stream(self, reducer: NoiseReducer, data: np.ndarray) -> np.ndarray:
+        chunk = self.config.CHUNK
+        return np.concatenate([
+            reducer.process(data[i:i + chunk]) for i in range(0, len(data), chunk)
+        ])
+
+    def test_reconstruction_has_no_block_artifacts(self):
+        reducer = NoiseReducer(self.config.RATE)
+        reducer.calibrate(np.zeros(self.config.CHUNK * 4, dtype=np.int16))
+        output = self.stream(reducer, self.tone)
+        self.assertEqual(len(output), len(self.tone))
+        delayed = self.tone[:len(self.tone) - reducer.latency].astype(int)
+        self.assertLessEqual(np.abs(output[reducer.latency:].astype(int) - delayed).max(), 1)
+
+    def test_reduces_calibrated_noise(self):
+        reducer = NoiseReducer(self.config.RATE)
+        reducer.calibrate(self.noise)
+        output = self.stream(reducer, self.tone + self.noise)
+        residual = output[reducer.latency:].astype(float) - self.tone[:len(self.tone) - reducer.latency]
+        self.assertLess(np.std(residual[self.config.CHUNK:]), 0.6 * np.std(self.noise))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,606 @@
+import importlib.util
+import os
+import tempfile
+import sys
+import time
+import unittest
+import numpy as np
+from scipy import signal
+import torch
+from functools import partial
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orionwave.automation import ParameterAutomation, build_envelope
+from orionwave.config import AudioConfig
+from orionwave.effects.enhancer_process import ProcessEnhancer
+from orionwave.effects.inference import benchmark_backends, build_backend, load_backend, parity_error
+from orionwave.effects.neural_enhancer import EnhancementModel, NeuralEnhancer
+from orionwave.effects.basic import apply_compression, apply_robot_effect
+from orionwave.effects.chain import EffectsPlan, compile_plan
+from orionwave.effects.eq import StreamingEQ, design_crossover
+from orionwave.effects.parameters import ParameterSmoother, ParameterStore
+from orionwave.effects.pitch import PhaseVocoderPitchShifter, WSOLAPitchShifter
+from orionwave.effects.reverb import ConvolutionReverb, PartitionedConvolver
+
+
+class TestConvolutionReverb(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        rng = np.random.default_rng(1)
+        self.test_data = (rng.standard_normal(self.config.CHUNK * 8) * 3000).astype(np.int16)
+
+    def test_partitioned_matches_full_convolution(self):
+        rng = np.random.default_rng(2)
+        impulse_response = rng.standard_normal(5000)
+        block_size = 256
+        data = rng.standard_normal(block_size * 12)
+
+        convolver = PartitionedConvolver(impulse_response, block_size)
+        streamed = np.concatenate([
+            convolver.process(data[i:i + block_size])
+            for i in range(0, len(data), block_size)
+        ])
+        expected = signal.fftconvolve(data, impulse_response)[:len(data)]
+        np.testing.assert_allclose(streamed, expected, atol=1e-9)
+
+    def test_irregular_blocks_keep_the_tail(self):
+        rng = np.random.default_rng(4)
+        impulse_response = rng.standard_normal(3000)
+        data = rng.standard_normal(4000)
+        convolver = PartitionedConvolver(impulse_response, 256)
+        sizes = [256, 100, 300, 1, 600, 256, 77]
+        bounds = np.cumsum([0] + sizes + [len(data) - sum(sizes)])
+        streamed = np.concatenate([convolver.process(data[start:stop])
+                                   for start, stop in zip(bounds[:-1], bounds[1:])])
+        expected = signal.fftconvolve(data, impulse_response)[:len(data)]
+        np.testing.assert_allclose(streamed, expected, atol=1e-9)
+
+        reverb = ConvolutionReverb(self.config.RATE, self.config.CHUNK)
+        reverb(self.test_data[:self.config.CHUNK], self.config)
+        convolver = reverb.convolver
+        reverb(self.test_data[:100], self.config)
+        self.assertIs(reverb.convolver, convolver)
+
+    def test_tail_carries_across_blocks(self):
+        reverb = ConvolutionReverb(self.config.RATE, self.config.CHUNK)
+        chunk = self.config.CHUNK
+        impulse = np.zeros(chunk * 4, dtype=np.int16)
+        impulse[0] = 20000
+
+        output = np.concatenate([
+            reverb(impulse[i:i + chunk], self.config, mix=1.0)
+            for i in range(0, len(impulse), chunk)
+        ])
+        self.assertEqual(len(output), len(impulse))
+        # Tail must still ring in the later blocks
+        self.assertGreater(np.abs(output[chunk * 3:]).max(), 0)
+
+    def test_room_change_lets_the_old_tail_ring_out(self):
+        chunk = self.config.CHUNK
+        block = self.test_data[:chunk].astype(np.float32) / 32768
+        silence = np.zeros(chunk, dtype=np.float32)
+        steady, changed = (ConvolutionReverb(self.config.RATE, chunk) for _ in range(2))
+        for reverb in (steady, changed):
+            reverb(block, self.config, room_size=0.5, mix=1.0)
+
+        # Silence into the new room adds nothing; the old room's tail carries on
+        old_tail = len(steady.convolver.impulse_response)
+        for _ in range(3):
+            expected = steady(silence, self.config, room_size=0.5, mix=1.0)
+            np.testing.assert_allclose(changed(silence, self.config, room_size=0.3, mix=1.0),
+                                       expected, atol=1e-6)
+        self.assertGreater(np.abs(expected).max(), 1e-3)
+        self.assertEqual(changed.tail, old_tail - 3 * chunk)
+
+        # Once drained, only the new room is left
+        for _ in range(-(-old_tail // chunk)):
+            changed(silence, self.config, room_size=0.3, mix=1.0)
+        self.assertEqual(changed.tail, int(0.3 * self.config.RATE))
+
+    def test_output_length_and_dtype(self):
+        reverb = ConvolutionReverb(self.config.RATE, self.config.CHUNK)
+        output = reverb(self.test_data, self.config, room_size=0.5)
+        self.assertEqual(len(output), len(self.test_data))
+        self.assertEqual(output.dtype, np.int16)
+
+
+class TestStreamingEQ(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        rng = np.random.default_rng(3)
+        self.test_data = (rng.standard_normal(self.config.CHUNK * 6) * 3000).astype(np.int16)
+
+    def test_blocks_match_single_pass(self):
+        bands = {'low': 1.5, 'mid': 0.5, 'high': 1.0}
+        eq = StreamingEQ(self.config.RATE)
+        chunk = self.config.CHUNK
+        streamed = np.concatenate([
+            eq(self.test_data[i:i + chunk], self.config, bands)
+            for i in range(0, len(self.test_data), chunk)
+        ])
+
+        expected = sum(
+            signal.sosfilt(sos, self.test_data) * bands[name]
+            for sos, name in zip(design_crossover(self.config.RATE, 200, 2000),
+                                 ('low', 'mid', 'high'))
+        )
+        expected = np.clip(expected, -32768, 32767).astype(np.int16)
+        self.assertLessEqual(np.abs(streamed.astype(int) - expected).max(), 1)
+
+    def test_unity_gains_are_flat(self):
+        # Called directly, so the plan's unity-gain bypass is not involved
+        impulse = np.zeros(1 << 16, dtype=np.float32)
+        impulse[0] = 0.5
+        for mid in (1.0, 1.01):
+            eq = StreamingEQ(self.config.RATE)
+            response = eq.process(impulse, {'low': 1.0, 'mid': mid, 'high': 1.0}) / 0.5
+            magnitude = 20 * np.log10(np.abs(np.fft.rfft(response))[1:])
+            self.assertLess(np.abs(magnitude).max(), 0.1, msg=f"mid={mid}")
+
+    def test_blocks_need_no_temporaries(self):
+        import tracemalloc
+        from unittest import mock
+        from orionwave.effects import eq as eq_module
+        bands = {'low': 1.5, 'mid': 0.5, 'high': 1.0}
+        block = self.test_data[:self.config.CHUNK].astype(np.float32) / 32768
+        out = np.empty_like(block)
+
+        eq = StreamingEQ(self.config.RATE)
+        eq.process(block, bands, out=out)
+        tracemalloc.start()
+        for _ in range(10):
+            eq.process(block, bands, out=out)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # One band of float64 samples alone would be 8 KB
+        self.assertLess(peak, 4096)
+
+        # Without scipy's in-place kernel the public sosfilt gives the same result
+        with mock.patch.object(eq_module, '_sosfilt', None):
+            fallback = StreamingEQ(self.config.RATE)
+            for _ in range(11):
+                expected = fallback.process(block, bands).copy()
+        np.testing.assert_allclose(out, expected, atol=1e-6)
+
+    def test_coefficients_are_reused(self):
+        eq = StreamingEQ(self.config.RATE)
+        eq(self.test_data[:256], self.config, {'low': 2.0, 'mid': 1.0, 'high': 1.0})
+        sos = eq.sos
+        eq(self.test_data[256:512], self.config, {'low': 0.5, 'mid': 1.0, 'high': 1.0})
+        self.assertIs(eq.sos, sos)
+
+
+def dominant_frequency(data: np.ndarray, sample_rate: int) -> float:
+    spectrum = np.abs(np.fft.rfft(data * np.hanning(len(data))))
+    return np.fft.rfftfreq(len(data), 1 / sample_rate)[np.argmax(spectrum)]
+
+
+class TestPitchShifters(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        t = np.arange(self.config.RATE) / self.config.RATE
+        self.tone = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+
+    def stream(self, effect, **params):
+        chunk = self.config.CHUNK
+        return np.concatenate([
+            effect(self.tone[i:i + chunk], self.config, **params)
+            for i in range(0, len(self.tone), chunk)
+        ])
+
+    def test_phase_vocoder_shifts_octave(self):
+        shifter = PhaseVocoderPitchShifter(self.config.RATE)
+        output = self.stream(shifter, shift=1200)
+        self.assertEqual(len(output), len(self.tone))
+        settled = output[shifter.latency * 2:].astype(np.float64)
+        self.assertAlmostEqual(dominant_frequency(settled, self.config.RATE), 880, delta=5)
+
+    def test_phase_vocoder_preserves_level(self):
+        level = np.sqrt(np.mean(self.tone.astype(np.float64) ** 2))
+        for shift in (-1200, -700, 700, 1200):
+            with self.subTest(shift=shift):
+                shifter = PhaseVocoderPitchShifter(self.config.RATE)
+                settled = self.stream(shifter, shift=shift)[shifter.latency * 2:].astype(np.float64)
+                gain_db = 20 * np.log10(np.sqrt(np.mean(settled ** 2)) / level)
+                self.assertLess(abs(gain_db), 1.0)
+
+    def test_phase_vocoder_reports_latency(self):
+        shifter = PhaseVocoderPitchShifter(self.config.RATE, frame_size=1024)
+        self.assertEqual(shifter.latency, 1024)
+        impulse = np.zeros(self.config.CHUNK * 4, dtype=np.int16)
+        impulse[100] = 20000
+        chunk = self.config.CHUNK
+        output = np.concatenate([
+            shifter(impulse[i:i + chunk], self.config, shift=0)
+            for i in range(0, len(impulse), chunk)
+        ])
+        self.assertEqual(np.argmax(np.abs(output)), 100 + shifter.latency)
+
+    def test_wsola_modes_shift_fifth(self):
+        expected = 440 * 2 ** (700 / 1200)
+        for mode in WSOLAPitchShifter.MODES:
+            with self.subTest(mode=mode):
+                shifter = WSOLAPitchShifter(self.config.RATE, mode=mode)
+                output = self.stream(shifter, shift=700, mode=mode)
+                self.assertEqual(len(output), len(self.tone))
+                settled = output[shifter.latency * 2:].astype(np.float64)
+                self.assertAlmostEqual(dominant_frequency(settled, self.config.RATE), expected, delta=8)
+
+    def test_wsola_modes_are_in_tune(self):
+        t = np.arange(self.config.RATE * 2) / self.config.RATE
+        for mode in WSOLAPitchShifter.MODES:
+            for base, shift in ((110, 700), (220, 700), (220, -500)):
+                with self.subTest(mode=mode, base=base, shift=shift):
+                    shifter = WSOLAPitchShifter(self.config.RATE, mode=mode)
+                    tone = (np.sin(2 * np.pi * base * t) * 0.5).astype(np.float32)
+                    output = np.concatenate([
+                        shifter(tone[i:i + self.config.CHUNK], self.config, shift=shift, mode=mode)
+                        for i in range(0, len(tone), self.config.CHUNK)
+                    ])[shifter.latency * 2:]
+                    # Zero-padded so the peak resolves to a fraction of a hertz
+                    size = len(output) * 8
+                    spectrum = np.abs(np.fft.rfft(output * np.hanning(len(output)), size))
+                    measured = np.fft.rfftfreq(size, 1 / self.config.RATE)[np.argmax(spectrum)]
+                    cents = 1200 * np.log2(measured / (base * 2 ** (shift / 1200)))
+                    self.assertLess(abs(cents), 5)
+
+    def test_wsola_unity_preserves_signal(self):
+        shifter = WSOLAPitchShifter(self.config.RATE, mode='fast')
+        output = self.stream(shifter, shift=0, mode='fast')
+        settled = output[shifter.latency * 2:].astype(np.float64)
+        self.assertAlmostEqual(dominant_frequency(settled, self.config.RATE), 440, delta=3)
+        ratio = np.sqrt(np.mean(settled ** 2)) / np.sqrt(np.mean(self.tone.astype(np.float64) ** 2))
+        self.assertAlmostEqual(ratio, 1.0, delta=0.05)
+
+
+class TestFloatKernels(unittest.TestCase):
+    """Effects keep float32 blocks in float32 and honour ``out=``"""
+
+    def setUp(self):
+        self.config = AudioConfig()
+        rng = np.random.default_rng(13)
+        self.pcm = (rng.standard_normal(self.config.CHUNK * 4) * 3000).astype(np.int16)
+        self.samples = self.pcm.astype(np.float32) / 32768.0
+        self.effects = {
+            'equalizer': (lambda: partial(StreamingEQ(self.config.RATE), bands={'low': 1.5, 'mid': 0.5})),
+            'reverb': (lambda: partial(ConvolutionReverb(self.config.RATE, self.config.CHUNK), mix=0.5)),
+            'pitch_shift': (lambda: partial(PhaseVocoderPitchShifter(self.config.RATE), shift=300)),
+            'pitch_shift_wsola': (lambda: partial(WSOLAPitchShifter(self.config.RATE), shift=300)),
+            'compressor': (lambda: partial(apply_compression, threshold=0.05, ratio=4.0)),
+            'robot': (lambda: apply_robot_effect),
+        }
+
+    def stream(self, effect, data, out=None):
+        chunk = self.config.CHUNK
+        blocks = []
+        for i in range(0, len(data), chunk):
+            result = effect(data[i:i + chunk], self.config, out=out)
+            if out is not None:
+                self.assertIs(result, out)
+            blocks.append(result.copy())
+        return np.concatenate(blocks)
+
+    def test_float_matches_pcm_path(self):
+        for name, make in self.effects.items():
+            with self.subTest(effect=name):
+                pcm = self.stream(make(), self.pcm)
+                samples = self.stream(make(), self.samples)
+                self.assertEqual(pcm.dtype, np.int16)
+                self.assertEqual(samples.dtype, np.float32)
+                np.testing.assert_allclose(samples * 32768.0, pcm, atol=1.5)
+
+    def test_out_buffer_is_written(self):
+        out = np.empty(self.config.CHUNK, dtype=np.float32)
+        for name, make in self.effects.items():
+            with self.subTest(effect=name):
+                expected = self.stream(make(), self.samples)
+                np.testing.assert_array_equal(self.stream(make(), self.samples, out), expected)
+
+    def test_compression_curve(self):
+        samples = np.array([-0.9, -0.1, 0.0, 0.3, 0.9], dtype=np.float32)
+        compressed = apply_compression(samples, self.config, threshold=0.5, ratio=4.0)
+        np.testing.assert_allclose(compressed, [-0.6, -0.1, 0.0, 0.3, 0.6], atol=1e-6)
+
+
+class ScaleInto:
+    """Test effect that writes into the plan's buffers"""
+
+    def __call__(self, data, config, gain: float = 2.0, out=None):
+        np.multiply(data, gain, out=out, casting='unsafe')
+        return out
+
+
+class TestEffectsPlan(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        self.registry = {
+            'robot': apply_robot_effect,
+            'compressor': apply_compression,
+            'reverb': partial(ConvolutionReverb, self.config.RATE, self.config.CHUNK),
+            'equalizer': partial(StreamingEQ, self.config.RATE),
+            'scale': ScaleInto
+        }
+        rng = np.random.default_rng(12)
+        self.block = (rng.standard_normal(self.config.CHUNK) * 3000).astype(np.int16)
+
+    def compile(self, chain, previous=None) -> EffectsPlan:
+        return compile_plan(chain, self.registry, self.config, previous)
+
+    def test_rejects_unknown_effects_and_params(self):
+        with self.assertRaises(ValueError):
+            self.compile([('flanger', {})])
+        with self.assertRaises(ValueError):
+            self.compile([('reverb', {'size': 0.5})])
+
+    def test_identity_stages_are_eliminated(self):
+        plan = self.compile([
+            ('equalizer', {'bands': {'low': 1.0, 'mid': 1.0, 'high': 1.0}}),
+            ('reverb', {'mix': 0}),
+            ('compressor', {'ratio': 1.0}),
+            ('robot', {})
+        ])
+        self.assertEqual([stage.name for stage in plan.stages], ['robot'])
+        self.assertEqual(plan.bypassed, ('equalizer', 'reverb', 'compressor'))
+        np.testing.assert_array_equal(plan.run(self.block), apply_robot_effect(self.block, self.config))
+
+    def test_each_entry_gets_its_own_instance(self):
+        plan = self.compile([('reverb', {}), ('reverb', {'room_size': 0.3})])
+        self.assertIsNot(plan.stages[0].effect, plan.stages[1].effect)
+        self.assertEqual(plan.stages[1].params['mix'], 0.6)
+
+        recompiled = self.compile([('reverb', {}), ('reverb', {'room_size': 0.3}), ('robot', {})], plan)
+        self.assertIs(recompiled.stages[0].effect, plan.stages[0].effect)
+
+    def test_out_stages_ping_pong(self):
+        plan = self.compile([('scale', {}), ('scale', {'gain': 3.0})])
+        self.assertTrue(all(stage.writes_out for stage in plan.stages))
+        output = plan.run(self.block // 8)
+        np.testing.assert_array_equal(output, (self.block // 8) * 6)
+        self.assertIs(plan.run(self.block // 8), output)
+        self.assertEqual(set(plan.timings()), {'effect_scale'})
+
+    def test_builtin_effects_write_into_plan_buffers(self):
+        plan = self.compile([('equalizer', {'bands': {'low': 1.2}}), ('reverb', {}), ('compressor', {})])
+        self.assertTrue(all(stage.writes_out for stage in plan.stages))
+        samples = self.block.astype(np.float32) / 32768.0
+        output = plan.run(samples)
+        self.assertEqual(output.dtype, np.float32)
+        self.assertTrue(any(output is buffer for pair in plan._buffers.values() for buffer in pair))
+
+
+class TestParameterSmoothing(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        rng = np.random.default_rng(14)
+        self.data = (rng.standard_normal(self.config.CHUNK * 4) * 0.1).astype(np.float32)
+
+    def test_smoother_ramps_per_sample(self):
+        smoother = ParameterSmoother(0.0, ramp_samples=100)
+        self.assertEqual(smoother.next_block(64), 0.0)
+        smoother.set_target(1.0)
+        first = smoother.next_block(64).copy()
+        second = smoother.next_block(64).copy()
+        np.testing.assert_allclose(first, np.arange(1, 65) / 100, rtol=1e-6)
+        np.testing.assert_allclose(second[:36], np.arange(65, 101) / 100, rtol=1e-6)
+        np.testing.assert_array_equal(second[36:], 1.0)
+        self.assertEqual(smoother.next_block(64), 1.0)
+
+    def test_store_publishes_new_snapshots(self):
+        store = ParameterStore()
+        store.reset({(0, 'mix'): 0.2}, layout=1)
+        before = store.snapshot
+        store.set(0, 'mix', 0.8)
+        self.assertEqual(before.values[(0, 'mix')], 0.2)
+        self.assertEqual(store.get((0, 'mix')), 0.8)
+        self.assertEqual(store.version, before.version + 1)
+        self.assertEqual(store.layout, 1)
+        with self.assertRaises(TypeError):
+            store.snapshot.values[(0, 'mix')] = 0.5
+
+    def test_plan_ramps_mix_inside_the_block(self):
+        registry = {'reverb': partial(ConvolutionReverb, self.config.RATE, self.config.CHUNK)}
+        plan = compile_plan([('reverb', {'room_size': 0.3, 'mix': 0.2})], registry, self.config,
+                            layout=1, ramp_samples=self.config.CHUNK * 2)
+        store = ParameterStore()
+        store.reset(plan.targets(), plan.layout)
+        reference = ConvolutionReverb(self.config.RATE, self.config.CHUNK)
+        smoother = plan.stages[0].smoothers['mix']
+
+        chunk = self.config.CHUNK
+        store.set(0, 'mix', 0.8)
+        for i in range(0, len(self.data), chunk):
+            block = self.data[i:i + chunk]
+            mix = np.clip(0.2 + 0.6 * np.arange(i + 1, i + chunk + 1) / (2 * chunk), 0.2, 0.8)
+            expected = reference(block, self.config, room_size=0.3, mix=mix.astype(np.float32))
+            np.testing.assert_allclose(plan.run(block, store.snapshot), expected, atol=1e-6)
+        self.assertEqual(smoother.value, 0.8)
+
+        # A snapshot for another chain layout leaves the targets alone
+        store.reset({(0, 'mix'): 0.0}, layout=2)
+        plan.run(self.data[:chunk], store.snapshot)
+        self.assertEqual(smoother.target, 0.8)
+
+
+class TestParameterAutomation(unittest.TestCase):
+    def setUp(self):
+        self.config = AudioConfig()
+        self.automation = ParameterAutomation(sample_rate=1000)
+
+    def test_envelope_shapes(self):
+        linear = build_envelope(1000, 0.0, 1.0, 0.1)
+        np.testing.assert_allclose(linear, np.arange(1, 101) / 100, rtol=1e-6)
+        exponential = build_envelope(1000, 0.0, 1.0, 0.1, curve='exponential')
+        self.assertAlmostEqual(float(exponential[-1]), 1.0, places=6)
+        self.assertGreater(exponential[49], linear[49])
+        points = build_envelope(1000, curve='breakpoint', points=[(0.0, 0.0), (0.05, 1.0), (0.1, 0.5)])
+        self.assertEqual(len(points), 100)
+        self.assertAlmostEqual(float(points[49]), 1.0, places=6)
+        self.assertAlmostEqual(float(points[-1]), 0.5, places=6)
+        self.assertFalse(linear.flags.writeable)
+        with self.assertRaises(ValueError):
+            build_envelope(1000, curve='cubic')
+
+    def test_lanes_are_sliced_per_block_and_hold_their_end(self):
+        self.assertEqual(self.automation.process(32), {})
+        self.automation.add_automation('mix', 0.0, 1.0, duration=0.05)
+        self.assertEqual(self.automation.pending, 1)
+
+        first = self.automation.process(32)['mix'].copy()
+        second = self.automation.process(32)['mix'].copy()
+        np.testing.assert_allclose(first, np.arange(1, 33) / 50, rtol=1e-6)
+        np.testing.assert_allclose(second[:18], np.arange(33, 51) / 50, rtol=1e-6)
+        np.testing.assert_array_equal(second[18:], 1.0)
+        self.assertFalse(self.automation.active)
+        self.assertEqual(self.automation.process(32), {})
+
+    def test_newer_lane_replaces_older(self):
+        self.automation.add_automation('mix', 0.0, 1.0, duration=1.0)
+        self.automation.process(32)
+        self.automation.add_breakpoints('mix', [(0.0, 0.5), (0.01, 0.5)])
+        values = self.automation.process(32)['mix']
+        np.testing.assert_array_equal(values, 0.5)
+
+    def test_lanes_for_another_layout_are_dropped(self):
+        self.automation.add_automation('mix', 0.0, 1.0, duration=1.0, layout=1)
+        self.assertEqual(self.automation.process(32, layout=2), {})
+        self.assertEqual(self.automation.pending, 0)
+
+    def test_plan_follows_automation_per_sample(self):
+        registry = {'reverb': partial(ConvolutionReverb, self.config.RATE, self.config.CHUNK)}
+        plan = compile_plan([('reverb', {'room_size': 0.3, 'mix': 0.2})], registry, self.config)
+        reference = ConvolutionReverb(self.config.RATE, self.config.CHUNK)
+        automation = ParameterAutomation(self.config.RATE)
+        chunk = self.config.CHUNK
+        lane = automation.add_automation((0, 'mix'), 0.2, 0.8, duration=1.5 * chunk / self.config.RATE)
+
+        data = (np.random.default_rng(18).standard_normal(chunk * 3) * 0.1).astype(np.float32)
+        for i in range(0, len(data), chunk):
+            block = data[i:i + chunk]
+            mix = np.full(chunk, lane.end_value, dtype=np.float32)
+            segment = lane.envelope[i:i + chunk]
+            mix[:len(segment)] = segment
+            expected = reference(block, self.config, room_size=0.3, mix=mix)
+            np.testing.assert_allclose(plan.run(block, automation=automation.process(chunk)),
+                                       expected, atol=1e-6)
+        self.assertAlmostEqual(plan.stages[0].smoothers['mix'].value, 0.8, places=6)
+
+
+class TestNeuralEnhancer(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.enhancer = NeuralEnhancer()
+        rng = np.random.default_rng(9)
+        self.data = (rng.standard_normal(6000) * 0.1).astype(np.float32)
+
+    def test_receptive_field(self):
+        self.assertEqual(self.enhancer.context, 8)
+        self.assertEqual(self.enhancer.latency, 4)
+
+    def test_streaming_matches_whole_signal(self):
+        # Uneven block sizes, including one longer than the old 2048 limit
+        sizes = [1024, 3, 2500, 7, 466, 2000]
+        edges = np.cumsum([0] + sizes)
+        streamed = [self.enhancer.enhance(self.data[a:b]) for a, b in zip(edges[:-1], edges[1:])]
+        for block, size in zip(streamed, sizes):
+            self.assertEqual(len(block), size)
+
+        with torch.inference_mode():
+            whole = self.enhancer.model(torch.from_numpy(self.data).view(1, 1, -1))[0, 0].numpy()
+        # Skip start-up, where zero input differs from each layer's zero padding
+        latency, context = self.enhancer.latency, self.enhancer.context
+        np.testing.assert_allclose(np.concatenate(streamed)[latency + context:],
+                                   whole[context:-latency], atol=1e-5)
+        self.assertEqual(self.enhancer.timing_stats()['blocks'], len(sizes))
+
+    def test_int16_round_trip(self):
+        data = (self.data * 32768).astype(np.int16)
+        output = self.enhancer.enhance(data)
+        self.assertEqual(output.dtype, np.int16)
+        self.assertEqual(len(output), len(data))
+
+
+class TestInferenceBackends(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model = EnhancementModel().eval()
+
+    def export_round_trip(self, name: str) -> float:
+        backend = build_backend(name, self.model)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f'{name}.model')
+            backend.export(path)
+            return parity_error(load_backend(name, path), self.model)
+
+    def test_torch_backends_match_eager(self):
+        for name, tolerance in (('eager', 0.0), ('torchscript', 1e-6),
+                                ('dynamic_int8', 0.02), ('static_int8', 0.02)):
+            with self.subTest(backend=name):
+                self.assertLessEqual(self.export_round_trip(name), tolerance)
+
+    @unittest.skipUnless(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('onnx'),
+                         'onnxruntime not installed')
+    def test_onnx_matches_eager(self):
+        self.assertLess(self.export_round_trip('onnx'), 1e-4)
+        # Building without a destination leaves no file behind
+        before = set(os.listdir(tempfile.gettempdir()))
+        build_backend('onnx', self.model)
+        self.assertEqual(set(os.listdir(tempfile.gettempdir())), before)
+
+    def test_benchmark_restores_torch_threads(self):
+        threads = torch.get_num_threads()
+        results = benchmark_backends(self.model, 256, blocks=2, warmup=1, backends=('eager',),
+                                     num_threads=threads + 1)
+        self.assertIn('eager', results)
+        self.assertEqual(torch.get_num_threads(), threads)
+
+    def test_enhancer_streams_through_backend(self):
+        enhancer = NeuralEnhancer(backend='static_int8')
+        self.assertEqual(enhancer.backend.name, 'static_int8')
+        data = (np.random.default_rng(10).standard_normal(3000) * 3000).astype(np.int16)
+        self.assertEqual(len(enhancer.enhance(data)), len(data))
+        self.assertTrue(enhancer.enabled)
+
+
+class TestProcessEnhancer(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.directory = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.directory.name, 'enhancer.pth')
+        torch.save(EnhancementModel().state_dict(), self.model_path)
+        self.block_size = 512
+        rng = np.random.default_rng(11)
+        self.data = (rng.standard_normal(self.block_size * 6) * 0.1).astype(np.float32)
+        self.blocks = [self.data[i:i + self.block_size]
+                       for i in range(0, len(self.data), self.block_size)]
+
+    def tearDown(self):
+        self.enhancer.stop()
+        self.directory.cleanup()
+
+    def test_matches_in_process_with_one_block_delay(self):
+        self.enhancer = ProcessEnhancer(self.block_size, timeout=5.0, model_path=self.model_path)
+        self.assertTrue(self.enhancer.wait_ready(60))
+        outputs = [self.enhancer.enhance(block) for block in self.blocks]
+
+        local = NeuralEnhancer(model_path=self.model_path)
+        expected = [local.enhance(block) for block in self.blocks]
+        np.testing.assert_array_equal(outputs[0], 0)
+        np.testing.assert_allclose(np.concatenate(outputs[1:]), np.concatenate(expected[:-1]), atol=1e-6)
+        self.assertEqual(self.enhancer.deadline_misses, 0)
+
+    def test_missed_deadline_passes_delayed_input(self):
+        # The worker cannot be ready yet, so every result is late; none is waited for
+        self.enhancer = ProcessEnhancer(self.block_size, model_path=self.model_path)
+        start = time.perf_counter()
+        outputs = [self.enhancer.enhance(block) for block in self.blocks[:3]]
+        self.assertLess(time.perf_counter() - start, 0.05)
+        # The unenhanced fallback is as late as an enhanced block would be
+        delayed = np.concatenate([np.zeros(self.enhancer.latency, dtype=np.float32), self.data])
+        np.testing.assert_array_equal(np.concatenate(outputs), delayed[:3 * self.block_size])
+        self.assertEqual(self.enhancer.deadline_misses, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 import os
+import subprocess
 import sys
+import tempfile
 import unittest
+from pathlib import Path
 import numpy as np
 
 # Add project root to Python path
@@ -58,8 +61,661 @@ class TestVoiceProcessor(unittest.TestCase):
         self.processor.add_effect('pitch_shift', {'shift': 100})
         self.assertEqual(len(self.processor.effects_chain), 1)
         
+    def test_invalid_effect_leaves_chain_unchanged(self):
+        self.processor.clear_effects()
+        self.processor.add_effect('reverb', {'room_size': 0.5})
+        with self.assertRaises(ValueError):
+            self.processor.add_effect('reverb', {'roomsize': 0.5})
+        self.assertEqual(len(self.processor.effects_chain), 1)
+        self.assertEqual(len(self.processor._plan), 1)
+
+    def test_continuous_params_ramp_without_recompiling(self):
+        self.processor.clear_effects()
+        self.processor.add_effect('reverb', {'room_size': 0.5, 'mix': 0.3})
+        plan = self.processor._plan
+
+        self.processor.set_effect_param('reverb', 'mix', 0.7)
+        self.assertIs(self.processor._plan, plan)
+        self.assertEqual(self.processor.parameters.get((0, 'mix')), 0.7)
+        self.assertEqual(self.processor.effects_chain[0][1]['mix'], 0.7)
+
+        self.processor.set_effect_param('reverb', 'room_size', 0.2)
+        self.assertIsNot(self.processor._plan, plan)
+        self.assertIs(self.processor._plan.stages[0].smoothers['mix'], plan.stages[0].smoothers['mix'])
+
+    def test_automation_runs_inside_the_block(self):
+        self.processor.clear_effects()
+        self.processor.add_effect('reverb', {'room_size': 0.5, 'mix': 0.2})
+        smoother = self.processor._plan.stages[0].smoothers['mix']
+        block = np.zeros(self.config.CHUNK, dtype=np.float32)
+
+        lane = self.processor.automate_effect_param('reverb', 'mix', 0.8, duration=0.01)
+        self.assertAlmostEqual(float(lane.envelope[0]), 0.2, delta=0.01)
+        self.assertEqual(self.processor.effects_chain[0][1]['mix'], lane.end_value)
+        for _ in range(3):
+            self.processor.process_effects_chain(block)
+        self.assertAlmostEqual(smoother.value, 0.8, places=6)
+        self.assertFalse(self.processor.automation.active)
+
+        with self.assertRaises(ValueError):
+            self.processor.automate_effect_param('reverb', 'room_size', 0.1)
+
+    def test_adaptation_follows_clarity_and_leaves_a_silent_reverb_off(self):
+        t = np.arange(self.config.CHUNK) / self.config.RATE
+        tone = (np.sin(2 * np.pi * 220 * t) * 0.3).astype(np.float32)
+        noise = (np.random.default_rng(0).standard_normal(self.config.CHUNK) * 0.3).astype(np.float32)
+        tonal = self.processor.analyzer.analyze_frame(tone)
+        noisy = self.processor.analyzer.analyze_frame(noise)
+        self.assertGreater(tonal['clarity'], 0.9)
+        self.assertLess(noisy['clarity'], 0.6)
+
+        self.processor.clear_effects()
+        self.processor.add_effect('reverb', {'mix': 0.2})
+        self.processor._adapt_effects_to_audio(tonal)
+        self.assertAlmostEqual(self.processor.effects_chain[0][1]['mix'], 0.3 + 0.6 * tonal['clarity'], places=5)
+
+        self.processor.clear_effects()
+        self.processor.add_effect('reverb', {'mix': 0.0})
+        with self.assertNoLogs('orionwave.processor', level='ERROR'):
+            self.processor._adapt_effects_to_audio(noisy)
+        self.assertEqual(self.processor.effects_chain[0][1]['mix'], 0.0)
+
+    def test_reautomating_mid_ramp_continues_from_the_current_value(self):
+        self.processor.clear_effects()
+        self.processor.add_effect('reverb', {'room_size': 0.5, 'mix': 0.2})
+        smoother = self.processor._plan.stages[0].smoothers['mix']
+        block = np.zeros(self.config.CHUNK, dtype=np.float32)
+        duration = 20 * self.config.CHUNK / self.config.RATE
+
+        self.processor.automate_effect_param('reverb', 'mix', 0.8, duration=duration)
+        values = []
+        for _ in range(5):
+            self.processor.process_effects_chain(block)
+            values.append(smoother.value)
+        lane = self.processor.automate_effect_param('reverb', 'mix', 0.1, duration=duration)
+        self.assertAlmostEqual(float(lane.envelope[0]), values[-1], delta=0.01)
+        for _ in range(5):
+            self.processor.process_effects_chain(block)
+            values.append(smoother.value)
+
+        # Each block moves by one block's share of a ramp, never jumping to the old end value
+        steps = np.abs(np.diff(values))
+        self.assertLess(steps.max(), 0.04)
+
+    def test_block_never_sees_automation_target_without_its_lane(self):
+        from unittest import mock
+        from orionwave.effects.parameters import ParameterStore
+        self.processor.clear_effects()
+        self.processor.add_effect('reverb', {'room_size': 0.5, 'mix': 0.2})
+        smoother = self.processor._plan.stages[0].smoothers['mix']
+        block = np.zeros(self.config.CHUNK, dtype=np.float32)
+        snapshot = ParameterStore.snapshot
+        pending = [True]
+
+        def automate_mid_block(store):
+            # The control thread publishes while the audio thread gathers its inputs
+            if pending:
+                pending.pop()
+                self.processor.automate_effect_param('reverb', 'mix', 0.8, duration=0.5)
+            return snapshot.fget(store)
+
+        with mock.patch.object(ParameterStore, 'snapshot', property(automate_mid_block)):
+            self.processor.process_effects_chain(block)
+        # Following the half-second lane, not ramping straight to its end value
+        self.assertLess(smoother.value, 0.3)
+
+    def test_callback_converts_only_at_the_boundary(self):
+        self.processor.clear_effects()
+        self.processor.add_effect('equalizer', {'bands': {'low': 1.2, 'mid': 1.0, 'high': 0.8}})
+        self.processor.voice_active = True
+        t = np.arange(self.config.CHUNK) / self.config.RATE
+        pcm = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+
+        samples = pcm.astype(np.float32) / 32768.0
+        processed = self.processor.process_block(samples.copy())
+        self.assertEqual(processed.dtype, np.float32)
+        self.assertEqual(len(processed), len(samples))
+
+        out_data, flag = self.processor._audio_callback(pcm.tobytes(), len(pcm), None, 0)
+        self.assertEqual(flag, self.processor._pa_continue)
+        self.assertEqual(len(out_data), len(pcm.tobytes()))
+
+    def test_vad_switches_wet_signal_without_gaps(self):
+        self.processor.clear_effects()
+        self.processor.add_effect('pitch_shift', {'shift': 700})
+        t = np.arange(self.config.CHUNK) / self.config.RATE
+        tone = (np.sin(2 * np.pi * 220 * t) * 0.3).astype(np.float32)
+        silence = np.zeros_like(tone)
+        level = np.sqrt(np.mean(tone ** 2))
+
+        shifter = self.processor._plan.stage_timings[0]
+        for _ in range(10):
+            self.processor.process_block(tone)
+        silent = [self.processor.process_block(silence).copy() for _ in range(12)]
+        self.assertFalse(self.processor.voice_active)
+        np.testing.assert_array_equal(silent[-1], 0)
+
+        # Once the shifter's latency has rung out after the gate closed, it sits silence out
+        runs = shifter.count
+        for _ in range(5):
+            self.processor.process_block(silence)
+        self.assertEqual(shifter.count, runs)
+
+        # It is primed with the input it missed, so its output is current the
+        # moment the VAD switches it back in, one latency after the input
+        resumed = np.concatenate([self.processor.process_block(tone).copy() for _ in range(4)])
+        self.assertTrue(self.processor.voice_active)
+        resumed = resumed[self.processor.latency:]
+        for start in range(0, len(resumed) - len(tone) + 1, len(tone) // 2):
+            block = resumed[start:start + len(tone)]
+            self.assertGreater(np.sqrt(np.mean(block ** 2)), 0.5 * level)
+
+    def test_idle_stages_are_primed_on_voice(self):
+        chunk = self.config.CHUNK
+        rng = np.random.default_rng(0)
+        t = np.arange(chunk * 4) / self.config.RATE
+        tone = (np.sin(2 * np.pi * 220 * t) * 0.3).astype(np.float32)
+        noise = (rng.standard_normal(chunk * 20) * 0.01).astype(np.float32)
+        signal = np.concatenate([tone, noise, tone])
+
+        # A processor without the gate never idles and shows the wet signal throughout
+        reference = VoiceProcessor(self.config, vad_enabled=False)
+        for processor in (self.processor, reference):
+            processor.noise_reducer.calibrate(noise)
+        blocks = signal.reshape(-1, chunk)
+        outputs = [self.processor.process_block(block).copy() for block in blocks]
+        expected = [reference.process_block(block).copy() for block in blocks]
+        # The noise reducer sat out most of the quiet stretch
+        self.assertLess(self.processor.stage_timings()['noise_reduction'].count,
+                        reference.stage_timings()['noise_reduction'].count - 5)
+
+        # The VAD crossfades the wet signal in on the second loud block
+        resume = 4 + 20 + 1
+        latency = self.processor.latency
+        dry = signal[resume * chunk - latency:(resume + 1) * chunk - latency]
+        fade = self.processor._fade
+        np.testing.assert_allclose(outputs[resume], dry + fade * (expected[resume] - dry), atol=1e-5)
+        np.testing.assert_allclose(outputs[resume + 1:], expected[resume + 1:], atol=1e-5)
+
+    def test_subsystems_built_on_demand(self):
+        for name in ('neural_enhancer', 'preset_manager', 'recording_manager', 'pyaudio'):
+            self.assertNotIn(name, self.processor.__dict__)
+        self.assertIsNone(self.processor.preset_manager.current_preset)
+        self.assertIn('preset_manager', self.processor.__dict__)
+
+    def test_import_is_lightweight(self):
+        code = ("import sys, orionwave; "
+                "print(sorted(m for m in ('torch', 'pyaudio', 'sounddevice', 'scipy') if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=os.path.join(os.path.dirname(__file__), '..'), check=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+
     def tearDown(self):
         self.processor.cleanup()
 
+class TestPerformanceMonitor(unittest.TestCase):
+    def test_buckets_bound_their_durations(self):
+        from orionwave.monitoring import BUCKET_BOUNDS, HISTOGRAM_BUCKETS, bucket_index
+        durations = np.unique(np.geomspace(1, 5e9, 2000).astype(np.int64))
+        indices = [bucket_index(int(ns)) for ns in durations]
+        self.assertEqual(indices, sorted(indices))
+        self.assertEqual(indices[-1], HISTOGRAM_BUCKETS - 1)
+        for ns, index in zip(durations, indices):
+            self.assertLess(ns, BUCKET_BOUNDS[index])
+            if index:
+                self.assertGreaterEqual(ns, BUCKET_BOUNDS[index - 1])
+
+    def test_percentiles_and_deadline_misses(self):
+        from orionwave.monitoring import PerformanceMonitor
+        monitor = PerformanceMonitor(block_seconds=0.001)
+        stage = monitor.stage('callback', deadline=True)
+        for _ in range(990):
+            stage.record(100_000)
+        for _ in range(10):
+            stage.record(5_000_000)
+
+        summary = stage.summary()
+        self.assertEqual((summary['count'], summary['misses']), (1000, 10))
+        self.assertAlmostEqual(summary['p50'], 100e-6, delta=10e-6)
+        self.assertAlmostEqual(summary['p99'], 100e-6, delta=10e-6)
+        self.assertAlmostEqual(stage.percentile(99.5), 5e-3, delta=0.5e-3)
+        self.assertEqual(summary['max'], 5e-3)
+        self.assertEqual(monitor.deadline_misses, 10)
+
+        # The window only sees the latest durations
+        for _ in range(len(stage.recent)):
+            stage.record(200_000)
+        recent = stage.summary(window=True)
+        self.assertEqual((recent['p99'], recent['max'], recent['misses']), (200e-6, 200e-6, 0))
+        self.assertEqual(stage.summary()['misses'], 10)
+
+    def test_record_does_not_allocate(self):
+        import tracemalloc
+        from orionwave.monitoring import StageTimings
+        stage = StageTimings('callback', deadline_ns=1_000_000)
+        stage.record(1)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for ns in range(100_000, 10_000_000, 1000):
+            stage.record(ns)
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.assertLess(after - before, 1024)
+
+    def test_processor_reports_stage_percentiles(self):
+        processor = VoiceProcessor(AudioConfig(), start_server=False)
+        try:
+            processor.add_effect('reverb', {'mix': 0.3})
+            t = np.arange(processor.config.CHUNK) / processor.config.RATE
+            block = (np.sin(2 * np.pi * 220 * t) * 0.3).astype(np.float32)
+            for _ in range(10):
+                processor.process_block(block)
+            stats = processor.get_audio_stats()
+            self.assertEqual(stats['latency_stats']['audio_processing']['count'], 10)
+            self.assertIn('effect_reverb', stats['recent_latency_stats'])
+            self.assertGreater(stats['latency_stats']['analysis']['p95'], 0)
+            self.assertEqual(stats['latency_stats']['vad']['count'], 10)
+            self.assertIsInstance(stats['deadline_misses'], int)
+        finally:
+            processor.cleanup()
+
+class TestMetricsServer(unittest.TestCase):
+    def setUp(self):
+        from orionwave.network.metrics_server import MetricsServer
+        self.processor = VoiceProcessor(AudioConfig(), start_server=False)
+        self.processor.add_effect('reverb', {'mix': 0.3})
+        t = np.arange(self.processor.config.CHUNK) / self.processor.config.RATE
+        block = (np.sin(2 * np.pi * 220 * t) * 0.3).astype(np.float32)
+        for _ in range(10):
+            self.processor.process_block(block)
+        self.server = MetricsServer(self.processor, port=0, interval=0.05)
+
+    def tearDown(self):
+        self.processor.cleanup()
+
+    def test_exposition_covers_processor_telemetry(self):
+        self.server.refresh()
+        text = self.server._payloads[False].decode()
+        self.assertIn('# TYPE orionwave_stage_latency_seconds histogram', text)
+        self.assertIn('orionwave_stage_latency_seconds_count{stage="audio_processing"} 10', text)
+        self.assertIn('orionwave_stage_latency_seconds_bucket{stage="effect_reverb",le="+Inf"} ', text)
+        self.assertIn('# TYPE orionwave_deadline_misses_total counter', text)
+        self.assertIn('orionwave_queue_depth{queue="analysis"} 10', text)
+        self.assertIn('orionwave_vad_frames_total 10', text)
+        self.assertIn('orionwave_process_resident_memory_bytes ', text)
+
+        # Buckets are cumulative and end at the sample count
+        buckets = [float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+                   if line.startswith('orionwave_stage_latency_seconds_bucket{stage="audio_processing"')]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertEqual(buckets[-1], 10)
+
+        openmetrics = self.server._payloads[True].decode()
+        self.assertIn('# TYPE orionwave_deadline_misses counter', openmetrics)
+        self.assertTrue(openmetrics.endswith('# EOF\n'))
+
+    def test_scrape_over_http(self):
+        import asyncio
+
+        async def scrape(accept):
+            task = asyncio.ensure_future(self.server.start())
+            try:
+                while self.server._server is None or not self.server._payloads[False]:
+                    await asyncio.sleep(0.01)
+                reader, writer = await asyncio.open_connection('localhost', self.server.port)
+                writer.write(f"GET /metrics HTTP/1.1\r\nHost: localhost\r\nAccept: {accept}\r\n\r\n".encode())
+                response = await reader.read()
+                writer.close()
+                return response.decode()
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        loop = asyncio.new_event_loop()
+        try:
+            response = loop.run_until_complete(scrape('text/plain'))
+            self.assertTrue(response.startswith('HTTP/1.1 200 OK'))
+            self.assertIn('text/plain; version=0.0.4', response)
+            self.assertIn('orionwave_stage_latency_seconds_count{stage="audio_processing"} 10', response)
+            self.server._server = None
+            response = loop.run_until_complete(scrape('application/openmetrics-text; version=1.0.0'))
+            self.assertIn('application/openmetrics-text', response)
+        finally:
+            loop.close()
+
+class TestTracing(unittest.TestCase):
+    def test_record_is_cheap(self):
+        import time
+        from orionwave.tracing import SpanTracer
+        tracer = SpanTracer(capacity=1024)
+        name = tracer.name_id('stage')
+        count = 100_000
+        start = time.perf_counter_ns()
+        for _ in range(count):
+            tracer.record(name, 1, 2)
+        per_span = (time.perf_counter_ns() - start) / count
+        self.assertLess(per_span, 5_000)
+
+    def test_chrome_trace_export(self):
+        import json
+        import threading
+        from orionwave.tracing import SpanTracer
+        tracer = SpanTracer(capacity=8)
+        callback, worker = tracer.name_id('callback'), tracer.name_id('worker')
+        for index in range(10):
+            tracer.record(callback, index * 1000, index * 1000 + 500)
+        thread = threading.Thread(target=tracer.record, args=(worker, 2000, 2600), name='worker')
+        thread.start()
+        thread.join()
+
+        trace = tracer.chrome_trace(markers=[9000])
+        spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        # The ring keeps only the newest spans, ordered by start
+        self.assertEqual(len(spans), 8)
+        self.assertEqual([span['ts'] for span in spans], sorted(span['ts'] for span in spans))
+        self.assertEqual(spans[-1], {'name': 'callback', 'ph': 'X', 'ts': 9.0, 'dur': 0.5,
+                                     'pid': os.getpid(), 'tid': threading.get_ident()})
+        self.assertIn('worker', {span['name'] for span in spans})
+        self.assertEqual(len([event for event in trace['traceEvents'] if event['ph'] == 'M']), 2)
+        self.assertIn({'name': 'deadline_miss', 'ph': 'i', 's': 'g', 'ts': 9.0, 'pid': os.getpid(),
+                       'tid': 0}, trace['traceEvents'])
+
+        window = tracer.chrome_trace(start_ns=8000, end_ns=8200)
+        self.assertEqual([event['ts'] for event in window['traceEvents'] if event['ph'] == 'X'], [8.0])
+        with tempfile.TemporaryDirectory() as directory:
+            path = tracer.dump(os.path.join(directory, 'trace.json'))
+            with open(path) as f:
+                self.assertEqual(json.load(f), tracer.chrome_trace())
+
+    def test_dumper_coalesces_clustered_misses(self):
+        import json
+        from orionwave.tracing import SpanTracer, TraceDumper
+        tracer = SpanTracer()
+        name = tracer.name_id('audio_processing')
+        base = 10_000_000_000
+        for index in range(100):
+            tracer.record(name, base + index * 10_000_000, base + index * 10_000_000 + 1_000_000)
+        with tempfile.TemporaryDirectory() as directory:
+            dumper = TraceDumper(tracer, directory, before=0.2, after=0.1)
+            first = base + 500_000_000
+            tracer.mark_miss(first)
+            tracer.mark_miss(first + 50_000_000)
+            # Nothing is written until the window after the miss has passed
+            self.assertEqual(dumper.dump_ready(first + 50_000_000), [])
+            written = dumper.dump_ready(first + 100_000_000)
+            self.assertEqual(len(written), 1)
+            with open(written[0]) as f:
+                events = json.load(f)['traceEvents']
+            spans = [event for event in events if event['ph'] == 'X']
+            self.assertEqual(len(spans), 31)
+            self.assertEqual(len([event for event in events if event['ph'] == 'i']), 2)
+
+            tracer.mark_miss(first + 400_000_000)
+            self.assertEqual(len(dumper.dump_ready(first + 600_000_000)), 1)
+            self.assertEqual(dumper.dump_ready(first + 700_000_000), [])
+            self.assertEqual(len(dumper.dumps), 2)
+
+    def test_processor_traces_every_stage(self):
+        import json
+        config = AudioConfig(EFFECTS={'tracing': {'enabled': True}})
+        processor = VoiceProcessor(config, start_server=False)
+        try:
+            processor.add_effect('reverb', {'mix': 0.3})
+            t = np.arange(config.CHUNK) / config.RATE
+            block = (np.sin(2 * np.pi * 220 * t) * 0.3).astype(np.float32)
+            for _ in range(5):
+                processor.process_block(block)
+            processor.analysis_worker.analyze_pending()
+            with tempfile.TemporaryDirectory() as directory:
+                path = processor.dump_trace(os.path.join(directory, 'trace.json'))
+                with open(path) as f:
+                    names = {event['name'] for event in json.load(f)['traceEvents'] if event['ph'] == 'X'}
+            self.assertLessEqual({'audio_processing', 'analysis', 'vad', 'effects', 'effect_reverb',
+                                  'analysis_worker'}, names)
+        finally:
+            processor.cleanup()
+
+    def test_tracing_is_off_by_default(self):
+        processor = VoiceProcessor(AudioConfig(), start_server=False)
+        try:
+            self.assertIsNone(processor.tracer)
+            self.assertIsNone(processor.dump_trace('unused.json'))
+        finally:
+            processor.cleanup()
+
+class TestRecordingManager(unittest.TestCase):
+    def setUp(self):
+        from orionwave.recording import RecordingManager
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = AudioConfig(CHUNK=80, RATE=8000)
+        self.recorder = RecordingManager(self.config, pre_roll=0.02)
+        self.recorder.output_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.recorder.close()
+        self.tmp.cleanup()
+
+    def block(self, value):
+        return np.full(self.config.CHUNK, value, dtype=np.float32)
+
+    def test_pre_roll_buffer_keeps_latest_samples(self):
+        from orionwave.recording import PreRollBuffer
+        history = PreRollBuffer(5)
+        for start in range(0, 12, 3):
+            history.write(np.arange(start, start + 3, dtype=np.float32))
+        np.testing.assert_array_equal(np.concatenate(history.segments()), [7, 8, 9, 10, 11])
+        history.write(np.arange(20, 27, dtype=np.float32))
+        np.testing.assert_array_equal(np.concatenate(history.segments()), [22, 23, 24, 25, 26])
+
+    def test_streams_blocks_with_pre_roll(self):
+        import soundfile as sf
+        self.recorder.start()
+        for value in range(5):
+            self.recorder.add_audio(self.block(value / 10))
+        self.recorder.start_recording()
+        for value in range(5, 8):
+            self.recorder.add_audio(self.block(value / 10))
+
+        path = self.recorder.stop_recording()
+        # Blocks after stop only feed the next pre-roll
+        self.recorder.add_audio(self.block(0.9))
+        self.assertTrue(self.recorder.wait(2.0))
+
+        recorded, rate = sf.read(path, dtype='float32')
+        expected = np.repeat(np.arange(3, 8) / 10, self.config.CHUNK)
+        self.assertEqual(rate, self.config.RATE)
+        np.testing.assert_allclose(recorded, expected, atol=1e-4)
+        self.assertEqual(self.recorder.dropped, 0)
+
+    def test_back_to_back_recordings(self):
+        import soundfile as sf
+        self.recorder.history = None
+        self.recorder.start_recording()
+        self.recorder.add_audio(self.block(0.1))
+        first = self.recorder.stop_recording()
+        self.recorder.file_format = 'flac'
+        self.recorder.start_recording()
+        self.recorder.add_audio(self.block(0.2))
+        self.recorder.add_audio(self.block(0.3))
+        second = self.recorder.stop_recording()
+        self.assertTrue(self.recorder.wait(2.0))
+
+        self.assertEqual(sf.info(first).frames, self.config.CHUNK)
+        self.assertEqual(sf.info(second).format, 'FLAC')
+        np.testing.assert_allclose(sf.read(second, dtype='float32')[0],
+                                   np.repeat([0.2, 0.3], self.config.CHUNK), atol=1e-4)
+
+    def test_rotates_segments_at_exact_sample_counts(self):
+        import soundfile as sf
+        from orionwave.recording import RecordingManager
+        segments = []
+        recorder = RecordingManager(self.config, segment_seconds=0.025, segment_bytes=10_000,
+                                    on_segment=segments.append)
+        recorder.output_dir = Path(self.tmp.name)
+        try:
+            recorder.start_recording()
+            blocks = [self.block(value / 100) for value in range(7)]
+            for block in blocks:
+                recorder.add_audio(block)
+            recorder.stop_recording()
+            self.assertTrue(recorder.wait(2.0))
+        finally:
+            recorder.close()
+
+        lengths = [sf.info(str(path)).frames for path in segments]
+        self.assertEqual(lengths, [200, 200, 160])
+        recorded = np.concatenate([sf.read(str(path), dtype='float32')[0] for path in segments])
+        np.testing.assert_allclose(recorded, np.concatenate(blocks), atol=1e-4)
+        self.assertTrue(all(path.stem.endswith(f'_{i:04d}') for i, path in enumerate(segments)))
+
+    def test_transcoder_encodes_off_the_capture_path(self):
+        import soundfile as sf
+        from orionwave.recording import SegmentTranscoder
+        source = os.path.join(self.tmp.name, 'segment.wav')
+        sf.write(source, np.repeat([0.1, -0.1], 4000).astype(np.float32), 8000, subtype='PCM_16')
+
+        transcoder = SegmentTranscoder('flac', max_backlog=1)
+        self.assertTrue(transcoder.submit(Path(source)))
+        self.assertFalse(transcoder.submit(Path(source)))  # Backlog full; returns at once
+        transcoder.shutdown()
+
+        self.assertEqual((transcoder.backlog, transcoder.rejected, transcoder.completed), (0, 1, 1))
+        self.assertFalse(os.path.exists(source))
+        info = sf.info(os.path.join(self.tmp.name, 'segment.flac'))
+        self.assertEqual((info.format, info.frames), ('FLAC', 8000))
+
+    def test_convert_format_uses_explicit_mapping(self):
+        import soundfile as sf
+        source = os.path.join(self.tmp.name, 'take.wav')
+        sf.write(source, np.zeros(800, dtype=np.float32), 8000)
+        converted = self.recorder.convert_format(source, 'ogg')
+        self.assertEqual(sf.info(converted).subtype, 'VORBIS')
+        self.assertIsNone(self.recorder.convert_format(source, 'xyz'))
+
+class TestRender(unittest.TestCase):
+    def test_parse_effect(self):
+        from orionwave.render import parse_effect
+        self.assertEqual(parse_effect('robot'), ('robot', {}))
+        self.assertEqual(parse_effect('reverb:room_size=0.5,mix=0.3'),
+                         ('reverb', {'room_size': 0.5, 'mix': 0.3}))
+        with self.assertRaises(ValueError):
+            parse_effect('reverb:mix')
+
+    def test_renders_directory_across_workers(self):
+        import soundfile as sf
+        from orionwave.render import render_files
+
+        rate = 16000
+        t = np.arange(rate // 2) / rate
+        tone = (np.sin(2 * np.pi * 220 * t) * 0.3).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'in')
+            os.makedirs(os.path.join(source, 'nested'))
+            sf.write(os.path.join(source, 'a.wav'), tone, rate)
+            sf.write(os.path.join(source, 'nested', 'b.flac'), tone[:1000], rate)
+            output = os.path.join(tmp, 'out')
+
+            stats = render_files([source], output, AudioConfig(CHUNK=512),
+                                 chain=[('reverb', {'mix': 0.4})], jobs=2)
+            self.assertEqual((stats['files'], stats['failed']), (2, 0))
+            self.assertAlmostEqual(stats['duration'], (len(tone) + 1000) / rate)
+            self.assertGreater(stats['throughput'], 0)
+
+            # The reverb's tail (room_size 0.8) is rendered after the input
+            tail = int(0.8 * rate)
+            rendered, rendered_rate = sf.read(os.path.join(output, 'a.wav'), dtype='float32')
+            self.assertEqual((len(rendered), rendered_rate), (len(tone) + tail, rate))
+            self.assertFalse(np.allclose(rendered[:len(tone)], tone, atol=1e-3))
+            self.assertEqual(sf.info(os.path.join(output, 'nested', 'b.flac')).frames, 1000 + tail)
+
+    def test_render_drops_latency_and_keeps_tail(self):
+        import soundfile as sf
+        from orionwave.render import render_file
+
+        # Speech level, below the live VAD's gate, so only the render path decides
+        rate, config = 16000, AudioConfig(CHUNK=512)
+        t = np.arange(8000) / rate
+        burst = np.concatenate([np.zeros(8000), np.sin(2 * np.pi * 220 * t) * 0.05]).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            source, output = os.path.join(tmp, 'in.wav'), os.path.join(tmp, 'out.wav')
+            sf.write(source, np.concatenate([burst, np.zeros(8000, dtype=np.float32)]), rate,
+                     subtype='FLOAT')
+            render_file(source, output, config, chain=[('pitch_shift', {'shift': 1200})])
+            rendered = sf.read(output, dtype='float32')[0]
+            # The vocoder's frame of latency is dropped, so the burst ends where it did
+            self.assertEqual(len(rendered), 24000)
+            self.assertGreater(np.abs(rendered[15000:16000]).max(), 0.02)
+            self.assertLess(np.abs(rendered[16512:]).max(), 0.002)
+
+            sf.write(source, burst, rate, subtype='FLOAT')
+            render_file(source, output, config, chain=[('reverb', {'room_size': 0.25, 'mix': 0.5})])
+            rendered = sf.read(output, dtype='float32')[0]
+            self.assertEqual(len(rendered), 16000 + 4000)
+            self.assertGreater(np.sqrt(np.mean(rendered[16000:17000] ** 2)), 0.002)
+
+    def test_render_processes_speech_level_input(self):
+        import soundfile as sf
+        from orionwave.render import render_file
+
+        # Well below the live VAD's RMS gate, which would leave the file dry
+        rate = 16000
+        t = np.arange(rate) / rate
+        tone = (np.sin(2 * np.pi * 220 * t) * 0.05).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            source, output = os.path.join(tmp, 'in.wav'), os.path.join(tmp, 'out.wav')
+            sf.write(source, tone, rate, subtype='FLOAT')
+            render_file(source, output, AudioConfig(CHUNK=512), chain=[('pitch_shift', {'shift': 1200})])
+            rendered = sf.read(output, dtype='float32')[0]
+        spectrum = np.abs(np.fft.rfft(rendered[2000:-2000]))
+        peak = np.argmax(spectrum) * rate / (len(rendered) - 4000)
+        self.assertAlmostEqual(peak, 440, delta=5)
+
+    def test_invalid_preset_or_effect_fails_before_rendering(self):
+        import argparse
+        from orionwave.cli import render
+        from orionwave.render import render_files, resolve_chain
+
+        for name in ('natural', 'robot', 'high_pitch'):
+            with self.subTest(preset=name):
+                self.assertTrue(resolve_chain(AudioConfig(), preset=name))
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'out')
+            with self.assertRaises(ValueError):
+                render_files([tmp], output, AudioConfig(), preset='doesnotexist')
+            with self.assertRaises(ValueError):
+                render_files([tmp], output, AudioConfig(), chain=[('eq', {})])
+            self.assertFalse(os.path.exists(output))
+
+            args = argparse.Namespace(config=None, inputs=[tmp], output=output, effects=None,
+                                      preset='doesnotexist', jobs=1)
+            self.assertNotEqual(render(args), 0)
+
+    def test_streaming_memory_does_not_grow_with_length(self):
+        import tracemalloc
+        import soundfile as sf
+        from orionwave.render import render_file
+
+        rate, config = 16000, AudioConfig(CHUNK=512)
+        with tempfile.TemporaryDirectory() as tmp:
+            peaks, updates = [], [None]
+            for seconds in (1, 2, 30):  # The first run also pays for imports
+                path = os.path.join(tmp, f'{seconds}.wav')
+                t = np.arange(rate * seconds) / rate
+                stereo = np.stack([np.sin(2 * np.pi * 220 * t)] * 2, axis=1) * 0.3
+                sf.write(path, stereo, rate, subtype='PCM_16')
+
+                tracemalloc.start()
+                result = render_file(path, os.path.join(tmp, f'out_{seconds}.wav'), config,
+                                     chain=[('reverb', {'mix': 0.4})],
+                                     progress=lambda done, total: updates.__setitem__(0, (done, total)))
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                self.assertAlmostEqual(result['duration'], seconds)
+
+            # 28 s more audio is ~900 KB of float32 samples
+            self.assertLess(peaks[2] - peaks[1], 200_000)
+            self.assertEqual(updates[0], (rate * 30, rate * 30))
+            self.assertEqual(sf.info(os.path.join(tmp, 'out_30.wav')).channels, 1)
+
 if __name__ == '__main__':
     unittest.main()